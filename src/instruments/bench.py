@@ -4,7 +4,8 @@ Manages connections and configurations for Vector Signal Analyzer (VSA) and
 Vector Signal Generator (VSG) instruments.
 """
 
-from src.instruments.iSocket import iSocket
+from src.instruments.iSocket import iSocket, SocketOptions
+from src.instruments.scpi_log import ScpiRecorder, ScpiReplay
 import configparser
 import os
 
@@ -13,7 +14,7 @@ class bench:
     """Class to manage VSA and VSG instrument connections and settings."""
 
     def __init__(self):
-        config = configparser.ConfigParser()
+        config = configparser.ConfigParser(inline_comment_prefixes=(';',))  # Allow 'KEY = value ; note'
         # Construct the path to bench_config.ini relative to this script's location
         config_file = os.path.join(os.path.dirname(__file__), 'bench_config.ini')
         if not config.read(config_file):
@@ -22,14 +23,55 @@ class bench:
             raise ValueError(f"Configuration file '{config_file}' is missing the 'Settings' section.")
         self.VSA_IP = config['Settings']['VSA_IP']  # Load VSA IP
         self.VSG_IP = config['Settings']['VSG_IP']  # Load VSG IP
+        self.timeout = config['Settings'].getfloat('TIMEOUT_S', 30.0)  # Socket read timeout in seconds
+        self.reconnect_attempts = config['Settings'].getint('RECONNECT_ATTEMPTS', 3)  # 0 disables reconnecting
+        self.reconnect_backoff = config['Settings'].getfloat('RECONNECT_BACKOFF_S', 0.5)  # Doubled per attempt
+        self.socket_options = SocketOptions(
+            nodelay=config['Settings'].getboolean('TCP_NODELAY', True),
+            keepalive=config['Settings'].getboolean('TCP_KEEPALIVE', True),
+            keepalive_idle=config['Settings'].getint('KEEPALIVE_IDLE_S', 10),
+            keepalive_interval=config['Settings'].getint('KEEPALIVE_INTERVAL_S', 5),
+            sndbuf=config['Settings'].getint('SNDBUF', 0) or None,
+            rcvbuf=config['Settings'].getint('RCVBUF', 0) or None,
+            connect_timeout=config['Settings'].getfloat('CONNECT_TIMEOUT_S', 5.0))
+        session = config['Session'] if 'Session' in config else {}
+        self.record_path = session.get('SCPI_RECORD') or None  # Record SCPI traffic to this log
+        self.replay_path = session.get('SCPI_REPLAY') or None  # Serve SCPI traffic from this log
+        self.replay_timing = str(session.get('SCPI_REPLAY_TIMING', 'false')).lower() in ('1', 'true', 'yes', 'on')
+        self.trace_path = session.get('TRACE_EXPORT') or None  # Export span trace to this file
+        self.trace_format = session.get('TRACE_FORMAT', 'chrome')  # 'chrome' or 'otlp'
+        self.level_cache_path = session.get('LEVEL_CACHE', 'logs/level_cache.json') or None  # Auto-level results
+        # Sweep watchdog budget: expected duration x margin + overhead, retried on overrun
+        self.watchdog_margin = float(session.get('WATCHDOG_MARGIN', 3.0))
+        self.watchdog_overhead_s = float(session.get('WATCHDOG_OVERHEAD_S', 2.0))
+        self.watchdog_retries = int(session.get('WATCHDOG_RETRIES', 1))
         self.VSA = None
         self.VSG = None
 
+    def connect(self, ip, port=5025):
+        """Open an instrument connection using the configured transport.
+
+        Replays a recorded session when SCPI_REPLAY is set, otherwise opens a
+        TCP socket (recording it when SCPI_RECORD is set).
+
+        Args:
+            ip (str): Instrument IP address.
+            port (int): SCPI port, default 5025.
+
+        Returns:
+            iSocket: Connected socket object.
+        """
+        if self.replay_path:
+            return ScpiReplay.shared(self.replay_path, timing=self.replay_timing).connect(ip, port)
+        recorder = ScpiRecorder.shared(self.record_path) if self.record_path else None
+        return iSocket(recorder=recorder, timeout=self.timeout, reconnect_attempts=self.reconnect_attempts,
+                       reconnect_backoff=self.reconnect_backoff, options=self.socket_options).open(ip, port)
+
     def bench_verify(self):
         """Verify connectivity to VSA and VSG by querying their IDs."""
         try:
-            self.VSA = iSocket().open(self.VSA_IP, 5025)
-            self.VSG = iSocket().open(self.VSG_IP, 5025)
+            self.VSA = self.connect(self.VSA_IP)
+            self.VSG = self.connect(self.VSG_IP)
             print(f"\nVSA ID: {self.VSA.idn}")
             print(f"VSG ID: {self.VSG.idn}")
         except Exception as e:
@@ -39,7 +81,7 @@ class bench:
     def VSA_start(self):
         """Establish connection to VSA and return the socket object."""
         try:
-            self.VSA = iSocket().open(self.VSA_IP, 5025)
+            self.VSA = self.connect(self.VSA_IP)
             return self.VSA
         except Exception as e:
             print(f"Error starting VSA: {e}")
@@ -53,12 +95,41 @@ class bench:
     def VSG_start(self):
         """Establish connection to VSG and return the socket object."""
         try:
-            self.VSG = iSocket().open(self.VSG_IP, 5025)
+            self.VSG = self.connect(self.VSG_IP)
             return self.VSG
         except Exception as e:
             print(f"Error starting VSG: {e}")
             raise
 
+    def couple_generator(self, vsa):
+        """Couple the analyzer's generator control to the configured VSG.
+
+        The link handshake (IP address, connection) is done once per analyzer
+        connection and remembered on it; generator control, RF output and
+        frequency sync are reapplied on every call, so the coupling survives
+        the *RST of a reconfiguration. The analyzer then drives the VSG
+        frequency.
+
+        Args:
+            vsa (iSocket): Analyzer connection.
+
+        Returns:
+            bool: True if the link handshake was done by this call.
+        """
+        handshake = getattr(vsa, 'coupled_generator', None) != self.VSG_IP
+        if handshake:
+            vsa.write(f'CONF:GEN:IPC:ADDR "{self.VSG_IP}"')  # Set generator IP
+            vsa.query('CONF:GEN:CONN:STAT ON;*OPC?')  # Enable generator connection
+            vsa.coupled_generator = self.VSG_IP
+        # Generator control, RF output and analyzer-driven frequency sync
+        vsa.write('CONF:GEN:CONT:STAT ON;:CONF:GEN:RFO:STAT ON;:CONF:GEN:FREQ:CENT:SYNC:STAT ON')
+        return handshake
+
+    @staticmethod
+    def is_generator_coupled(vsa):
+        """Return True if couple_generator() has linked this analyzer connection to a VSG."""
+        return getattr(vsa, 'coupled_generator', None) is not None
+
     def set_VSx_freq(self, freq):
         """Set center frequency for both VSA and VSG.
 
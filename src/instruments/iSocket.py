@@ -1,30 +1,139 @@
 """iSocket module for RF instrument communication.
 
-Provides socket-based communication with VSA and VSG instruments.
+Provides socket-based communication with VSA and VSG instruments. A dropped
+connection is reopened with bounded backoff and the settings sent so far
+are restored from the connection's shadow cache, so the interrupted command
+is retried and the campaign resumes without operator intervention.
+
+Sockets disable Nagle's algorithm by default: a burst of small SCPI writes
+followed by a query otherwise waits on the instrument's delayed ACK. See
+`python -m src.instruments.simulator --bench` for the per-command cost.
 """
 
 import socket
-import os
 import logging
+import time
+from src.instruments.scpi_errors import InstrumentError, parse_error_queue, split_response
+from src.instruments.scpi_stats import latency_stats
+from src.instruments.shadow import ShadowState
+from src.utils.log_setup import scpi_traffic
+from src.utils.tracing import tracer
+
+
+CONNECTION_ERRORS = (ConnectionError,)  # Reset, aborted, refused and broken pipe
+
+
+class SocketOptions:
+    """TCP options applied to every instrument socket."""
+
+    def __init__(self, nodelay=True, keepalive=True, keepalive_idle=10, keepalive_interval=5,
+                 keepalive_count=3, sndbuf=None, rcvbuf=None, connect_timeout=5.0):
+        """Set the options.
+
+        Args:
+            nodelay (bool): Set TCP_NODELAY (disable Nagle), default True.
+            keepalive (bool): Enable TCP keepalive so a dead instrument is
+                detected during long sweeps, default True.
+            keepalive_idle (int): Idle seconds before the first probe.
+            keepalive_interval (int): Seconds between probes.
+            keepalive_count (int): Unanswered probes before the drop.
+            sndbuf (int, optional): SO_SNDBUF bytes, default the OS value.
+            rcvbuf (int, optional): SO_RCVBUF bytes, default the OS value.
+            connect_timeout (float, optional): Seconds allowed for connect(),
+                independent of the read timeout.
+        """
+        self.nodelay = nodelay
+        self.keepalive = keepalive
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count = keepalive_count
+        self.sndbuf = sndbuf
+        self.rcvbuf = rcvbuf
+        self.connect_timeout = connect_timeout
+
+    def apply(self, sock):
+        """Set the options on an unconnected socket."""
+        if self.nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.sndbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+        if self.rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        if not self.keepalive:
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):  # Linux, Windows 10 1709+
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.keepalive_interval)
+            if hasattr(socket, 'TCP_KEEPCNT'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self.keepalive_count)
+        elif hasattr(socket, 'SIO_KEEPALIVE_VALS'):  # Older Windows
+            sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, self.keepalive_idle * 1000, self.keepalive_interval * 1000))
 
 
 class iSocket:
     """Class for socket communication with RF instruments."""
 
-    def __init__(self):
-        """Initialize socket and logging."""
-        # Setup logging to logs/iSocket.log
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, 'iSocket.log')
-        logging.basicConfig(
-            filename=log_path,
-            level=logging.INFO,
-            format='%(asctime)s - %(message)s'
-        )
+    # Status byte bit set when an enabled event-status bit (here OPC) is set
+    STB_ESB = 0x20
+
+    RECV_SIZE = 65536  # Bytes per recv(); responses are framed by '\n'
+
+    def __init__(self, recorder=None, stats=latency_stats, timeout=None, reconnect_attempts=3,
+                 reconnect_backoff=0.5, max_reconnect_backoff=8.0, options=None):
+        """Initialize socket.
+
+        SCPI traffic goes to the shared scpi_traffic ring buffer rather than
+        the log; see src.utils.log_setup.
+
+        Args:
+            recorder (ScpiRecorder, optional): Session recorder that captures
+                every command and response sent over this socket.
+            stats (ScpiLatencyStats, optional): Per-command latency histograms,
+                shared by every socket of the run by default. None disables.
+            timeout (float, optional): Socket read timeout in seconds.
+            reconnect_attempts (int): Connection attempts after a drop, 0
+                disables reconnecting.
+            reconnect_backoff (float): Seconds before the second attempt,
+                doubled per attempt.
+            max_reconnect_backoff (float): Upper bound of the backoff.
+            options (SocketOptions, optional): TCP options, default
+                SocketOptions().
+        """
         self.logger = logging.getLogger(__name__)
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.timeout = timeout
+        self.options = options or SocketOptions()
+        self._rx = bytearray()  # Received bytes not yet returned as a response
+        self.sock = self._new_socket()
         self.idn = "Unknown"  # Placeholder for instrument ID
+        self.recorder = recorder
+        self.conn_id = None  # Connection id assigned by the recorder
+        self.stats = stats
+        self.address = "unconnected"  # Instrument label used for latency stats
+        self.host = None  # (ip, port) while open, for reconnecting
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.max_reconnect_backoff = max_reconnect_backoff
+        self.reconnects = 0
+        self.shadow = ShadowState()  # Settings restored after a reconnect
+        self.coupled_generator = None  # VSG IP the analyzer's generator control is linked to
+
+    def _new_socket(self):
+        """Create the TCP socket with the configured options and timeout."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.options.apply(sock)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        return sock
+
+    def _connect(self, host):
+        """Connect within the connect timeout, then restore the read timeout."""
+        self.sock.settimeout(self.options.connect_timeout)
+        try:
+            self.sock.connect(host)
+        finally:
+            self.sock.settimeout(self.timeout)
+        self._rx.clear()
 
     def open(self, ip, port):
         """Connect to instrument at specified IP and port.
@@ -37,8 +146,12 @@ class iSocket:
             iSocket: Self for method chaining.
         """
         try:
-            self.sock.connect((ip, port))
+            self._connect((ip, port))
             self.logger.info(f"Connected to {ip}:{port}")
+            self.address = f"{ip}:{port}"
+            self.host = (ip, port)
+            if self.recorder:
+                self.conn_id = self.recorder.open(ip, port)
             # Query instrument ID (example)
             self.idn = self.query('*IDN?').strip()
             return self
@@ -49,8 +162,12 @@ class iSocket:
     def close(self):
         """Close the socket connection."""
         try:
+            self.host = None  # Closed on purpose, never reconnect
             self.sock.close()
             self.logger.info("Socket closed")
+            if self.recorder and self.conn_id is not None:
+                self.recorder.close(self.conn_id)
+                self.conn_id = None
         except Exception as e:
             self.logger.error(f"Failed to close socket: {e}")
             raise
@@ -65,12 +182,27 @@ class iSocket:
             str: Instrument response.
         """
         try:
-            self.logger.info(f"Query: {cmd}")
-            self.sock.send(f"{cmd}\n".encode())
-            response = self.sock.recv(1024).decode().strip()
-            self.logger.info(f"Response: {response}")
+            scpi_traffic.add(self.address, 'Query', cmd)
+            t_start = time.perf_counter()
+            try:
+                self._send(cmd)
+                response = self._recv()
+            except CONNECTION_ERRORS as e:
+                self.reconnect(e)
+                self._send(cmd)  # Resume with the interrupted command
+                response = self._recv()
+            self.shadow.record(cmd)
+            t_end = time.perf_counter()
+            if self.stats:
+                self.stats.record(self.address, cmd, t_end - t_start)
+            if tracer.enabled:
+                tracer.add_span(cmd, 'scpi', t_start, t_end, instrument=self.address, response=response)
+            if self.recorder and self.conn_id is not None:
+                self.recorder.query(self.conn_id, cmd, response, t_start, t_end)
+            scpi_traffic.add(self.address, 'Response', response)
             return response
         except Exception as e:
+            scpi_traffic.dump(f"Query failed on {self.address}")
             self.logger.error(f"Query failed: {cmd}, Error: {e}")
             raise
 
@@ -81,12 +213,98 @@ class iSocket:
             cmd (str): SCPI command to send.
         """
         try:
-            self.logger.info(f"Write: {cmd}")
-            self.sock.send(f"{cmd}\n".encode())
+            scpi_traffic.add(self.address, 'Write', cmd)
+            t_start = time.perf_counter()
+            try:
+                self._send(cmd)
+            except CONNECTION_ERRORS as e:
+                self.reconnect(e)
+                self._send(cmd)  # Resume with the interrupted command
+            self.shadow.record(cmd)
+            t_end = time.perf_counter()
+            if self.stats:
+                self.stats.record(self.address, cmd, t_end - t_start)
+            if tracer.enabled:
+                tracer.add_span(cmd, 'scpi', t_start, t_end, instrument=self.address)
+            if self.recorder and self.conn_id is not None:
+                self.recorder.write(self.conn_id, cmd, t_start, t_end)
         except Exception as e:
+            scpi_traffic.dump(f"Write failed on {self.address}")
             self.logger.error(f"Write failed: {cmd}, Error: {e}")
             raise
 
+    def _send(self, cmd):
+        """Send one command line."""
+        self.sock.sendall(f"{cmd}\n".encode())
+
+    def _recv(self):
+        """Read one '\n'-terminated response, however it is segmented.
+
+        Raises:
+            ConnectionResetError: If the instrument closed the connection.
+        """
+        start = 0
+        while True:
+            end = self._rx.find(b'\n', start)
+            if end >= 0:
+                break
+            start = len(self._rx)
+            data = self.sock.recv(self.RECV_SIZE)
+            if not data:
+                raise ConnectionResetError(f"{self.address} closed the connection")
+            self._rx += data
+        response = self._rx[:end].decode().strip()
+        del self._rx[:end + 1]
+        return response
+
+    def reconnect(self, reason=None):
+        """Reopen a dropped connection and restore the shadowed settings.
+
+        Attempts are spaced by a doubling backoff capped at
+        max_reconnect_backoff.
+
+        Args:
+            reason (Exception, optional): Error that dropped the connection.
+
+        Raises:
+            ConnectionError: If the socket was never opened, was closed, or
+                every attempt failed.
+        """
+        if self.host is None or not self.reconnect_attempts:
+            raise ConnectionError(f"Connection to {self.address} lost: {reason}")
+        delay = self.reconnect_backoff
+        for attempt in range(1, self.reconnect_attempts + 1):
+            self.logger.warning(f"Reconnecting to {self.address} "
+                                f"(attempt {attempt}/{self.reconnect_attempts}): {reason}")
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = self._new_socket()
+            try:
+                self._connect(self.host)
+                self._restore()
+                self.reconnects += 1
+                return
+            except OSError as e:
+                reason = e
+            if attempt < self.reconnect_attempts:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_backoff)
+        raise ConnectionError(f"Could not reconnect to {self.address} after "
+                              f"{self.reconnect_attempts} attempts: {reason}")
+
+    def _restore(self):
+        """Re-apply the shadowed settings on a fresh connection."""
+        commands = self.shadow.commands()
+        for cmd in commands:
+            self._send(cmd)
+            if cmd.endswith('?'):
+                self._recv()
+        self._send('*CLS;*OPC?')  # Drop errors of re-created channels and synchronise
+        self._recv()
+        self.logger.info(f"Restored {len(commands)} settings on {self.address}")
+
     def queryFloat(self, cmd):
         """Send SCPI command and return response as float.
 
@@ -98,10 +316,127 @@ class iSocket:
         """
         return float(self.query(cmd))
 
+    def arm(self, cmd='INIT:IMM'):
+        """Start an overlapped operation without waiting for it.
+
+        Completion is reported through the status byte: *ESE 1 routes the
+        OPC event bit to ESB and *SRE 32 raises a service request on it, so
+        wait_complete() can poll *STB? while the host does other work.
+
+        Args:
+            cmd (str): Overlapped command to start, default 'INIT:IMM'.
+        """
+        self.write(f'*CLS;*ESE 1;*SRE 32;{cmd};*OPC')
+
+    def is_complete(self):
+        """Poll the status byte for completion of the armed operation.
+
+        Returns:
+            bool: True once the operation started by arm() has finished.
+        """
+        return bool(int(self.query('*STB?')) & self.STB_ESB)
+
+    def wait_complete(self, timeout=30.0, poll_interval=0.005, max_poll_interval=0.05):
+        """Wait for the operation started by arm() to finish.
+
+        Polls *STB? with a backoff from poll_interval up to max_poll_interval
+        and clears the event status register once the operation is done.
+
+        Args:
+            timeout (float): Seconds to wait before giving up.
+            poll_interval (float): Initial delay between polls in seconds.
+            max_poll_interval (float): Maximum delay between polls in seconds.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        t_start = time.perf_counter()
+        deadline = t_start + timeout
+        while not self.is_complete():
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Operation on {self.address} not complete after {timeout:.1f} s")
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+        self.query('*ESR?')  # Clear the OPC event for the next arm()
+        return time.perf_counter() - t_start
+
+    def set_timeout(self, timeout):
+        """Change the socket read timeout.
+
+        Args:
+            timeout (float): Seconds, or None to block indefinitely.
+
+        Returns:
+            float: Previous timeout, for restoring it.
+        """
+        previous, self.timeout = self.timeout, timeout
+        self.sock.settimeout(timeout)
+        return previous
+
+    def abort(self, settle=0.1):
+        """Abort the running operation and resynchronise the connection.
+
+        Sends ABOR;*CLS and discards any response of the aborted command
+        that arrives within `settle` seconds, so the next query does not
+        read a stale reply.
+
+        Args:
+            settle (float): Seconds to wait for late responses.
+
+        Returns:
+            bytes: Discarded data.
+        """
+        self.logger.warning(f"Aborting operation on {self.address}")
+        self.write('ABOR;*CLS')
+        discarded = bytes(self._rx)
+        self._rx.clear()
+        self.sock.settimeout(settle)
+        try:
+            while True:
+                chunk = self.sock.recv(4096)
+                if not chunk:
+                    break
+                discarded += chunk
+        except (socket.timeout, BlockingIOError):
+            pass
+        finally:
+            self.sock.settimeout(self.timeout)
+        if discarded:
+            self.logger.info(f"Discarded late response on {self.address}: {discarded!r}")
+        return discarded
+
+    def sync(self, cmd='*OPC?'):
+        """Close a command batch: wait for completion and check the error queue.
+
+        :SYST:ERR:ALL? is appended to the final query of the batch, so the
+        check costs no extra round trip.
+
+        Args:
+            cmd (str): Final query of the batch, default '*OPC?'; may carry
+                the batch's last settings, e.g. 'INIT:CONT OFF;*OPC?'.
+
+        Returns:
+            str: Response to cmd.
+
+        Raises:
+            InstrumentError: If the error queue was not empty.
+        """
+        result, queue = split_response(self.query(f'{cmd};:SYST:ERR:ALL?'))
+        errors = parse_error_queue(queue)
+        if errors:
+            raise InstrumentError(self.address, cmd, errors)
+        return result
+
     def clear_error(self):
-        """Clear instrument error queue."""
-        self.logger.info("Clearing error queue")
-        self.query(':SYST:ERR?')
+        """Empty the instrument error queue, logging what it held.
+
+        Returns:
+            list: (code, message) tuples of the cleared errors.
+        """
+        errors = parse_error_queue(self.query(':SYST:ERR:ALL?'))
+        for code, message in errors:
+            self.logger.warning(f"{self.address} error {code}: {message}")
+        return errors
 
     def __del__(self):
         """Close socket."""
@@ -114,4 +449,4 @@ if __name__ == '__main__':
     # Example usage
     sock = iSocket()
     sock.open('192.168.200.10', 5025)
-    print(sock.idn)
\ No newline at end of file
+    print(sock.idn)
@@ -0,0 +1,67 @@
+"""Instrument error queue checking.
+
+Instead of a separate :SYST:ERR? round trip after every configuration,
+iSocket.sync() appends :SYST:ERR:ALL? to the final *OPC? of a command
+batch. The one response carries both the completion and the whole error
+queue; an InstrumentError is raised only when the queue is non-empty.
+"""
+
+import re
+
+_ERROR = re.compile(r'([+-]?\d+)\s*,\s*"((?:[^"]|"")*)"')
+
+
+class InstrumentError(Exception):
+    """The instrument reported errors for a command batch."""
+
+    def __init__(self, address, command, errors):
+        """Build the error.
+
+        Args:
+            address (str): Instrument address, e.g. '192.168.200.20:5025'.
+            command (str): Command that closed the batch.
+            errors (list): (code, message) tuples from the error queue.
+        """
+        self.address = address
+        self.command = command
+        self.errors = errors
+        summary = '; '.join(f"{code},\"{message}\"" for code, message in errors)
+        super().__init__(f"{address} reported {len(errors)} error(s) before {command}: {summary}")
+
+
+def split_response(response):
+    """Split off the last ';'-separated field of a compound query response.
+
+    Separators inside quoted strings are ignored.
+
+    Args:
+        response (str): Response of a compound query.
+
+    Returns:
+        tuple: (leading fields, last field); leading fields is '' if the
+            response has a single field.
+    """
+    quoted = False
+    split = -1
+    for i, char in enumerate(response):
+        if char == '"':
+            quoted = not quoted
+        elif char == ';' and not quoted:
+            split = i
+    if split < 0:
+        return '', response
+    return response[:split], response[split + 1:]
+
+
+def parse_error_queue(text):
+    """Parse a :SYST:ERR:ALL? response.
+
+    Args:
+        text (str): Response, e.g. '-113,"Undefined header",-222,"Data out of range"'.
+
+    Returns:
+        list: (code, message) tuples of the queued errors; empty for
+            '0,"No error"'.
+    """
+    return [(int(code), message.replace('""', '"'))
+            for code, message in _ERROR.findall(text) if int(code) != 0]
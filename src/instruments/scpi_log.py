@@ -0,0 +1,348 @@
+"""SCPI session record/replay for deterministic benchmarks.
+
+A recording captures every connection, command, response and timestamp of a
+real bench run to a compact binary log. The replay transport serves those
+responses back without touching hardware, optionally sleeping for the
+latency each command took on the real instruments.
+
+Log layout: an 8 byte magic followed by one record per event. Each record is
+a fixed header (kind, connection id, start and end time relative to the start
+of the recording) and two length-prefixed UTF-8 payloads (command, response).
+For OPEN records the command payload is "ip:port".
+"""
+
+import bisect
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from src.instruments.iSocket import iSocket
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SCPILOG1'
+OPEN, WRITE, QUERY, CLOSE = range(4)
+KIND_NAMES = {OPEN: 'open', WRITE: 'write', QUERY: 'query', CLOSE: 'close'}
+_HEADER = struct.Struct('<BHdd')
+_LENGTH = struct.Struct('<I')
+
+_recorders = {}  # Shared recorders keyed by absolute path
+_replays = {}  # Shared replay sessions keyed by (absolute path, timing, speed)
+_sessions_lock = threading.Lock()
+
+
+def _resolve(path):
+    """Resolve a log path relative to the project root."""
+    if os.path.isabs(path):
+        return path
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    return os.path.abspath(os.path.join(root, path))
+
+
+def read_records(path):
+    """Read all records from a SCPI session log.
+
+    Args:
+        path (str): Path to the binary log.
+
+    Returns:
+        list: Tuples (kind, conn_id, t_start, t_end, cmd, response).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{path}' is not a SCPI session log")
+    records = []
+    pos = len(MAGIC)
+    while pos < len(data):
+        kind, conn_id, t_start, t_end = _HEADER.unpack_from(data, pos)
+        pos += _HEADER.size
+        payloads = []
+        for _ in range(2):
+            (length,) = _LENGTH.unpack_from(data, pos)
+            pos += _LENGTH.size
+            payloads.append(data[pos:pos + length].decode())
+            pos += length
+        records.append((kind, conn_id, t_start, t_end, payloads[0], payloads[1]))
+    return records
+
+
+class ScpiRecorder:
+    """Append-only recorder shared by every socket of a bench session."""
+
+    def __init__(self, path):
+        """Create the log file and write the header.
+
+        Args:
+            path (str): Output path for the binary log.
+        """
+        self.path = _resolve(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._next_id = 0
+        logger.info(f"Recording SCPI session to {self.path}")
+
+    @classmethod
+    def shared(cls, path):
+        """Return the recorder for a path, creating it on first use."""
+        key = _resolve(path)
+        with _sessions_lock:
+            if key not in _recorders:
+                _recorders[key] = cls(key)
+            return _recorders[key]
+
+    def _record(self, kind, conn_id, cmd, response, t_start, t_end):
+        """Pack a single record and append it to the log."""
+        cmd_bytes = cmd.encode()
+        resp_bytes = response.encode()
+        packed = b''.join((
+            _HEADER.pack(kind, conn_id, t_start - self._t0, t_end - self._t0),
+            _LENGTH.pack(len(cmd_bytes)), cmd_bytes,
+            _LENGTH.pack(len(resp_bytes)), resp_bytes,
+        ))
+        with self._lock:
+            self._file.write(packed)
+
+    def open(self, ip, port):
+        """Record a new connection and return its id."""
+        with self._lock:
+            conn_id = self._next_id
+            self._next_id += 1
+        now = time.perf_counter()
+        self._record(OPEN, conn_id, f"{ip}:{port}", '', now, now)
+        return conn_id
+
+    def write(self, conn_id, cmd, t_start, t_end):
+        """Record a command that expects no response."""
+        self._record(WRITE, conn_id, cmd, '', t_start, t_end)
+
+    def query(self, conn_id, cmd, response, t_start, t_end):
+        """Record a command and the response it produced."""
+        self._record(QUERY, conn_id, cmd, response, t_start, t_end)
+
+    def close(self, conn_id):
+        """Record the end of a connection and flush the log."""
+        now = time.perf_counter()
+        self._record(CLOSE, conn_id, '', '', now, now)
+        self.flush()
+
+    def flush(self):
+        """Flush buffered records to disk."""
+        with self._lock:
+            self._file.flush()
+
+    def stop(self):
+        """Flush and close the log file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        with _sessions_lock:
+            _recorders.pop(self.path, None)
+
+
+class _NullSocket:
+    """Stand-in for the TCP socket of a replayed connection."""
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self, size):
+        return b''
+
+    def close(self):
+        pass
+
+
+class ReplaySocket(iSocket):
+    """iSocket transport that serves responses from a recorded session.
+
+    Commands are matched against the recorded stream of the connection, so a
+    driver that sends fewer or reordered commands than the recording still
+    gets the response recorded for the same command.
+    """
+
+    def __init__(self, session, records):
+        """Bind a replayed connection to its recorded records.
+
+        Args:
+            session (ScpiReplay): Owning replay session (timing options).
+            records (list): Recorded (kind, cmd, response, duration) tuples.
+        """
+        super().__init__(reconnect_attempts=0)  # Nothing to reconnect to
+        self.logger = logging.getLogger(__name__)
+        self.session = session
+        self.records = records
+        self.cursor = 0
+        self.positions = defaultdict(list)  # (kind, cmd) -> ascending indexes into records
+        for i, (kind, cmd, _, _) in enumerate(records):
+            self.positions[(kind, cmd)].append(i)
+
+    def _new_socket(self):
+        """Replayed connections have no TCP socket."""
+        return _NullSocket()
+
+    def open(self, ip, port):
+        """Start the replayed connection and query the recorded ID."""
+        self.logger.info(f"Replaying connection to {ip}:{port}")
+        self.address = f"{ip}:{port}"
+        self.idn = self.query('*IDN?').strip()
+        return self
+
+    def close(self):
+        """Close the replayed connection."""
+        self.logger.info("Replay socket closed")
+
+    def _match(self, kind, cmd):
+        """Find the next recorded record for a command.
+
+        Records past the cursor are found through the per-command index;
+        once the stream has no later match, the last recording is reused.
+
+        Returns:
+            tuple: (response, duration) or None if never recorded.
+        """
+        positions = self.positions.get((kind, cmd))
+        if not positions:
+            return None
+        j = bisect.bisect_left(positions, self.cursor)
+        if j < len(positions):
+            self.cursor = positions[j] + 1
+            i = positions[j]
+        else:
+            i = positions[-1]
+        return self.records[i][2], self.records[i][3]
+
+    def query(self, cmd):
+        """Return the recorded response for a query."""
+        t_start = time.perf_counter()
+        match = self._match(QUERY, cmd)
+        if match is None:
+            self.logger.warning(f"Replay has no response for query: {cmd}")
+            self.session.misses += 1
+            return ''
+        response, duration = match
+        self.session.wait(duration)
+        if self.stats:
+            self.stats.record(self.address, cmd, time.perf_counter() - t_start)
+        return response
+
+    def write(self, cmd):
+        """Consume a recorded write."""
+        t_start = time.perf_counter()
+        match = self._match(WRITE, cmd)
+        if match is not None:
+            self.session.wait(match[1])
+        if self.stats:
+            self.stats.record(self.address, cmd, time.perf_counter() - t_start)
+
+    def is_complete(self):
+        """Report completion from the recorded status byte.
+
+        Sessions recorded before a driver switched to arm()/wait_complete()
+        have no *STB? responses; treat those operations as already complete.
+        """
+        response = self.query('*STB?')
+        return not response or bool(int(response) & self.STB_ESB)
+
+    def __del__(self):
+        pass
+
+
+class ScpiReplay:
+    """Replay session that hands out recorded connections in open order."""
+
+    def __init__(self, path, timing=False, speed=1.0):
+        """Load a recorded session.
+
+        Args:
+            path (str): Path to the binary log.
+            timing (bool): Sleep for the recorded latency of each command.
+            speed (float): Timing speed-up factor when timing is enabled.
+        """
+        self.path = _resolve(path)
+        self.timing = timing
+        self.speed = speed
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connections = defaultdict(list)  # "ip:port" -> [records, ...]
+        streams = {}
+        for kind, conn_id, t_start, t_end, cmd, response in read_records(self.path):
+            if kind == OPEN:
+                streams[conn_id] = []
+                self.connections[cmd].append(streams[conn_id])
+            elif kind in (WRITE, QUERY) and conn_id in streams:
+                streams[conn_id].append((kind, cmd, response, t_end - t_start))
+        logger.info(f"Loaded SCPI replay {self.path}: {len(streams)} connections")
+
+    @classmethod
+    def shared(cls, path, timing=False, speed=1.0):
+        """Return the replay session for a path, loading it on first use."""
+        key = (_resolve(path), timing, speed)
+        with _sessions_lock:
+            if key not in _replays:
+                _replays[key] = cls(path, timing=timing, speed=speed)
+            return _replays[key]
+
+    def wait(self, duration):
+        """Reproduce the recorded latency of a command."""
+        if self.timing and duration > 0:
+            time.sleep(duration / self.speed)
+
+    def connect(self, ip, port):
+        """Open the next recorded connection to an address.
+
+        Once every recorded connection to the address has been handed out,
+        the last one is reused so longer runs keep getting answers.
+
+        Returns:
+            ReplaySocket: Connected replay transport.
+        """
+        address = f"{ip}:{port}"
+        with self._lock:
+            streams = self.connections.get(address)
+            if not streams:
+                raise ConnectionError(f"No recorded connection to {address} in {self.path}")
+            records = streams.pop(0) if len(streams) > 1 else streams[0]
+        return ReplaySocket(self, records).open(ip, port)
+
+
+def summarize(path, top=15):
+    """Summarize where wall time went in a recorded session.
+
+    Args:
+        path (str): Path to the binary log.
+        top (int): Number of commands to list.
+
+    Returns:
+        str: Report with total session time and the slowest commands.
+    """
+    records = read_records(_resolve(path))
+    addresses = {}
+    totals = defaultdict(lambda: [0, 0.0])
+    span = 0.0
+    for kind, conn_id, t_start, t_end, cmd, _ in records:
+        span = max(span, t_end)
+        if kind == OPEN:
+            addresses[conn_id] = cmd
+        elif kind in (WRITE, QUERY):
+            entry = totals[(addresses.get(conn_id, '?'), cmd)]
+            entry[0] += 1
+            entry[1] += t_end - t_start
+    busy = sum(t for _, t in totals.values())
+    lines = [f"Session: {span:.3f} s wall, {busy:.3f} s in SCPI I/O, {len(records)} records"]
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    for (address, cmd), (count, total) in ranked[:top]:
+        lines.append(f"{total:9.3f} s {count:6d}x  {address:21s} {cmd}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    # Example usage: python -m src.instruments.scpi_log logs/session.scpilog
+    print(summarize(sys.argv[1]))
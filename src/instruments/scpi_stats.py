@@ -0,0 +1,152 @@
+"""Per-SCPI-command latency statistics.
+
+Every write/query sent through iSocket is tagged with its SCPI header and its
+send-to-response latency is recorded into a streaming log-linear histogram
+(HDR-style buckets), so a run can report which commands dominate wall time
+on each instrument without keeping individual samples.
+"""
+
+import re
+import threading
+from collections import defaultdict
+
+_ARGUMENT = re.compile(r'\s.*$')
+
+
+def scpi_header(cmd):
+    """Return the SCPI header of a command with arguments stripped.
+
+    Compound commands keep every header, e.g. 'INIT:IMM;*OPC?' or
+    'SENS:FREQ:CENT;*OPC' for ':SENS:FREQ:CENT 6e9;*OPC'.
+
+    Args:
+        cmd (str): SCPI command string.
+
+    Returns:
+        str: Upper-case header(s) joined by ';'.
+    """
+    parts = []
+    for part in cmd.split(';'):
+        header = _ARGUMENT.sub('', part.strip()).lstrip(':').upper()
+        if header:
+            parts.append(header)
+    return ';'.join(parts)
+
+
+class LatencyHistogram:
+    """Streaming log-linear histogram of latencies.
+
+    Values are bucketed in microseconds with SUB_BITS significant bits per
+    power of two, giving about 3 % relative precision at any magnitude.
+    """
+
+    SUB_BITS = 6
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def _index(self, micros):
+        """Map a value in microseconds to its bucket index."""
+        if micros < (1 << self.SUB_BITS):
+            return micros
+        shift = micros.bit_length() - self.SUB_BITS
+        return (shift << self.SUB_BITS) + (micros >> shift)
+
+    def _upper(self, index):
+        """Return the upper edge of a bucket in microseconds."""
+        if index < (1 << self.SUB_BITS):
+            return index
+        shift, sub = divmod(index, 1 << self.SUB_BITS)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds):
+        """Add one latency sample.
+
+        Args:
+            seconds (float): Latency in seconds.
+        """
+        self.buckets[self._index(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Return the latency at a percentile.
+
+        Args:
+            pct (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Latency in seconds (bucket upper edge, capped at max).
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self._upper(index) / 1e6, self.max)
+        return self.max
+
+
+class ScpiLatencyStats:
+    """Latency histograms keyed by instrument and SCPI header."""
+
+    def __init__(self):
+        self.histograms = defaultdict(LatencyHistogram)
+        self._lock = threading.Lock()
+
+    def record(self, instrument, cmd, seconds):
+        """Record the latency of a command sent to an instrument.
+
+        Args:
+            instrument (str): Instrument label (address).
+            cmd (str): Full SCPI command string.
+            seconds (float): Send-to-response latency in seconds.
+        """
+        key = (instrument, scpi_header(cmd))
+        with self._lock:
+            self.histograms[key].record(seconds)
+
+    def reset(self):
+        """Drop all recorded samples."""
+        with self._lock:
+            self.histograms.clear()
+
+    def report(self, top=10):
+        """Rank commands by total and p99 time per instrument.
+
+        Args:
+            top (int): Number of commands listed per instrument and ranking.
+
+        Returns:
+            str: Multi-line text report.
+        """
+        with self._lock:
+            items = list(self.histograms.items())
+        by_instrument = defaultdict(list)
+        for (instrument, header), hist in items:
+            by_instrument[instrument].append((header, hist))
+        lines = []
+        for instrument in sorted(by_instrument):
+            entries = by_instrument[instrument]
+            total = sum(hist.total for _, hist in entries)
+            lines.append(f"SCPI latency for {instrument}: {total:.3f} s over "
+                         f"{sum(hist.count for _, hist in entries)} commands")
+            for title, key in (("by total", lambda e: e[1].total),
+                               ("by p99", lambda e: e[1].percentile(99))):
+                lines.append(f"  Hot commands {title}:")
+                lines.append(f"  {'total s':>9} {'count':>6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  header")
+                for header, hist in sorted(entries, key=key, reverse=True)[:top]:
+                    lines.append(f"  {hist.total:9.3f} {hist.count:6d} {hist.percentile(50) * 1e3:8.2f} "
+                                 f"{hist.percentile(99) * 1e3:8.2f} {hist.max * 1e3:8.2f}  {header}")
+        return "\n".join(lines) if lines else "No SCPI commands recorded"
+
+
+latency_stats = ScpiLatencyStats()  # Shared by every iSocket of the run
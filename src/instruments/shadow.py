@@ -0,0 +1,97 @@
+"""Shadow cache of the settings sent over an instrument connection.
+
+iSocket feeds every command it sends through ShadowState, which keeps the
+last value of each setting since the last *RST, keyed by the selected
+channel. After a reconnect, commands() rebuilds that state on the
+instrument without the driver re-running its configuration.
+
+Settings and parameterless state-building commands (CONF:SETT:NR5G,
+QCKS:APPL, INST:CRE:DUPL, ...) are replayed in the order they were last
+sent, so a setting changed after such a command is not overwritten by it.
+Queries, common commands (*CLS, *OPC, ...), one-shot actions (... ONCE,
+ADJ:LEV), sweep triggers and shutdown are not replayed.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Headers that trigger an action rather than change a setting
+ACTION_HEADERS = {'INIT', 'INIT:IMM', 'INIT:SEQ:IMM', 'INIT:SEQ:ABOR', 'INIT:SPUR', 'ABOR', 'SENS:ADJ:LEV', 'ADJ:LEV',
+                  'SENS:LIST:XADJ', 'SYST:COMM:NETW:REST', 'SYST:SHUT'}
+RESET_HEADERS = {'*RST', 'SYST:PRES'}
+SELECT_HEADERS = {'INST', 'INST:SEL'}
+CHANNEL_HEADERS = ('INST:CRE', 'INST:REN', 'INST:DEL')
+
+
+def _split(part):
+    """Split one SCPI command into (normalized header, argument)."""
+    header, _, arg = part.strip().partition(' ')
+    return header.upper().lstrip(':'), arg.strip()
+
+
+class ShadowState:
+    """Last known settings of one instrument connection."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self, reset=False):
+        """Forget every setting.
+
+        Args:
+            reset (bool): The instrument was reset; replay starts with *RST.
+        """
+        self.reset = reset
+        self.channel = None  # Channel selected by the last INST:SEL
+        self.entries = {}  # (channel, header) -> command, in last-sent order
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, cmd):
+        """Track the settings of a sent command line.
+
+        Args:
+            cmd (str): Command line, possibly several ';'-separated commands.
+        """
+        for part in cmd.split(';'):
+            header, arg = _split(part)
+            if not header or '?' in header:
+                continue
+            if header in RESET_HEADERS:
+                self.clear(reset=True)
+            elif header.startswith('*') or header in ACTION_HEADERS or arg.upper().endswith('ONCE'):
+                continue
+            elif header in SELECT_HEADERS:
+                self.channel = arg
+            elif header.startswith(CHANNEL_HEADERS):
+                owner = self.channel if header == 'INST:CRE:DUPL' else None  # DUPL copies the selected channel
+                self.entries[(owner, part.strip())] = part.strip()
+                names = [name.strip() for name in arg.split(',')]
+                if header == 'INST:REN' and len(names) == 2 and names[0] == self.channel:
+                    self.channel = names[1]
+                elif header in ('INST:CRE', 'INST:CRE:NEW') and len(names) == 2:
+                    self.channel = names[1]  # A created channel becomes the selected one
+            else:
+                key = (self.channel, header)
+                self.entries.pop(key, None)  # Replay at its latest position
+                self.entries[key] = part.strip()
+
+    def commands(self):
+        """Commands that rebuild the shadowed state, in order.
+
+        Returns:
+            list: SCPI commands; channel selections are re-inserted where the
+                settings were made and the last selection is restored.
+        """
+        commands = ['*RST;*OPC?'] if self.reset else []
+        selected = None
+        for (channel, _), cmd in self.entries.items():
+            if channel is not None and channel != selected:
+                commands.append(f'INST:SEL {channel}')
+                selected = channel
+            commands.append(cmd)
+        if self.channel is not None and self.channel != selected:
+            commands.append(f'INST:SEL {self.channel}')
+        return commands
@@ -0,0 +1,163 @@
+"""Loopback SCPI instrument simulator.
+
+Serves the SCPI socket protocol on 127.0.0.1 so iSocket, the drivers and
+the transport tuning can be exercised without hardware. Settings are stored
+and echoed by their queries, *OPC?/*STB? report completion immediately and
+compound queries answer one field per query, ';'-separated, like the FSW
+and SMW do.
+
+Benchmark the per-command latency of a write burst followed by a query,
+with Nagle's algorithm enabled and disabled on the client:
+
+    python -m src.instruments.simulator --bench [--bursts 200] [--writes 5]
+"""
+
+import argparse
+import logging
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FIXED_RESPONSES = {
+    '*IDN?': 'Rohde&Schwarz,SCPI-Simulator,000000/000,1.0',
+    '*OPC?': '1',
+    '*STB?': '32',  # ESB set: an armed operation is always complete
+    '*ESR?': '1',
+    'SYST:ERR?': '0,"No error"',
+    'SYST:ERR:ALL?': '0,"No error"',
+}
+
+
+class ScpiSimulator:
+    """Threaded loopback SCPI server; one thread per connection."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        """Start listening.
+
+        Args:
+            host (str): Listen address, default loopback.
+            port (int): Listen port, default any free port.
+            latency (float): Seconds added before every response.
+        """
+        self.latency = latency
+        self.settings = {}  # Upper-case header -> last value written
+        self.errors = []  # Pending error queue entries, e.g. '-113,"Undefined header"'
+        self.commands = 0
+        self._lock = threading.Lock()
+        self.server = socket.create_server((host, port))
+        self.host, self.port = self.server.getsockname()[:2]
+        self._thread = threading.Thread(target=self._accept, name='scpi-sim', daemon=True)
+        self._thread.start()
+        logger.info(f"SCPI simulator listening on {self.host}:{self.port}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Stop accepting connections."""
+        self.server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn, conn.makefile('rb') as lines:
+            for raw in lines:
+                response = self.handle(raw.decode().strip())
+                if response is not None:
+                    if self.latency:
+                        time.sleep(self.latency)
+                    conn.sendall(f"{response}\n".encode())
+
+    def handle(self, line):
+        """Execute one command line.
+
+        Args:
+            line (str): Command line, possibly several ';'-separated commands.
+
+        Returns:
+            str: Response if the line contains a query, else None.
+        """
+        answers = []
+        with self._lock:
+            self.commands += 1
+            for part in line.split(';'):
+                header, _, arg = part.strip().partition(' ')
+                header = header.upper().lstrip(':')
+                if not header:
+                    continue
+                if header in ('*RST', 'SYST:PRES'):
+                    self.settings.clear()
+                elif header == '*CLS':
+                    self.errors.clear()
+                elif header == 'SYST:ERR:ALL?':
+                    answers.append(','.join(self.errors) or FIXED_RESPONSES[header])
+                    self.errors.clear()
+                elif header == 'SYST:ERR?':
+                    answers.append(self.errors.pop(0) if self.errors else FIXED_RESPONSES[header])
+                elif header in FIXED_RESPONSES:
+                    answers.append(FIXED_RESPONSES[header])
+                elif header.endswith('?'):
+                    answers.append(self.settings.get(header[:-1], '0'))
+                elif arg:
+                    self.settings[header] = arg.strip()
+        return ';'.join(answers) if answers else None
+
+
+def bench_latency(port, bursts=200, writes=5, nodelay=True):
+    """Measure the mean per-command latency of write bursts ended by a query.
+
+    Args:
+        port (int): Simulator port on 127.0.0.1.
+        bursts (int): Bursts to time.
+        writes (int): Writes per burst before the *OPC? query.
+        nodelay (bool): TCP_NODELAY on the client socket.
+
+    Returns:
+        float: Mean seconds per command.
+    """
+    from src.instruments.iSocket import iSocket, SocketOptions
+
+    sock = iSocket(stats=None, timeout=5.0, options=SocketOptions(nodelay=nodelay)).open('127.0.0.1', port)
+    try:
+        t_start = time.perf_counter()
+        for i in range(bursts):
+            for j in range(writes):
+                sock.write(f':SENS:FREQ:CENT {6e9 + i * 1e6 + j}')
+            sock.query('*OPC?')
+        return (time.perf_counter() - t_start) / (bursts * (writes + 1))
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Loopback SCPI simulator and transport micro-benchmark")
+    parser.add_argument('--port', type=int, default=5025, help="Listen port when serving")
+    parser.add_argument('--bench', action='store_true', help="Compare per-command latency with Nagle on/off")
+    parser.add_argument('--bursts', type=int, default=200, help="Write bursts per benchmark run")
+    parser.add_argument('--writes', type=int, default=5, help="Writes per burst before the query")
+    args = parser.parse_args()
+    if args.bench:
+        with ScpiSimulator() as sim:
+            for nodelay in (False, True):
+                per_cmd = bench_latency(sim.port, args.bursts, args.writes, nodelay)
+                print(f"TCP_NODELAY {'on ' if nodelay else 'off'}: {per_cmd * 1e6:9.1f} us per command "
+                      f"({args.bursts} bursts of {args.writes} writes + *OPC?)")
+    else:
+        sim = ScpiSimulator(port=args.port)
+        print(f"SCPI simulator listening on {sim.host}:{sim.port}, Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            sim.close()
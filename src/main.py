@@ -1,41 +1,32 @@
 # File: main.py
 # Main script for running RF measurements (LTE, NR5G, STN, SpurSearch)
+# Measurement drivers and pandas are imported on first use (open_driver, export_excel)
+import argparse
 import logging
 import os
 import json
-import numpy as np
-import re
-import pandas as pd
-from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
-from src.measurements.lte import std_insr_driver as LTE
-from src.measurements.SubThermalNoise import option_functions as STN
-from src.measurements.spur_search import SpurSearch
-from src.utils.utils import std_config, std_meas
 from src.instruments.bench import bench
+from src.measurements.protocol import open_driver
+from src.instruments.scpi_stats import latency_stats
+from src.utils.tracing import tracer
+from src.utils.log_setup import configure_logging
+from src.utils.pipeline import Pipeline
+from src.utils.watchdog import watchdog
+from src.utils.plan import expand_frequencies, load_plan, compile_plan
+from src.utils.estimate import RuntimeEstimator, LatencyModel
 
-# Configure logging to file and console
 logger = logging.getLogger(__name__)
 log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-os.makedirs(log_dir, exist_ok=True)  # Create logs directory if it doesn't exist
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'project.log')),
-        logging.StreamHandler()
-    ]
-)
 
 # List to store measurement results
 results = []
 previous_config = None  # Track previous configuration for optimization
 
-
 def format_frequency(fundamental_ghz):
     """Format fundamental frequency for logging/display."""
     if isinstance(fundamental_ghz, (int, float)):
         return f"{fundamental_ghz:.3f} GHz"
-    elif isinstance(fundamental_ghz, list):
+    elif isinstance(fundamental_ghz, (list, tuple)):
         return ", ".join(f"{freq:.3f} GHz" for freq in fundamental_ghz)
     elif isinstance(fundamental_ghz, dict) and "range" in fundamental_ghz:
         r = fundamental_ghz["range"]
@@ -44,544 +35,397 @@ def format_frequency(fundamental_ghz):
         return str(fundamental_ghz)
 
 
-def run_nr5g_measurement(test_config, test_set, instr):
-    """Run NR5G measurement with specified configuration.
+def measure_point(instr, timings):
+    """Arm, wait for and fetch one LTE/NR5G point through the driver phases.
+
+    Safe to repeat after a watchdog abort: only the first call may reuse
+    the capture of a cached-level check, a retry arms a fresh one.
 
     Args:
-        test_config (dict): Configuration parameters for the test.
-        test_set (int): Test set identifier.
-        instr: Instrument driver instance for NR5G measurements.
+        instr (MeasurementDriver): LTE or NR5G driver, already tuned,
+            levelled and set up with select().
+        timings (dict): Step timings of the point, updated in place.
+
+    Returns:
+        tuple: (EVM in dB, raw ACLR response or None, channel power or None).
     """
-    global previous_config
-    try:
-        # Convert frequency to Hz and extract other parameters
-        freq = test_config["center_frequency_ghz"] * 1e9
-        pwr = test_config["power_dbm"]
-        rb = test_config.get("resource_blocks", 51)
-        rbo = test_config.get("resource_block_offset", 0)
-        bw = test_config.get("channel_bandwidth_mhz", 20)
-        mod = test_config.get("modulation_type", "QAM256")
-        scs = test_config.get("subcarrier_spacing_khz", 30)
-        measure_ch_pwr = test_config.get("measure_ch_pwr", True)
-        measure_aclr = test_config.get("measure_aclr", True)
-
-        # Current configuration for comparison
-        current_config = {
-            "resource_blocks": rb,
-            "resource_block_offset": rbo,
-            "channel_bandwidth_mhz": bw,
-            "modulation_type": mod,
-            "subcarrier_spacing_khz": scs
-        }
-
-        # Log test start details
-        logger.info(f"Starting NR5G test set {test_set}: freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, "
-                    f"rb={rb}, rbo={rbo}, bw={bw}MHz, mod={mod}, scs={scs}kHz")
-        timings = {}  # Dictionary to store timing measurements
-
-        # Check if configuration has changed
-        if previous_config != current_config:
-            logger.info("Waveform configuration changed, reconfiguring VSA/VSG")
-            _, timings["VSG_Config"] = instr.VSG_Config()  # Configure VSG
-            _, timings["VSA_Config"] = instr.VSA_Config()  # Configure VSA
-            previous_config = current_config
-        else:
-            logger.info("Waveform configuration unchanged, skipping VSA/VSG config")
-
-        # Set frequency and power
-        instr.VSx_freq(freq=freq)
-        instr.VSG_pwr(pwr=pwr)
-        config_result, timings["VSA_get_info"] = instr.VSA_get_info()  # Get configuration info
-        config = config_result
-        _, timings["VSA_sweep_evm"] = instr.VSA_sweep()  # Perform sweep for EVM
-        evm, timings["VSA_get_EVM"] = instr.VSA_get_EVM()  # Measure EVM
-        logger.info(f"NR5G EVM: {evm:.2f} dB")
-        ch_pwr = None
-        acp_l = acp_u = alt_l = alt_u = None
-        if measure_aclr:
-            aclr_vals, timings["VSA_get_ACLR"] = instr.VSA_get_ACLR()  # Measure ACLR
-            logger.info(f"NR5G ACLR: {aclr_vals}")
-            if aclr_vals:
-                aclr_parts = aclr_vals.split(',')
-                if len(aclr_parts) == 5:
-                    ch_pwr, acp_l, acp_u, alt_l, alt_u = map(float, aclr_parts)  # Parse ACLR values
-        elif measure_ch_pwr:
-            ch_pwr = instr.VSA_get_chPwr()  # Measure channel power
-            logger.info(f"NR5G Channel Power: {ch_pwr:.2f} dBm")
-        # Store results
-        results.append({
-            "test_set": test_set,
-            "type": "NR5G",
-            "center_frequency_hz": freq,
-            "power_dbm": pwr,
-            "resource_blocks": rb,
-            "resource_block_offset": rbo,
-            "channel_bandwidth_mhz": bw,
-            "modulation_type": mod,
-            "subcarrier_spacing_khz": scs,
-            "config": config,
-            "evm": evm,
-            "ch_power": ch_pwr,
-            "acp_lower": acp_l,
-            "acp_upper": acp_u,
-            "alt_lower": alt_l,
-            "alt_upper": alt_u,
-            "timings": timings
-        })
-    except Exception as e:
-        logger.error(f"NR5G test set {test_set} failed: {e}", exc_info=True)
+    instr.arm()
+    _, capture_s = instr.wait()
+    values, _ = instr.fetch()
+    steps = values["timings"]
+    if instr.use_sequencer:
+        # EVM and ACLR channels captured in one sequencer run, fetched in one query
+        timings["VSA_seq_measure"] = capture_s + steps.pop("VSA_seq_fetch")
+    else:
+        timings["VSA_sweep_evm"] = capture_s  # Capture shared by EVM and channel power
+    timings.update(steps)
+    return values["evm"], values["aclr_raw"], values["ch_power"]
 
 
-def run_lte_measurement(test_config, test_set, instr):
-    """Run LTE measurement with specified configuration.
+def acquire_nr5g_point(test_config, test_set, instr):
+    """Drive the instruments for one NR5G point (producer stage).
 
     Args:
         test_config (dict): Configuration parameters for the test.
         test_set (int): Test set identifier.
-        instr: Instrument driver instance for LTE measurements.
+        instr (MeasurementDriver): NR5G driver from open_driver("NR5G").
+
+    Returns:
+        dict: Raw point for build_record(), or None if the point failed.
     """
     global previous_config
-    try:
-        # Convert frequency to Hz and extract other parameters
-        freq = test_config["center_frequency_ghz"] * 1e9
-        pwr = test_config["power_dbm"]
-        rbo = test_config.get("resource_block_offset", 0)
-        bw = test_config.get("channel_bandwidth_mhz", 20)
-        mod = test_config.get("modulation_type", "QAM256")
-        dupl = test_config.get("duplexing", "FDD")
-        ldir = test_config.get("link_direction", "UL")
-        measure_ch_pwr = test_config.get("measure_ch_pwr", True)
-        measure_aclr = test_config.get("measure_aclr", True)
-        linkd = "UP" if ldir == "UL" else "DOWN"
-
-        # Current configuration for comparison
-        current_config = {
-            "resource_block_offset": rbo,
-            "channel_bandwidth_mhz": bw,
-            "modulation_type": mod,
-            "duplexing": dupl,
-            "link_direction": ldir
-        }
-
-        # Log test start details
-        logger.info(f"Starting LTE test set {test_set}: freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, "
-                    f"rbo={rbo}, bw={bw}MHz, mod={mod}, dupl={dupl}, ldir={ldir}, linkd={linkd}")
-        timings = {}  # Dictionary to store timing measurements
-
-        # Check if configuration has changed
-        if previous_config != current_config:
-            logger.info("Waveform configuration changed, reconfiguring VSA/VSG")
-            _, timings["VSG_Config"] = instr.VSG_Config()  # Configure VSG
-            _, timings["VSA_Config"] = instr.VSA_Config()  # Configure VSA
-            previous_config = current_config
-        else:
-            logger.info("Waveform configuration unchanged, skipping VSA/VSG config")
-
-        # Set frequency and power
-        instr.VSx_freq(freq=freq)
-        instr.VSG_pwr(pwr=pwr)
-        rb = instr.rb
-        logger.info(f"Queried resource blocks: {rb}")
-        config_result, timings["VSA_get_info"] = instr.VSA_get_info()  # Get configuration info
-        config = config_result
-        _, timings["VSA_sweep_evm"] = instr.VSA_sweep()  # Perform sweep for EVM
-        evm, timings["VSA_get_EVM"] = instr.VSA_get_EVM()  # Measure EVM
-        logger.info(f"LTE EVM: {evm:.2f} dB")
-        ch_pwr = None
-        acp_l = acp_u = alt_l = alt_u = None
-        if measure_aclr:
-            aclr_vals, timings["VSA_get_ACLR"] = instr.VSA_get_ACLR()  # Measure ACLR
-            logger.info(f"LTE ACLR: {aclr_vals}")
-            if aclr_vals:
-                aclr_parts = aclr_vals.split(',')
-                if len(aclr_parts) == 5:
-                    ch_pwr, acp_l, acp_u, alt_l, alt_u = map(float, aclr_parts)  # Parse ACLR values
-        elif measure_ch_pwr:
-            ch_pwr = instr.VSA_get_chPwr()  # Measure channel power
-            logger.info(f"LTE Channel Power/ch_pwr:.2f) dBm")
-        # Store results
-        results.append({
-            "test_set": test_set,
-            "type": "LTE",
-            "center_frequency_hz": freq,
-            "power_dbm": pwr,
-            "resource_blocks": rb,
-            "resource_block_offset": rbo,
-            "channel_bandwidth_mhz": bw,
-            "modulation_type": mod,
-            "duplexing": dupl,
-            "link_direction": ldir,
-            "config": config,
-            "evm": evm,
-            "ch_power": ch_pwr,
-            "acp_lower": acp_l,
-            "acp_upper": acp_u,
-            "alt_lower": alt_l,
-            "alt_upper": alt_u,
-            "timings": timings
-        })
-    except Exception as e:
-        logger.error(f"LTE test set {test_set} failed: {e}", exc_info=True)
+    with tracer.span(f"NR5G test set {test_set}", 'test_set', test_set=test_set) as span:
+        try:
+            # Convert frequency to Hz and extract other parameters
+            freq = test_config["center_frequency_ghz"] * 1e9
+            pwr = test_config["power_dbm"]
+            rb = test_config.get("resource_blocks", 51)
+            rbo = test_config.get("resource_block_offset", 0)
+            bw = test_config.get("channel_bandwidth_mhz", 20)
+            mod = test_config.get("modulation_type", "QAM256")
+            scs = test_config.get("subcarrier_spacing_khz", 30)
+            measure_ch_pwr = test_config.get("measure_ch_pwr", True)
+            measure_aclr = test_config.get("measure_aclr", True)
+            use_sequencer = test_config.get("use_sequencer", False)
+
+            # Current configuration for comparison
+            current_config = {
+                "resource_blocks": rb,
+                "resource_block_offset": rbo,
+                "channel_bandwidth_mhz": bw,
+                "modulation_type": mod,
+                "subcarrier_spacing_khz": scs
+            }
 
-def run_spur_search_measurement(test_config, test_set, instr):
-    """Run spur search measurement.
+            # Log test start details
+            logger.info(f"Starting NR5G test set {test_set}: freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, "
+                        f"rb={rb}, rbo={rbo}, bw={bw}MHz, mod={mod}, scs={scs}kHz")
+            timings = {}  # Dictionary to store timing measurements
+
+            # Check if configuration has changed
+            if previous_config != current_config:
+                logger.info("Waveform configuration changed, reconfiguring VSA/VSG")
+                timings.update(instr.configure())  # Configure VSG and VSA
+                previous_config = current_config
+            else:
+                logger.info("Waveform configuration unchanged, skipping VSA/VSG config")
+
+            # Set frequency (analyzer only, VSG follows via frequency sync) and power
+            _, timings["VSx_retune"] = instr.retune(freq)
+            drv = instr.driver  # Power and levelling are NR5G driver steps
+            drv.VSG_pwr(pwr=pwr)
+            if test_config.get("level_mode") == "interpolate":
+                _, timings["VSA_level_interp"] = drv.VSA_level_interp(pwr, test_config.get("power_list", [pwr]))
+            elif test_config.get("auto_level", False):
+                _, timings["VSA_level"] = drv.VSA_level()  # Cached unless miss/overload
+            config_result, timings["VSA_get_info"] = drv.VSA_get_info()  # Get configuration info
+            config = config_result
+            # Sweeps run under the watchdog: an overrun is aborted and retried
+            instr.select(measure_aclr, measure_ch_pwr, use_sequencer)
+            evm, aclr_vals, ch_pwr = watchdog.run(
+                f"NR5G test set {test_set}", drv.VSA, instr.expected_duration(), measure_point, instr, timings)
+            # Raw point; ACLR parsing happens in the pipeline
+            return {
+                "test_set": test_set,
+                "type": "NR5G",
+                "center_frequency_hz": freq,
+                "power_dbm": pwr,
+                "resource_blocks": rb,
+                "resource_block_offset": rbo,
+                "channel_bandwidth_mhz": bw,
+                "modulation_type": mod,
+                "subcarrier_spacing_khz": scs,
+                "config": config,
+                "evm": evm,
+                "ch_power": ch_pwr,
+                "aclr_raw": aclr_vals,
+                "timings": timings,
+                "trace": span.summary()
+            }
+        except Exception as e:
+            logger.error(f"NR5G test set {test_set} failed: {e}", exc_info=True)
+            return None
+
+
+def acquire_lte_point(test_config, test_set, instr):
+    """Drive the instruments for one LTE point (producer stage).
 
     Args:
         test_config (dict): Configuration parameters for the test.
         test_set (int): Test set identifier.
-        instr: SpurSearch instrument driver instance.
-    """
-    try:
-        fundamental_ghz = test_config["fundamental_frequency_ghz"]
-        rbw_mhz = test_config.get("rbw_mhz", 0.01)
-        spur_limit_dbm = test_config.get("spur_limit_dbm", -95)
-        pwr = test_config.get("power_dbm", -70)
-
-        logger.info(f"Starting SpurSearch test set {test_set}: fundamental={format_frequency(fundamental_ghz)}, "
-                    f"RBW={rbw_mhz:.3f} MHz, limit={spur_limit_dbm:.2f} dBm, power={pwr:.2f} dBm")
-        timings = {}
+        instr (MeasurementDriver): LTE driver from open_driver("LTE").
 
-        _, timings["measure"] = instr.measure()
-        results_dict = instr.get_results()
-        logger.debug(f"SpurSearch results: {results_dict}")
+    Returns:
+        dict: Raw point for build_record(), or None if the point failed.
+    """
+    global previous_config
+    with tracer.span(f"LTE test set {test_set}", 'test_set', test_set=test_set) as span:
+        try:
+            # Convert frequency to Hz and extract other parameters
+            freq = test_config["center_frequency_ghz"] * 1e9
+            pwr = test_config["power_dbm"]
+            rbo = test_config.get("resource_block_offset", 0)
+            bw = test_config.get("channel_bandwidth_mhz", 20)
+            mod = test_config.get("modulation_type", "QAM256")
+            dupl = test_config.get("duplexing", "FDD")
+            ldir = test_config.get("link_direction", "UL")
+            measure_ch_pwr = test_config.get("measure_ch_pwr", True)
+            measure_aclr = test_config.get("measure_aclr", True)
+            use_sequencer = test_config.get("use_sequencer", False)
+            linkd = "UP" if ldir == "UL" else "DOWN"
+
+            # Current configuration for comparison
+            current_config = {
+                "resource_blocks": test_config.get("resource_blocks"),
+                "resource_block_offset": rbo,
+                "channel_bandwidth_mhz": bw,
+                "modulation_type": mod,
+                "duplexing": dupl,
+                "link_direction": ldir
+            }
 
-        local_test_set = test_set
+            # Log test start details
+            logger.info(f"Starting LTE test set {test_set}: freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, "
+                        f"rbo={rbo}, bw={bw}MHz, mod={mod}, dupl={dupl}, ldir={ldir}, linkd={linkd}")
+            timings = {}  # Dictionary to store timing measurements
 
-        for freq_ghz, spurs in results_dict.items():
-            timings.update(getattr(instr, "timings", {}))
-            config = f"{freq_ghz:.3f}GHz_Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm"
-            result = {
-                "test_set": local_test_set,
-                "type": "SpurSearch",
-                "fundamental_frequency_hz": float(freq_ghz) * 1e9,
-                "rbw_hz": rbw_mhz * 1e6,
-                "spur_limit_dbm": spur_limit_dbm,
+            # Check if configuration has changed
+            if previous_config != current_config:
+                logger.info("Waveform configuration changed, reconfiguring VSA/VSG")
+                timings.update(instr.configure())  # Configure VSG and VSA
+                previous_config = current_config
+            else:
+                logger.info("Waveform configuration unchanged, skipping VSA/VSG config")
+
+            # Set frequency and power
+            _, timings["VSx_retune"] = instr.retune(freq)
+            drv = instr.driver  # Power and levelling are LTE driver steps
+            drv.VSG_pwr(pwr=pwr)
+            if test_config.get("level_mode") == "interpolate":
+                _, timings["VSA_level_interp"] = drv.VSA_level_interp(pwr, test_config.get("power_list", [pwr]))
+            rb = drv.rb  # From the LTE bandwidth table
+            config_result, timings["VSA_get_info"] = drv.VSA_get_info()  # Get configuration info
+            config = config_result
+            # Sweeps run under the watchdog: an overrun is aborted and retried
+            instr.select(measure_aclr, measure_ch_pwr, use_sequencer)
+            evm, aclr_vals, ch_pwr = watchdog.run(
+                f"LTE test set {test_set}", drv.VSA, instr.expected_duration(), measure_point, instr, timings)
+            # Raw point; ACLR parsing happens in the pipeline
+            return {
+                "test_set": test_set,
+                "type": "LTE",
+                "center_frequency_hz": freq,
                 "power_dbm": pwr,
-                "spurs": [{"frequency_hz": freq_hz, "power_dbm": power_dbm} for freq_hz, power_dbm in spurs],
+                "resource_blocks": rb,
+                "resource_block_offset": rbo,
+                "channel_bandwidth_mhz": bw,
+                "modulation_type": mod,
+                "duplexing": dupl,
+                "link_direction": ldir,
                 "config": config,
-                "timings": timings.copy()
+                "evm": evm,
+                "ch_power": ch_pwr,
+                "aclr_raw": aclr_vals,
+                "timings": timings,
+                "trace": span.summary()
             }
-            if not spurs:
-                result["error"] = "No spurs detected"
-            results.append(result)
-            local_test_set += 1
-        return local_test_set
-    except Exception as e:
-        logger.error(f"SpurSearch test set {test_set} failed: {e}", exc_info=True)
-        results.append({
-            "test_set": test_set,
-            "type": "SpurSearch",
-            "fundamental_frequency_hz": None,
-            "rbw_hz": rbw_mhz * 1e6,
-            "spur_limit_dbm": spur_limit_dbm,
-            "power_dbm": pwr,
-            "spurs": [],
-            "config": f"Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm",
-            "timings": timings,
-            "error": str(e)
-        })
-        return test_set + 1
+        except Exception as e:
+            logger.error(f"LTE test set {test_set} failed: {e}", exc_info=True)
+            return None
+
+
+def build_record(point):
+    """Parse a raw LTE/NR5G point into a result record (pipeline stage).
+
+    Args:
+        point (dict): Raw point from acquire_lte_point()/acquire_nr5g_point().
+
+    Returns:
+        dict: Result record with ACLR values split out.
+    """
+    if "aclr_raw" not in point:
+        return point  # Finished STN/SpurSearch record
+    record = dict(point)
+    aclr_vals = record.pop("aclr_raw")
+    trace = record.pop("trace")
+    kind = record["type"]
+    logger.info(f"{kind} EVM: {record['evm']:.2f} dB")
+    acp_l = acp_u = alt_l = alt_u = None
+    if aclr_vals is not None:
+        logger.info(f"{kind} ACLR: {aclr_vals}")
+        if aclr_vals:
+            aclr_parts = aclr_vals.split(',')
+            if len(aclr_parts) == 5:
+                record["ch_power"], acp_l, acp_u, alt_l, alt_u = map(float, aclr_parts)  # Parse ACLR values
+    elif record["ch_power"] is not None:
+        logger.info(f"{kind} Channel Power: {record['ch_power']:.2f} dBm")
+    timings = record.pop("timings")
+    record.update({
+        "acp_lower": acp_l,
+        "acp_upper": acp_u,
+        "alt_lower": alt_l,
+        "alt_upper": alt_u,
+        "timings": timings
+    })
+    if trace:
+        record["trace"] = trace  # Span timeline of this test set
+    return record
+
+
+class ResultSink:
+    """Persistence stage: collects records and streams them to a JSON Lines file."""
+
+    def __init__(self, path):
+        """Open the stream file.
+
+        Args:
+            path (str): Path of the .jsonl file, truncated on open.
+        """
+        self.path = path
+        self.file = open(path, 'w')
+
+    def __call__(self, record):
+        """Append a record to the results and flush it to disk."""
+        store_record(record)
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        """Close the stream file."""
+        self.file.close()
+
+
+def store_record(record):
+    """Append a record to the in-memory results."""
+    results.append(record)
+
 
-# In your main block, replace the SpurSearch section with:
-spur_instr = None
-for test in inputs.get("spur_search", []):
-    if test.get("run", False):
-        logger.debug(f"Processing SpurSearch test: {test}")
+def run_stn_measurement(stn_instr, freq, test_set, swp_time=1.0, iterations=10, emit=None):
+    """Run STN measurement with specified configuration.
+
+    Args:
+        stn_instr (MeasurementDriver): STN driver from open_driver("STN").
+        freq (float): Center frequency in Hz.
+        test_set (int): Test set identifier.
+        swp_time (float): Sweep time in seconds, default 1.0.
+        iterations (int): Number of measurement iterations, default 10.
+        emit (callable, optional): Receives the record, default store_record.
+    """
+    emit = emit or store_record
+    logger.debug(f"Starting STN test set {test_set}: freq={freq / 1e9:.3f}GHz, iterations={iterations}")
+    with tracer.span(f"STN test set {test_set}", 'test_set', test_set=test_set) as span:
         try:
-            if spur_instr is None:
-                spur_instr = SpurSearch(
-                    fundamental_frequency_ghz=test["fundamental_frequency_ghz"],
-                    rbw_mhz=test.get("rbw_mhz", 0.01),
-                    spur_limit_dbm=test.get("spur_limit_dbm", -95),
-                    power_dbm=test.get("power_dbm", -70)
-                )
-            print(f"\n=== Test Set {test_set} (SpurSearch) ===")
-            test_set = run_spur_search_measurement(test, test_set, spur_instr)
+            timings = {}  # Dictionary to store timing measurements
+            timings.update(stn_instr.configure())  # Configure VSA for STN
+            expected_s = stn_instr.expected_duration()  # Sweep time x averages
+            meas = []  # List to store measurement results
+            for i in range(iterations):
+                try:
+                    # Arm, wait and fetch the noise marker; an overrun is aborted and retried
+                    values, delta_time = watchdog.run(f"STN test set {test_set} iteration {i + 1}",
+                                                      stn_instr.driver.VSA, expected_s, stn_instr.measure)
+                    marker = values["marker"]
+                    meas.append({"marker": float(marker), "meas_time": float(delta_time)})
+                    logger.info(f"STN iteration {i + 1}: marker={marker:.2f}dBm, meas_time={delta_time:.3f}sec")
+                    timings[f"get_VSA_sweep_noise_mkr_{i + 1}"] = delta_time
+                except Exception as e:
+                    logger.error(f"STN iteration {i + 1} failed: {e}", exc_info=True)
+                    continue
+            stats = None
+            if iterations >= 2 and meas:
+                stats = stn_instr.driver.get_Array_stats([m["marker"] for m in meas])  # Calculate stats
+            result = {
+                "test_set": test_set,
+                "type": "STN",
+                "center_frequency_hz": freq,
+                "sweep_time": swp_time,
+                "iterations": iterations,
+                "config": f"{freq / 1e9:.3f}GHz_STN_{swp_time:.1f}sec",
+                "markers": meas,
+                "stats": stats,
+                "timings": timings
+            }
+            if not meas:
+                result["error"] = "No successful measurements"
+            trace = span.summary()
+            if trace:
+                result["trace"] = trace  # Span timeline of this test set
+            emit(result)
         except Exception as e:
-            logger.error(f"SpurSearch test initialization failed: {e}", exc_info=True)
+            logger.error(f"STN measurement failed for test set {test_set}: {e}", exc_info=True)
+            emit({
+                "test_set": test_set,
+                "type": "STN",
+                "center_frequency_hz": freq,
+                "sweep_time": swp_time,
+                "iterations": iterations,
+                "config": f"{freq / 1e9:.3f}GHz_STN_{swp_time:.1f}sec",
+                "markers": [],
+                "stats": None,
+                "timings": {},
+                "error": str(e)
+            })
+
 
-def run_spur_search_measurement(test_config, test_set, instr):
-    """Run spur search measurement.
+def run_spur_search_measurement(test_config, test_set, instr, emit=None):
+    """Run spur search measurement for the fundamental set on the driver.
 
     Args:
         test_config (dict): Configuration parameters for the test.
         test_set (int): Test set identifier.
-        instr: SpurSearch instrument driver instance.
+        instr (MeasurementDriver): SpurSearch driver from open_driver("SpurSearch"),
+            retuned to the fundamental.
+        emit (callable, optional): Receives the record, default store_record.
+
+    Returns:
+        int: Next test set identifier.
     """
-    try:
-        # Extract configuration parameters
-        fundamental_ghz = test_config["fundamental_frequency_ghz"]
-        rbw_mhz = test_config.get("rbw_mhz", 0.01)
-        spur_limit_dbm = test_config.get("spur_limit_dbm", -95)
-        pwr = test_config.get("power_dbm", -70)
-
-        # Log test start details
-        logger.info(f"Starting SpurSearch test set {test_set}: fundamental={format_frequency(fundamental_ghz)}, "
-                    f"RBW={rbw_mhz:.3f} MHz, limit={spur_limit_dbm:.2f} dBm, power={pwr:.2f} dBm")
-        timings = {}  # Dictionary to store timing measurements
-
-        # Perform measurement
-        _, timings["measure"] = instr.measure()
-        results_dict = instr.get_results()  # Get dictionary {freq_ghz: [(freq_hz, power_dbm), ...]}
-        logger.debug(f"SpurSearch results: {results_dict}")
-
-        # Use global test_set counter from outer scope
-        global test_set
-        local_test_set = test_set  # Track starting test_set
-
-        # Format results for each fundamental frequency
-        for freq_ghz, spurs in results_dict.items():
-            # Aggregate timings from SpurSearch (if available)
-            timings.update(getattr(instr, "timings", {}))
-            config = f"{freq_ghz:.3f}GHz_Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm"
+    emit = emit or store_record
+    fundamental_ghz = instr.driver.fundamental_ghz
+    rbw_mhz = test_config.get("rbw_mhz", 0.01)
+    spur_limit_dbm = test_config.get("spur_limit_dbm", -95)
+    pwr = test_config.get("power_dbm", -70)
+    timings = {}  # Dictionary to store timing measurements
+    with tracer.span(f"SpurSearch test set {test_set}", 'test_set', test_set=test_set) as span:
+        try:
+            # Log test start details
+            logger.info(f"Starting SpurSearch test set {test_set}: fundamental={format_frequency(fundamental_ghz)}, "
+                        f"RBW={rbw_mhz:.3f} MHz, limit={spur_limit_dbm:.2f} dBm, power={pwr:.2f} dBm")
+
+            # Configure VSG and VSA
+            timings.update(instr.configure())
+
+            # Perform measurement; an overrun is aborted and retried
+            def sweep():
+                instr.arm()
+                _, timings["measure"] = instr.wait()
+                values, timings["get_results"] = instr.fetch()
+                return values["spurs"]  # List of (freq_hz, power_dbm)
+
+            spurs = watchdog.run(f"SpurSearch test set {test_set}", instr.driver.VSA,
+                                 instr.expected_duration(), sweep)
+            logger.debug(f"SpurSearch results for {fundamental_ghz:.3f} GHz: {spurs}")
+
             result = {
-                "test_set": local_test_set,
+                "test_set": test_set,
                 "type": "SpurSearch",
-                "fundamental_frequency_hz": float(freq_ghz) * 1e9,
+                "fundamental_frequency_hz": float(fundamental_ghz) * 1e9,
                 "rbw_hz": rbw_mhz * 1e6,
                 "spur_limit_dbm": spur_limit_dbm,
                 "power_dbm": pwr,
                 "spurs": [{"frequency_hz": freq_hz, "power_dbm": power_dbm} for freq_hz, power_dbm in spurs],
-                "config": config,
-                "timings": timings.copy()  # Copy to avoid reusing across frequencies
+                "config": f"{fundamental_ghz:.3f}GHz_Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm",
+                "timings": timings
             }
             if not spurs:
                 result["error"] = "No spurs detected"
-            results.append(result)
-            local_test_set += 1  # Increment for each frequency
-        test_set = local_test_set  # Update global test_set
-    except Exception as e:
-        logger.error(f"SpurSearch test set {test_set} failed: {e}", exc_info=True)
-        results.append({
-            "test_set": test_set,
-            "type": "SpurSearch",
-            "fundamental_frequency_hz": None,
-            "rbw_hz": rbw_mhz * 1e6,
-            "spur_limit_dbm": spur_limit_dbm,
-            "power_dbm": pwr,
-            "spurs": [],
-            "config": f"Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm",
-            "timings": timings,
-            "error": str(e)
-        })
-        test_set += 1 # Increment test_set for each fundamental frequency
-    except Exception as e:
-        logger.error(f"SpurSearch test set {test_set} failed: {e}", exc_info=True)
-        results.append({
-            "test_set": test_set,
-            "type": "SpurSearch",
-            "fundamental_frequency_hz": None,
-            "rbw_hz": rbw_mhz * 1e6,
-            "spur_limit_dbm": spur_limit_dbm,
-            "power_dbm": pwr,
-            "spurs": [],
-            "config": f"Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm",
-            "timings": timings,
-            "error": str(e)
-        })
-
-if __name__ == '__main__':
-    # Log script start
-    logger.info("Starting RF measurement script")
-    json_path = os.path.join(os.path.dirname(__file__), 'test_inputs.json')
-    # Default test inputs
-    default_inputs = {
-        "lte": [{
-            "run": True,
-            "center_frequency_ghz": 6.201,
-            "power_dbm": [-5.0],
-            "resource_block_offset": 0,
-            "channel_bandwidth_mhz": 5,
-            "modulation_type": "QPSK",
-            "duplexing": "TDD",
-            "link_direction": "UL",
-            "measure_ch_pwr": True,
-            "measure_aclr": True
-        }],
-        "nr5g": [],
-        "STN": [{
-            "run": True,
-            "center_frequency_ghz": 6.321,
-            "iterations": 3
-        }],
-        "spur_search": [{
-            "run": True,
-            "fundamental_frequency_ghz": 6.0,
-            "rbw_mhz": 0.01,
-            "spur_limit_dbm": -95,
-            "power_dbm": -10.0
-        }]
-    }
-    try:
-        # Load test inputs from JSON file
-        with open(json_path, 'r') as f:
-            inputs = json.load(f)
-        logger.info(f"Loaded test inputs from {json_path}")
-    except Exception as e:
-        logger.error(f"Error reading JSON file: {e}", exc_info=True)
-        print(f"Error reading JSON file: {e}")
-        inputs = default_inputs
-
-    logger.debug(f"Test inputs: {json.dumps(inputs, indent=2)}")
-
-    test_set = 1  # Initialize test set counter
-    # Process LTE tests
-    for test in inputs.get("lte", []):
-        if test.get("run", False):
-            logger.debug(f"Processing LTE test: {test}")
-            frequencies = test["center_frequency_ghz"] if isinstance(test["center_frequency_ghz"], list) else [
-                test["center_frequency_ghz"]]
-            try:
-                instr = LTE(freq=frequencies[0] * 1e9, pwr=test["power_dbm"][0], rb=None,
-                            rbo=test.get("resource_block_offset", 0),
-                            bw=test.get("channel_bandwidth_mhz", 20), mod=test.get("modulation_type", "QAM256"),
-                            dupl=test.get("duplexing", "FDD"), ldir=test.get("link_direction", "UL"))
-                for freq in frequencies:
-                    for pwr in test["power_dbm"]:
-                        test_config = test.copy()
-                        test_config["center_frequency_ghz"] = freq
-                        test_config["power_dbm"] = pwr
-                        print(f"\n=== Test Set {test_set} (LTE) ===")
-                        print(f"LTE Freq: {freq:.3f} GHz, Power: {pwr:.2f} dBm")
-                        run_lte_measurement(test_config, test_set, instr)
-                        test_set += 1
-                LTE.close_connections(self=instr)  # Close LTE connections
-            except Exception as e:
-                logger.error(f"LTE test initialization failed: {e}", exc_info=True)
-
-    previous_config = None
-    instr = None
-    # Process NR5G tests
-    for test in inputs.get("nr5g", []):
-        if test.get("run", False):
-            logger.debug(f"Processing NR5G test: {test}")
-            frequencies = test["center_frequency_ghz"] if isinstance(test["center_frequency_ghz"], list) else [
-                test["center_frequency_ghz"]]
-            try:
-                if instr is None:
-                    instr = NR5GDriver(freq=frequencies[0] * 1e9, pwr=test["power_dbm"][0],
-                                       rb=test.get("resource_blocks", 51),
-                                       rbo=test.get("resource_block_offset", 0),
-                                       bw=test.get("channel_bandwidth_mhz", 20),
-                                       mod=test.get("modulation_type", "QAM256"),
-                                       scs=test.get("subcarrier_spacing_khz", 30))
-                for freq in frequencies:
-                    for pwr in test["power_dbm"]:
-                        test_config = test.copy()
-                        test_config["center_frequency_ghz"] = freq
-                        test_config["power_dbm"] = pwr
-                        print(f"\n=== Test Set {test_set} (NR5G) ===")
-                        run_nr5g_measurement(test_config, test_set, instr)
-                        test_set += 1
-            except Exception as e:
-                logger.error(f"NR5G test initialization failed: {e}", exc_info=True)
-
-    stn_instr = None
-    # Process STN tests
-    for test in inputs.get("STN", []):
-        if test.get("run", False):
-            logger.debug(f"Processing STN test: {test}")
-            freq_input = test.get("center_frequency_ghz")
-            try:
-                if isinstance(freq_input, dict) and "range" in freq_input:
-                    range_config = freq_input["range"]
-                    start_ghz = range_config.get("start_ghz")
-                    stop_ghz = range_config.get("stop_ghz")
-                    step_mhz = range_config.get("step_mhz")
-                    if None in [start_ghz, stop_ghz, step_mhz]:
-                        raise ValueError(f"Missing range parameters: {range_config}")
-                    if not all(isinstance(x, (int, float)) for x in [start_ghz, stop_ghz, step_mhz]):
-                        raise ValueError(f"Invalid range parameter types: {range_config}")
-                    if start_ghz > stop_ghz:
-                        raise ValueError(f"Start frequency ({start_ghz} GHz) exceeds stop ({stop_ghz} GHz)")
-                    if step_mhz <= 0:
-                        raise ValueError(f"Invalid step size: {step_mhz} MHz")
-                    num_steps = int((stop_ghz - start_ghz) / (step_mhz / 1000.0)) + 1
-                    frequencies = np.linspace(start_ghz, stop_ghz, num_steps).tolist()
-                    logger.info(f"Generated {len(frequencies)} frequencies: {frequencies} GHz")
-                    if len(frequencies) > 100:
-                        logger.warning(f"Large frequency count ({len(frequencies)}). Estimated runtime: "
-                                       f"{len(frequencies) * test.get('iterations', 10) * 1.0:.0f}s")
-                elif isinstance(freq_input, (list, float, int)):
-                    frequencies = freq_input if isinstance(freq_input, list) else [freq_input]
-                    logger.info(f"Using discrete frequencies: {frequencies} GHz")
-                else:
-                    raise ValueError(f"Invalid center_frequency_ghz format: {freq_input}")
-            except Exception as e:
-                logger.error(f"Failed to process frequency input: {e}", exc_info=True)
-                continue
-
-            iterations = test.get("iterations", 10)
-            for freq in frequencies:
-                logger.info(f"Preparing STN test set {test_set} at {freq:.3f} GHz")
-                print(f"\n=== Test Set {test_set} (STN) ===")
-                print(f"STN Freq: {freq:.3f} GHz, Iterations: {iterations}")
-                try:
-                    if stn_instr is None:
-                        logger.debug("Initializing new STN instrument")
-                        stn_instr = STN(freq=freq * 1e9)
-                    else:
-                        logger.debug(f"Reusing STN instrument, setting freq to {freq * 1e9:.3f} Hz")
-                        stn_instr.STN_set_frequency(freq * 1e9)
-                    run_stn_measurement(stn_instr, freq * 1e9, test_set, iterations=iterations)
-                    test_set += 1
-                except Exception as e:
-                    logger.error(f"STN test set {test_set} failed: {e}", exc_info=True)
-
-
-    def run_spur_search_measurement(test_config, test_set, instr):
-        """Run spur search measurement.
-
-        Args:
-            test_config (dict): Configuration parameters for the test.
-            test_set (int): Test set identifier.
-            instr: SpurSearch instrument driver instance.
-        """
-        try:
-            # Extract configuration parameters
-            fundamental_ghz = test_config["fundamental_frequency_ghz"]
-            rbw_mhz = test_config.get("rbw_mhz", 0.01)
-            spur_limit_dbm = test_config.get("spur_limit_dbm", -95)
-            pwr = test_config.get("power_dbm", -70)
-
-            # Log test start details
-            logger.info(f"Starting SpurSearch test set {test_set}: fundamental={format_frequency(fundamental_ghz)}, "
-                        f"RBW={rbw_mhz:.3f} MHz, limit={spur_limit_dbm:.2f} dBm, power={pwr:.2f} dBm")
-            timings = {}  # Dictionary to store timing measurements
-
-            # Perform measurement
-            _, timings["measure"] = instr.measure()
-            results_dict = instr.get_results()  # Get dictionary {freq_ghz: [(freq_hz, power_dbm), ...]}
-            logger.debug(f"SpurSearch results: {results_dict}")
-
-            # Use global test_set counter from outer scope
-            global test_set
-            local_test_set = test_set  # Track starting test_set
-
-            # Format results for each fundamental frequency
-            for freq_ghz, spurs in results_dict.items():
-                # Aggregate timings from SpurSearch (if available)
-                timings.update(getattr(instr, "timings", {}))
-                config = f"{freq_ghz:.3f}GHz_Spur_RBW{rbw_mhz:.3f}MHz_Limit{spur_limit_dbm:.2f}dBm"
-                result = {
-                    "test_set": local_test_set,
-                    "type": "SpurSearch",
-                    "fundamental_frequency_hz": float(freq_ghz) * 1e9,
-                    "rbw_hz": rbw_mhz * 1e6,
-                    "spur_limit_dbm": spur_limit_dbm,
-                    "power_dbm": pwr,
-                    "spurs": [{"frequency_hz": freq_hz, "power_dbm": power_dbm} for freq_hz, power_dbm in spurs],
-                    "config": config,
-                    "timings": timings.copy()  # Copy to avoid reusing across frequencies
-                }
-                if not spurs:
-                    result["error"] = "No spurs detected"
-                results.append(result)
-                local_test_set += 1  # Increment for each frequency
-            test_set = local_test_set  # Update global test_set
+            trace = span.summary()
+            if trace:
+                result["trace"] = trace  # Span timeline of this test set
+            emit(result)
         except Exception as e:
             logger.error(f"SpurSearch test set {test_set} failed: {e}", exc_info=True)
-            results.append({
+            emit({
                 "test_set": test_set,
                 "type": "SpurSearch",
                 "fundamental_frequency_hz": None,
@@ -593,35 +437,222 @@ if __name__ == '__main__':
                 "timings": timings,
                 "error": str(e)
             })
-            test_set += 1
+    return test_set + 1
+
+
+class RunContext:
+    """State shared by the block runners of one campaign."""
 
-    # Close NR5G connections
-    if instr:
+    def __init__(self, pipeline):
+        """Start a campaign.
+
+        Args:
+            pipeline (Pipeline): Host-side stages records are submitted to.
+        """
+        self.pipeline = pipeline
+        self.test_set = 1
+        self.instruments = {}  # Measurement type -> MeasurementDriver kept open for the session
+
+    def emit(self, record):
+        """Hand a raw LTE/NR5G point or a finished record to the pipeline."""
+        if record:
+            self.pipeline.submit(record)
+
+    def close(self):
+        """Tear down every driver kept open for the session."""
+        for kind, instr in self.instruments.items():
+            try:
+                instr.teardown()
+            except Exception as e:
+                logger.error(f"Error closing {kind} connections: {e}", exc_info=True)
+        self.instruments.clear()
+
+
+RUNNERS = {}  # test_inputs.json section -> block runner, in campaign order
+
+
+def register(section):
+    """Register a block runner for a test_inputs.json section.
+
+    A block runner takes (test, ctx), runs every point of one enabled test
+    block and emits its records through ctx; new measurement types only
+    need a runner here, not changes to run_campaign().
+
+    Args:
+        section (str): Section name, e.g. "lte".
+    """
+    def decorator(runner):
+        RUNNERS[section] = runner
+        return runner
+    return decorator
+
+
+@register("lte")
+def run_lte_block(test, ctx):
+    """Run one LTE test block; a driver is created per block."""
+    frequencies = test["center_frequency_ghz"]  # Normalized to a list by the plan
+    try:
+        lte_instr = open_driver("LTE", freq=frequencies[0] * 1e9, pwr=test["power_dbm"][0],
+                                rb=test.get("resource_blocks"),  # Full allocation for bw if omitted
+                                rbo=test.get("resource_block_offset", 0),
+                                bw=test.get("channel_bandwidth_mhz", 20),
+                                mod=test.get("modulation_type", "QAM256"),
+                                dupl=test.get("duplexing", "FDD"), ldir=test.get("link_direction", "UL"))
+    except Exception as e:
+        logger.error(f"LTE test initialization failed: {e}", exc_info=True)
+        return
+    try:
+        for freq in frequencies:
+            for pwr in test["power_dbm"]:
+                test_config = test.copy()
+                test_config["center_frequency_ghz"] = freq
+                test_config["power_dbm"] = pwr
+                test_config["power_list"] = test["power_dbm"]  # For level interpolation
+                print(f"\n=== Test Set {ctx.test_set} (LTE) ===")
+                print(f"LTE Freq: {freq:.3f} GHz, Power: {pwr:.2f} dBm")
+                ctx.emit(acquire_lte_point(test_config, ctx.test_set, lte_instr))
+                ctx.test_set += 1
+    finally:
+        lte_instr.teardown()  # Close LTE connections
+
+
+@register("nr5g")
+def run_nr5g_block(test, ctx):
+    """Run one NR5G test block on the session's shared NR5G driver."""
+    frequencies = test["center_frequency_ghz"]  # Normalized to a list by the plan
+    instr = ctx.instruments.get("NR5G")
+    if instr is None:
         try:
-            NR5GDriver.close_connections()
+            instr = open_driver("NR5G", freq=frequencies[0] * 1e9, pwr=test["power_dbm"][0],
+                                rb=test.get("resource_blocks", 51),
+                                rbo=test.get("resource_block_offset", 0),
+                                bw=test.get("channel_bandwidth_mhz", 20),
+                                mod=test.get("modulation_type", "QAM256"),
+                                scs=test.get("subcarrier_spacing_khz", 30))
         except Exception as e:
-            logger.error(f"Error closing NR5G connections: {e}", exc_info=True)
-    # Close STN connections
-    if stn_instr:
+            logger.error(f"NR5G test initialization failed: {e}", exc_info=True)
+            return
+        ctx.instruments["NR5G"] = instr
+    for freq in frequencies:
+        for pwr in test["power_dbm"]:
+            test_config = test.copy()
+            test_config["center_frequency_ghz"] = freq
+            test_config["power_dbm"] = pwr
+            test_config["power_list"] = test["power_dbm"]  # For level interpolation
+            print(f"\n=== Test Set {ctx.test_set} (NR5G) ===")
+            ctx.emit(acquire_nr5g_point(test_config, ctx.test_set, instr))
+            ctx.test_set += 1
+
+
+@register("STN")
+def run_stn_block(test, ctx):
+    """Run one STN test block on the session's shared STN driver."""
+    iterations = test.get("iterations", 10)
+    try:
+        frequencies = expand_frequencies(test.get("center_frequency_ghz"))
+    except ValueError as e:
+        logger.error(f"STN test block skipped: {e}")
+        return
+    for freq in frequencies:
+        logger.info(f"Preparing STN test set {ctx.test_set} at {freq:.3f} GHz")
+        print(f"\n=== Test Set {ctx.test_set} (STN) ===")
+        print(f"STN Freq: {freq:.3f} GHz, Iterations: {iterations}")
         try:
-            stn_instr.close_connections()
+            stn_instr = ctx.instruments.get("STN")
+            if stn_instr is None:
+                logger.debug("Initializing new STN instrument")
+                stn_instr = ctx.instruments["STN"] = open_driver("STN", freq=freq * 1e9)
+            else:
+                logger.debug(f"Reusing STN instrument, setting freq to {freq * 1e9:.3f} Hz")
+                stn_instr.retune(freq * 1e9)
+            run_stn_measurement(stn_instr, freq * 1e9, ctx.test_set, iterations=iterations, emit=ctx.emit)
+            ctx.test_set += 1
         except Exception as e:
-            logger.error(f"Error closing STN connections: {e}", exc_info=True)
-    # Close SpurSearch connections
-    if spur_instr:
+            logger.error(f"STN test set {ctx.test_set} failed: {e}", exc_info=True)
+
+
+@register("spur_search")
+def run_spur_block(test, ctx):
+    """Run one spur search test block on the session's shared SpurSearch driver."""
+    try:
+        frequencies = expand_frequencies(test.get("fundamental_frequency_ghz"))
+    except ValueError as e:
+        logger.error(f"SpurSearch test block skipped: {e}")
+        return
+    for freq_ghz in frequencies:
+        print(f"\n=== Test Set {ctx.test_set} (SpurSearch) ===")
+        print(f"SpurSearch Fundamental: {format_frequency(freq_ghz)}")
         try:
-            spur_instr.close()
+            spur_instr = ctx.instruments.get("SpurSearch")
+            if spur_instr is None:
+                spur_instr = ctx.instruments["SpurSearch"] = open_driver(
+                    "SpurSearch",
+                    fundamental_ghz=freq_ghz,
+                    rbw_mhz=test.get("rbw_mhz", 0.01),
+                    spur_limit_dbm=test.get("spur_limit_dbm", -95),
+                    pwr=test.get("power_dbm", -70)
+                )
+            else:
+                # Block settings apply on the next configure()
+                spur_instr.driver.rbw_mhz = test.get("rbw_mhz", 0.01)
+                spur_instr.driver.spur_limit_dbm = test.get("spur_limit_dbm", -95)
+                spur_instr.driver.pwr = test.get("power_dbm", -70)
+                spur_instr.retune(freq_ghz * 1e9)
+            ctx.test_set = run_spur_search_measurement(test, ctx.test_set, spur_instr, emit=ctx.emit)
         except Exception as e:
-            logger.error(f"Error closing SpurSearch connections: {e}", exc_info=True)
+            logger.error(f"SpurSearch test set {ctx.test_set} for {freq_ghz:.3f} GHz failed: {e}",
+                         exc_info=True)
+            ctx.test_set += 1
 
-    # Save results to JSON
-    results_path = os.path.join(os.path.dirname(__file__), 'results_output.json')
+
+def run_campaign(plan, jsonl_path):
+    """Run every enabled test block of a plan through the registered runners.
+
+    The calling thread drives the instruments; records are parsed and
+    streamed to disk by the pipeline while the next point is captured.
+
+    Args:
+        plan (Plan): Compiled test plan.
+        jsonl_path (str): JSON Lines file records are streamed to.
+
+    Returns:
+        int: Records dropped because a pipeline stage failed on them.
+    """
+    global previous_config
+    sink = ResultSink(jsonl_path)
+    ctx = None
     try:
-        with open(results_path, 'w') as outfile:
-            json.dump(results, outfile, indent=2)
-        logger.info(f"Saved results to: {results_path}")
-    except Exception as e:
-        logger.error(f"Error saving JSON results: {e}", exc_info=True)
+        with Pipeline([build_record, sink], name='rf') as pipeline:
+            ctx = RunContext(pipeline)
+            for section, runner in RUNNERS.items():
+                previous_config = None  # Each measurement type starts unconfigured
+                for test in plan.inputs.get(section, []):
+                    if test.get("run", False):
+                        logger.debug(f"Processing {section} test: {test}")
+                        runner(test, ctx)
+        if pipeline.errors:
+            logger.error(f"{len(pipeline.errors)} result records were dropped by failing pipeline stages")
+            print(f"WARNING: {len(pipeline.errors)} result records were dropped, see the log for details")
+        return len(pipeline.errors)
+    finally:
+        sink.close()
+        if ctx:
+            ctx.close()
+        if watchdog.overruns:
+            logger.warning(f"Watchdog aborted {watchdog.overruns} overrunning sweeps")
+
+
+def export_excel(results, excel_path):
+    """Write results to an Excel sheet, one row per point, marker or spur.
+
+    pandas (and openpyxl through it) is imported here rather than at startup.
+
+    Args:
+        results (list): Result records.
+        excel_path (str): Output .xlsx path.
+    """
+    import re
+    import pandas as pd
 
     # Create DataFrame for results
     if not results:
@@ -644,7 +675,8 @@ if __name__ == '__main__':
                 total_test_time = sum([
                     timings.get("VSA_sweep_evm", 0),
                     timings.get("VSA_get_EVM", 0),
-                    timings.get("VSA_get_ACLR", 0)
+                    timings.get("VSA_get_ACLR", 0),
+                    timings.get("VSA_seq_measure", 0)
                 ])
                 total_test_time_sum += total_test_time
                 base = {
@@ -710,11 +742,11 @@ if __name__ == '__main__':
                             "Power (dBm)": entry["power_dbm"],
                             "Spur Frequency (MHz)": spur["frequency_hz"] / 1e6,
                             "Spur Power (dBm)": spur["power_dbm"],
-                            "Spur Measurement Time (s)": timings.get(f"get_results_{entry['fundamental_frequency_hz']/1e9}", 0),
+                            "Spur Measurement Time (s)": timings.get("get_results", 0),
                             "Total Test Time (s)": total_test_time if i == 1 else None,
                             "Config Summary": entry.get("config"),
-                            "VSA_Config Time (s)": timings.get(f"VSA_config_{entry['fundamental_frequency_hz']/1e9}", 0) if i == 1 else None,
-                            "VSG_Config Time (s)": timings.get(f"VSG_config_{entry['fundamental_frequency_hz']/1e9}", 0) if i == 1 else None
+                            "VSA_Config Time (s)": timings.get("VSA_config", 0) if i == 1 else None,
+                            "VSG_Config Time (s)": timings.get("VSG_config", 0) if i == 1 else None
                         }
                         if "error" in entry:
                             base["Error"] = entry.get("error")
@@ -729,11 +761,11 @@ if __name__ == '__main__':
                         "Power (dBm)": entry["power_dbm"],
                         "Spur Frequency (MHz)": None,
                         "Spur Power (dBm)": None,
-                        "Spur Measurement Time (s)": timings.get(f"get_results_{entry['fundamental_frequency_hz']/1e9}", 0) if entry["fundamental_frequency_hz"] else 0,
+                        "Spur Measurement Time (s)": timings.get("get_results", 0) if entry["fundamental_frequency_hz"] else 0,
                         "Total Test Time (s)": total_test_time,
                         "Config Summary": entry.get("config"),
-                        "VSA_Config Time (s)": timings.get(f"VSA_config_{entry['fundamental_frequency_hz']/1e9}", 0),
-                        "VSG_Config Time (s)": timings.get(f"VSG_config_{entry['fundamental_frequency_hz']/1e9}", 0),
+                        "VSA_Config Time (s)": timings.get("VSA_config", 0),
+                        "VSG_Config Time (s)": timings.get("VSG_config", 0),
                         "Error": entry.get("error", "No spurs detected")
                     }
                     rows.append(base)
@@ -760,9 +792,119 @@ if __name__ == '__main__':
             logger.error(f"Error formatting Spur columns: {e}", exc_info=True)
 
     # Save results to Excel
-    excel_path = os.path.join(os.path.dirname(__file__), 'results_output.xlsx')
     try:
         df.to_excel(excel_path, index=False)
         logger.info(f"Successfully saved to: {excel_path}")
     except Exception as e:
-        logger.error(f"Error saving Excel results: {e}", exc_info=True)
\ No newline at end of file
+        logger.error(f"Error saving Excel results: {e}", exc_info=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run RF measurements (LTE, NR5G, STN, SpurSearch)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="expand and cost the test plan without touching the bench")
+    args = parser.parse_args()
+    # Configure logging to file and console; records are written by a background thread
+    configure_logging(
+        log_dir,
+        level=logging.DEBUG,
+        module_levels={
+            'src.measurements': logging.INFO,  # Drivers log every step at INFO
+            'src.instruments': logging.INFO,
+        },
+        scpi_mode='ring'  # SCPI traffic is only written when a command fails
+    )
+    # Log script start
+    logger.info("Starting RF measurement script")
+    json_path = os.path.join(os.path.dirname(__file__), 'test_inputs.json')
+    # Default test inputs
+    default_inputs = {
+        "lte": [{
+            "run": True,
+            "center_frequency_ghz": 6.201,
+            "power_dbm": [-5.0],
+            "resource_block_offset": 0,
+            "channel_bandwidth_mhz": 5,
+            "modulation_type": "QPSK",
+            "duplexing": "TDD",
+            "link_direction": "UL",
+            "measure_ch_pwr": True,
+            "measure_aclr": True
+        }],
+        "nr5g": [],
+        "STN": [{
+            "run": True,
+            "center_frequency_ghz": 6.321,
+            "iterations": 3
+        }],
+        "spur_search": [{
+            "run": True,
+            "fundamental_frequency_ghz": 6.0,
+            "rbw_mhz": 0.01,
+            "spur_limit_dbm": -95,
+            "power_dbm": -10.0
+        }]
+    }
+    try:
+        # Schema-validated, expanded and cached by file hash
+        plan = load_plan(json_path)
+        logger.info(f"Loaded test plan from {json_path}: {len(plan.points)} points")
+    except FileNotFoundError:
+        logger.warning(f"No test inputs at {json_path}, running the default plan")
+        print(f"No test inputs at {json_path}, running the default plan")
+        plan, _ = compile_plan(default_inputs)
+    except (OSError, ValueError) as e:
+        # An invalid plan must not silently run the defaults on the bench
+        logger.error(f"Error reading test inputs: {e}", exc_info=True)
+        print(f"Error reading test inputs: {e}")
+        raise SystemExit(1)
+    for reason in plan.skipped:
+        logger.error(f"Skipping invalid test: {reason}")
+        print(f"Skipping invalid test: {reason}")
+    # Predict campaign wall time from earlier runs before touching the bench
+    history = [os.path.join(os.path.dirname(__file__), name)
+               for name in ('results_output.json', 'results_output.jsonl')]
+    try:
+        estimate_report = RuntimeEstimator.from_history(history).report(plan.points)
+        logger.info(estimate_report)
+        print(estimate_report)
+    except Exception as e:
+        logger.error(f"Runtime estimate failed: {e}", exc_info=True)
+
+    if args.dry_run:
+        # Cost the plan offline: no bench() and no sockets
+        cost_report = LatencyModel().report(plan.points)
+        logger.info(f"Dry run cost breakdown:\n{cost_report}")
+        print(f"\nDry run cost breakdown:\n{cost_report}")
+        raise SystemExit(0)
+
+    session = bench()  # Reads bench_config.ini only; no connection is opened
+    watchdog.configure(session.watchdog_margin, session.watchdog_overhead_s, session.watchdog_retries)
+    if session.trace_path:
+        tracer.enable()
+
+    dropped = run_campaign(plan, os.path.join(os.path.dirname(__file__), 'results_output.jsonl'))
+
+    # Report the slowest SCPI commands per instrument
+    latency_report = latency_stats.report()
+    logger.info(f"SCPI latency report:\n{latency_report}")
+    print(f"\n{latency_report}")
+    if session.trace_path:
+        try:
+            tracer.export(session.trace_path, session.trace_format)
+        except Exception as e:
+            logger.error(f"Error exporting trace: {e}", exc_info=True)
+
+    # Save results to JSON
+    results_path = os.path.join(os.path.dirname(__file__), 'results_output.json')
+    try:
+        with open(results_path, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+        logger.info(f"Saved results to: {results_path}")
+    except Exception as e:
+        logger.error(f"Error saving JSON results: {e}", exc_info=True)
+
+    # Save results to Excel; pandas is only imported here
+    export_excel(results, os.path.join(os.path.dirname(__file__), 'results_output.xlsx'))
+    if dropped:
+        raise SystemExit(1)  # Results are incomplete
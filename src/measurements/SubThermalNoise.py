@@ -18,7 +18,6 @@ class option_functions:
         """
         logger.info(f"Initializing STN driver with freq={freq / 1e9:.3f}GHz")
         self.VSA = bench().VSA_start()  # Start VSA connection
-        self.VSA.sock.settimeout(30)  # Set timeout
         self.VSG = bench().VSG_start()  # Start VSG connection
         self.VSG.write("OUTP:STAT OFF")  # Turn off VSG output
         self.frequency = freq
@@ -47,7 +46,7 @@ class option_functions:
         self.VSA.query('INIT:IMM;*OPC?')
         self.VSA.query('DISP:WIND1:SUBW:TRAC1:Y:SCAL:AUTO ONCE;*OPC?')
         self.STN_Noise_Marker()  # Configure noise marker
-        self.VSA.clear_error()  # Clear error queue
+        self.VSA.sync()  # Wait for completion, raise on queued errors
 
     def STN_Noise_Marker(self):
         """Configure noise marker for STN measurement."""
@@ -73,6 +72,31 @@ class option_functions:
         logger.info(f"Noise marker measured: {marker:.2f} dBm")
         return marker  # Dummy timing
 
+    def VSA_arm(self):
+        """Start a single noise sweep without blocking; see VSA_wait()."""
+        logger.info("Arming VSA sweep for STN noise marker")
+        self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
+        self.VSA.arm('INIT:IMM')  # Start sweep, completion flagged via *OPC/ESB
+
+    @method_timer
+    def VSA_wait(self, timeout=30.0):
+        """Wait for the sweep started by VSA_arm() to complete.
+
+        Args:
+            timeout (float): Seconds to wait before raising TimeoutError.
+        """
+        self.VSA.wait_complete(timeout)
+
+    def get_noise_mkr(self):
+        """Fetch the noise marker of the last sweep.
+
+        Returns:
+            float: Noise marker value in dBm.
+        """
+        marker = self.VSA.queryFloat(':CALC:MARK:FUNC:NOIS:RES?')  # Fetch noise marker
+        logger.info(f"Noise marker measured: {marker:.2f} dBm")
+        return marker
+
     def STN_set_frequency(self, freq):
         """Set frequency for STN measurement.
 
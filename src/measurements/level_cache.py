@@ -0,0 +1,178 @@
+# File: src/measurements/level_cache.py
+"""Persistent cache of analyzer auto-level results.
+
+On a fixed bench the reference level and attenuation found by auto-level
+are a deterministic function of the waveform configuration, the frequency
+and the generator power. The cache stores them per (config, frequency bin,
+power) in a JSON file so later points and later runs apply them directly
+instead of running a full auto-level measurement. LevelInterpolation
+gives a driver interpolated levels for power sweeps.
+"""
+
+import json
+import logging
+import os
+import threading
+from src.utils.utils import method_timer
+
+logger = logging.getLogger(__name__)
+
+_caches = {}  # Shared caches keyed by absolute path
+_caches_lock = threading.Lock()
+
+
+def _resolve(path):
+    """Resolve a cache path relative to the project root."""
+    if os.path.isabs(path):
+        return path
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    return os.path.abspath(os.path.join(root, path))
+
+
+class LevelCache:
+    """Reference level/attenuation per (config, frequency bin, power), saved as JSON."""
+
+    def __init__(self, path, freq_bin_hz=10e6):
+        """Load the cache file if it exists.
+
+        Args:
+            path (str): JSON file; relative paths resolve against the project root.
+            freq_bin_hz (float): Frequencies within one bin share an entry.
+        """
+        self.path = path = _resolve(path)
+        self.freq_bin_hz = freq_bin_hz
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+                logger.info(f"Loaded {len(self.entries)} level cache entries from {path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable level cache {path}: {e}")
+
+    @classmethod
+    def shared(cls, path):
+        """Return the cache for a path, loading it on first use."""
+        key = _resolve(path)
+        with _caches_lock:
+            if key not in _caches:
+                _caches[key] = cls(path)
+            return _caches[key]
+
+    def key(self, config, freq, pwr):
+        """Build the cache key.
+
+        Args:
+            config (str): Waveform configuration summary (without frequency).
+            freq (float): Centre frequency in Hz.
+            pwr (float): Generator power in dBm.
+
+        Returns:
+            str: Cache key.
+        """
+        return f"{config}|{round(freq / self.freq_bin_hz)}|{pwr:.2f}"
+
+    def get(self, config, freq, pwr):
+        """Look up a level.
+
+        Returns:
+            tuple: (reference level in dBm, attenuation in dB), or None on a miss.
+        """
+        entry = self.entries.get(self.key(config, freq, pwr))
+        return (entry["ref_level"], entry["attenuation"]) if entry else None
+
+    def put(self, config, freq, pwr, ref_level, attenuation):
+        """Store a level and save the cache file."""
+        with self._lock:
+            self.entries[self.key(config, freq, pwr)] = {"ref_level": ref_level, "attenuation": attenuation}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)  # Never leave a half-written cache
+
+
+class LevelInterpolator:
+    """Reference level for a power sweep, interpolated between two auto-levels.
+
+    Auto-level runs only at the lowest and highest power of the sweep; the
+    reference level of any power in between follows by linear offset. The
+    attenuation of the highest power is kept for the whole sweep so no point
+    is driven harder than the levelled maximum.
+    """
+
+    def __init__(self, freq, p_lo, ref_lo, p_hi, ref_hi, attenuation):
+        """Store the two levelled end points.
+
+        Args:
+            freq (float): Centre frequency in Hz the levels were measured at.
+            p_lo (float): Lowest sweep power in dBm.
+            ref_lo (float): Reference level at p_lo in dBm.
+            p_hi (float): Highest sweep power in dBm.
+            ref_hi (float): Reference level at p_hi in dBm.
+            attenuation (float): Attenuation at p_hi in dB.
+        """
+        self.freq = freq
+        self.p_lo = p_lo
+        self.ref_lo = ref_lo
+        self.p_hi = p_hi
+        self.ref_hi = ref_hi
+        self.attenuation = attenuation
+
+    def covers(self, freq, powers):
+        """Return True if this fit applies to a frequency and power list."""
+        return freq == self.freq and min(powers) == self.p_lo and max(powers) == self.p_hi
+
+    def ref_level(self, pwr):
+        """Interpolated reference level in dBm for a generator power."""
+        if self.p_hi == self.p_lo:
+            return self.ref_hi
+        slope = (self.ref_hi - self.ref_lo) / (self.p_hi - self.p_lo)
+        return self.ref_lo + (pwr - self.p_lo) * slope
+
+
+class LevelInterpolation:
+    """Interpolated reference levels for the power sweeps of an EVM driver.
+
+    Mixed into the LTE and NR5G drivers, which provide VSA, freq,
+    level_fit, _captured and VSG_pwr().
+    """
+
+    def VSA_level_fit(self, powers):
+        """Auto-level at the lowest and highest power of a power sweep.
+
+        Args:
+            powers (list): Sweep powers in dBm.
+
+        Returns:
+            LevelInterpolator: Reference level fit for the current frequency.
+        """
+        logger.info(f"Auto-levelling at {min(powers)} and {max(powers)} dBm for interpolation")
+        levels = []
+        for p in (min(powers), max(powers)):
+            self.VSG_pwr(p)
+            self.VSA.query(':SENS:ADJ:LEV;*OPC?')  # Full auto-level
+            levels.append((p, self.VSA.queryFloat(':DISP:WIND:TRAC:Y:SCAL:RLEV?'), self.VSA.queryFloat(':INP:ATT?')))
+        (p_lo, ref_lo, _), (p_hi, ref_hi, att) = levels
+        self.level_fit = LevelInterpolator(self.freq, p_lo, ref_lo, p_hi, ref_hi, att)
+        return self.level_fit
+
+    @method_timer
+    def VSA_level_interp(self, pwr, powers):
+        """Set the reference level for one point of a power sweep.
+
+        Auto-level runs only at the sweep extremes, once per frequency; the
+        level of every other power is interpolated by linear offset.
+
+        Args:
+            pwr (float): Power of this point in dBm.
+            powers (list): All sweep powers at this frequency in dBm.
+        """
+        if self.level_fit is None or not self.level_fit.covers(self.freq, powers):
+            self.VSA_level_fit(powers)
+            self.VSG_pwr(pwr)  # Back to this point's power
+        ref_level = self.level_fit.ref_level(pwr)
+        logger.info(f"Interpolated reference level for {pwr} dBm: {ref_level:.2f} dBm")
+        self.VSA.write(f':INP:ATT {self.level_fit.attenuation};:DISP:WIND:TRAC:Y:SCAL:RLEV {ref_level}')
+        self._captured = None
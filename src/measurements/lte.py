@@ -1,14 +1,16 @@
 # File: src/measurements/lte.py
 import logging
 import os
-import numpy as np
 from src.utils.utils import method_timer
+from src.utils.watchdog import TIMEOUT_ERRORS
 from src.instruments.bench import bench
+from src.measurements.lte_numerology import lte_allocation
+from src.measurements.level_cache import LevelInterpolation
 
 logger = logging.getLogger(__name__)
 
 
-class std_insr_driver:
+class std_insr_driver(LevelInterpolation):
     """Class for LTE measurements with VSA and VSG."""
 
     def __init__(self, freq=6e9, pwr=-10.0, rb=None, rbo=0, bw=20, dupl="FDD", mod="QAM256", ldir="UP", linkd="UP"):
@@ -24,14 +26,19 @@ class std_insr_driver:
             mod (str): Modulation type, default "QAM256".
             ldir (str): Link direction, default "UP".
             linkd (str): Link direction for VSG, default "UP".
+
+        Raises:
+            ValueError: If bw/rb/rbo is not a valid LTE allocation; checked
+                before any instrument is touched.
         """
         logger.info(
             f"Initializing LTE driver with freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, rbo={rbo}, bw={bw}MHz, dupl={dupl}, mod={mod}, ldir={ldir}, linkd={linkd}")
+        self.bw_token, rb = lte_allocation(bw, rb, rbo)  # Validate before connecting
         self.VSA = bench().VSA_start()  # Start VSA connection
         self.VSG = bench().VSG_start()  # Start VSG connection
         self.freq = freq
         self.pwr = pwr
-        self.rb = rb if rb else 100
+        self.rb = rb  # Full allocation for bw unless given
         self.rbo = rbo
         self.bw = bw
         self.dupl = dupl
@@ -39,6 +46,11 @@ class std_insr_driver:
         self.ldir = ldir
         self.linkd = linkd
         self.swp_time = 0.01
+        self._meas = None  # Measurement type selected on the VSA
+        self._captured = None  # Measurement type of the current valid capture
+        self._sweep_s = None  # Analyzer capture time, queried once per configuration
+        self._seq_channels = None  # (EVM, ACLR) channel names once the sequencer is set up
+        self.level_fit = None  # Reference level fit of the current power sweep
 
     @method_timer
     def VSG_Config(self):
@@ -49,10 +61,7 @@ class std_insr_driver:
         self.VSG.write(':SOUR1:BB:EUTR:STDM LTE')  # Set LTE standard
         self.VSG.write(f':SOUR1:BB:EUTR:DUPL {self.dupl}')  # Set duplexing
         self.VSG.write(f':SOUR1:BB:EUTR:LINK {self.linkd}')  # Set link direction
-        bw_map = {5: 'BW5_00', 20: 'BW20_00'}
-        self.VSG.write(f':SOUR1:BB:EUTR:UL:BW {bw_map.get(self.bw, "BW20_00")}')  # Set bandwidth
-        self.rb = int(self.VSG.query(':SOURce1:BB:EUTRa:UL:NORB?'))  # Query resource blocks
-        logger.info(f"Queried resource blocks: {self.rb}")
+        self.VSG.write(f':SOUR1:BB:EUTR:UL:BW {self.bw_token}')  # Set bandwidth
         self.VSG.write(f':SOUR1:BB:EUTR:UL:CELL0:SUBF0:ALL0:PUSC:SET1:RBC {self.rb}')  # Set resource block count
         self.VSG.write(f':SOUR1:BB:EUTR:UL:CELL0:SUBF0:ALL0:PUSC:SET1:VRB {self.rbo}')  # Set resource block offset
         self.VSG.write(f':SOUR1:BB:EUTR:UL:CELL0:SUBF0:ALL0:CW1:PUSC:MOD {self.mod}')  # Set modulation
@@ -61,7 +70,7 @@ class std_insr_driver:
         self.VSG.write(':OUTP1:STAT 1')  # Enable output
         self.VSG.query(':SOUR1:CORR:OPT:EVM 1;*OPC?')  # Optimize EVM
         self.VSG.write(':SOUR1:BB:EUTR:TRIG:OUTP1:MODE REST')  # Set trigger mode
-        self.VSG.write('*OPC?')  # Wait for operation complete
+        self.VSG.sync()  # Wait for operation complete, raise on queued errors
 
     @method_timer
     def VSG_freq(self, freq):
@@ -73,6 +82,7 @@ class std_insr_driver:
         logger.info(f"Setting VSG frequency to {freq / 1e9:.3f}GHz")
         self.VSG.write(f':SOUR:FREQ:CW {freq}')
         self.freq = freq
+        self._captured = None  # Stimulus changed, capture is stale
 
     @method_timer
     def VSG_pwr(self, pwr):
@@ -84,6 +94,7 @@ class std_insr_driver:
         logger.info(f"Setting VSG power to {pwr} dBm")
         self.VSG.query(f':SOUR1:POW:LEV:IMM:AMPL {pwr};*OPC?')
         self.pwr = pwr
+        self._captured = None  # Stimulus changed, capture is stale
 
     @method_timer
     def VSA_Config(self):
@@ -97,8 +108,7 @@ class std_insr_driver:
         self.VSA.write(':TRIG:SEQ:SOUR EXT')  # Set external trigger
         self.VSA.write(f':CONF:LTE:LDIR {self.ldir}')  # Set link direction
         self.VSA.write(f':CONF:LTE:DUPL {self.dupl}')  # Set duplexing
-        bw_map = {5: 'BW5_00', 20: 'BW20_00'}
-        self.VSA.write(f':CONF:LTE:UL:CC:BW {bw_map.get(self.bw, "BW20_00")};*OPC')  # Set bandwidth
+        self.VSA.write(f':CONF:LTE:UL:CC:BW {self.bw_token};*OPC')  # Set bandwidth
         self.VSA.write(f':CONF:LTE:UL:CC:SUBF2:ALL:MOD {self.mod}')  # Set modulation
         # Conditionally set single subframe analysis based on modulation type
         if self.mod == "QPSK":
@@ -108,8 +118,25 @@ class std_insr_driver:
             self.VSA.write(':SENS:LTE:FRAM:SSUB ON')  # Enable single subframe analysis
             logger.info("Single subframe analysis enabled for non-QPSK modulation")
         self.VSA.write(':UNIT:EVM DB')  # Set EVM unit to dB
-        self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
-        self.VSA.clear_error()  # Clear error queue
+        self.VSA.sync('INIT:CONT OFF;*OPC?')  # Disable continuous sweep, raise on queued errors
+        self._meas = 'EVM'  # Default measurement after *RST
+        self._captured = None
+        self._seq_channels = None  # *RST removed any sequencer channels
+        self.level_fit = None
+        self._sweep_s = None  # Re-read for the new configuration
+
+    def expected_sweep_s(self):
+        """Expected seconds of one capture, as reported by the analyzer.
+
+        Queried once after VSA_Config() and cached; the watchdog budgets
+        the point's sweeps from it.
+
+        Returns:
+            float: Analyzer sweep (capture) time in seconds.
+        """
+        if self._sweep_s is None:
+            self._sweep_s = self.VSA.queryFloat(':SENS:SWE:TIME?')
+        return self._sweep_s
 
     @method_timer
     def VSx_freq(self, freq):
@@ -119,16 +146,81 @@ class std_insr_driver:
             freq (float): Frequency in Hz.
         """
         logger.info(f"Setting VSA/VSG frequency to {freq / 1e9:.3f}GHz")
-        self.VSA.write(f':SENS:FREQ:CENT {freq}')
+        if self._seq_channels:
+            evm_ch, aclr_ch = self._seq_channels  # Channels keep separate frequencies
+            self.VSA.write(f":INST:SEL '{aclr_ch}';:SENS:FREQ:CENT {freq};:INST:SEL '{evm_ch}';:SENS:FREQ:CENT {freq}")
+        else:
+            self.VSA.write(f':SENS:FREQ:CENT {freq}')
         self.VSG.write(f':SOUR:FREQ:CW {freq}')
         self.freq = freq
+        self._captured = None  # Stimulus changed, capture is stale
+
+    def _select_measurement(self, meas):
+        """Switch the VSA measurement type; no-op if it is already selected.
+
+        Args:
+            meas (str): LTE measurement type, e.g. 'EVM' or 'ACLR'.
+        """
+        if self._meas != meas:
+            self.VSA.write(f':CONF:LTE:MEAS {meas}')
+            self._meas = meas
+            self._captured = None
+
+    def VSA_capture(self, meas='EVM'):
+        """Acquire once for a measurement type; fetches reuse the capture.
+
+        A sweep is only run when no valid capture exists for `meas`, i.e.
+        after a stimulus change or a measurement type switch.
+
+        Args:
+            meas (str): LTE measurement type, default 'EVM'.
+
+        Returns:
+            bool: True if a sweep was run.
+        """
+        self._select_measurement(meas)
+        if self._captured == meas:
+            logger.info(f"Reusing {meas} capture")
+            return False
+        self.VSA.query('INIT:IMM;*OPC?')  # Initiate sweep and wait
+        self._captured = meas
+        return True
 
     @method_timer
-    def VSA_sweep(self):
-        """Perform VSA sweep for measurement."""
+    def VSA_sweep(self, meas='EVM'):
+        """Perform a fresh VSA sweep.
+
+        Args:
+            meas (str): Measurement type to capture for, default 'EVM'.
+        """
         logger.info("Performing VSA sweep")
+        self._captured = None
+        self.VSA_capture(meas)
+
+    def VSA_arm(self, meas='EVM'):
+        """Start a single VSA sweep without blocking.
+
+        The sweep runs while the host does other work; call VSA_wait() to
+        collect completion from the status byte.
+
+        Args:
+            meas (str): Measurement type to capture for, default 'EVM'.
+        """
+        logger.info("Arming VSA sweep")
+        self._select_measurement(meas)
+        self._captured = None
         self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
-        self.VSA.query('INIT:IMM;*OPC?')  # Initiate sweep and wait
+        self.VSA.arm('INIT:IMM')  # Start sweep, completion flagged via *OPC/ESB
+
+    @method_timer
+    def VSA_wait(self, timeout=30.0):
+        """Wait for the sweep started by VSA_arm() to complete.
+
+        Args:
+            timeout (float): Seconds to wait before raising TimeoutError.
+        """
+        self.VSA.wait_complete(timeout)
+        self._captured = self._meas
 
     @method_timer
     def VSA_get_info(self):
@@ -151,11 +243,13 @@ class std_insr_driver:
         """
         logger.info("Measuring EVM")
         try:
-            self.VSA.query('INIT:IMM;*OPC?')  # Perform sweep
+            self.VSA_capture('EVM')  # Sweeps only if no valid EVM capture
             evm = self.VSA.queryFloat(':FETC:CC1:SUMM:EVM:ALL:AVER?')  # Fetch EVM
             logger.info(f"EVM measured: {evm:.2f} dB")
             print(f'EVM measured: {evm:.2f} dB')
             return evm
+        except TIMEOUT_ERRORS:
+            raise  # Overrun: the watchdog aborts and retries the sweep
         except Exception as e:
             logger.error(f"EVM measurement failed: {e}")
             return float('nan')
@@ -168,25 +262,112 @@ class std_insr_driver:
             str: ACLR measurement results.
         """
         logger.info("Measuring ACLR")
-        self.VSA.write(':CONF:LTE:MEAS ACLR')  # Configure ACLR measurement
-        self.VSA.write(f':SENS:FREQ:CENT {self.freq};*OPC')  # Set frequency
-        logger.info(f"Set VSA frequency to {self.freq / 1e9:.3f}GHz for ACLR measurement")
-        self.VSA_sweep()  # Perform sweep
+        self.VSA_capture('ACLR')  # Switches to ACLR and sweeps only if needed
         aclr = self.VSA.query(':CALC:MARK:FUNC:POW:RES? ACP')  # Fetch ACLR
         logger.info(f"ACLR measured: {aclr}")
-        self.VSA.write(':CONF:LTE:MEAS EVM')  # Revert to EVM measurement
+        # EVM is re-selected lazily by the next VSA_capture('EVM')
         print(f'ACLR measured: {aclr}')
         return aclr
 
-    @staticmethod
-    def VSA_get_chPwr():
-        """Placeholder for channel power measurement.
+    @method_timer
+    def VSA_seq_setup(self):
+        """Set up EVM and ACLR as parallel channels run by the sequencer.
+
+        The configured EVM channel is duplicated into an ACLR channel once,
+        so each point needs no measurement switch: VSA_seq_arm() or
+        VSA_seq_measure() runs both channels with INIT:SEQ and both results
+        are fetched in one query.
+        Cleared by VSA_Config() (*RST) or VSA_seq_teardown().
+        """
+        logger.info("Setting up LTE EVM+ACLR sequencer channels")
+        evm_ch, aclr_ch = 'LTE', 'LTE ACLR'
+        self.VSA.query(f":INST:SEL '{evm_ch}';:INST:CRE:DUPL;*OPC?")  # Copy of the EVM channel
+        self.VSA.write(f":INST:REN '{evm_ch} 2','{aclr_ch}'")
+        self.VSA.write(f":INST:SEL '{aclr_ch}';:CONF:LTE:MEAS ACLR")  # ACLR in the copy
+        self.VSA.write(f":INST:SEL '{evm_ch}'")
+        self.VSA.sync(':SYST:SEQ ON;:INIT:SEQ:MODE SING;*OPC?')  # Single sequencer run per INIT:SEQ
+        self._seq_channels = (evm_ch, aclr_ch)
+        self._meas = 'EVM'
+        self._captured = None
+
+    def VSA_seq_arm(self):
+        """Start one EVM+ACLR sequencer run without blocking.
+
+        Sets the sequencer channels up on first use; call VSA_wait() to
+        collect completion, then VSA_seq_fetch().
+        """
+        if not self._seq_channels:
+            self.VSA_seq_setup()
+        logger.info("Arming EVM+ACLR sequencer")
+        self._captured = None
+        self.VSA.arm(':INIT:SEQ:IMM')  # Both channels capture in one run
+
+    @method_timer
+    def VSA_seq_measure(self):
+        """Run the EVM and ACLR channels once and fetch both results.
+
+        Returns:
+            tuple: (EVM in dB, ACLR result string).
+        """
+        if not self._seq_channels:
+            self.VSA_seq_setup()
+        logger.info("Running EVM+ACLR sequencer")
+        self.VSA.query(':INIT:SEQ:IMM;*OPC?')  # Both channels capture in one run
+        self._captured = 'EVM'
+        result, _ = self.VSA_seq_fetch()
+        return result
+
+    @method_timer
+    def VSA_seq_fetch(self):
+        """Fetch EVM and ACLR of the completed sequencer run.
+
+        Returns:
+            tuple: (EVM in dB, ACLR result string).
+        """
+        evm_ch, aclr_ch = self._seq_channels
+        # One exchange: EVM from the EVM channel, ACLR from the ACLR channel
+        resp = self.VSA.query(f":FETC:CC1:SUMM:EVM:ALL:AVER?;:INST:SEL '{aclr_ch}';"
+                              f":CALC:MARK:FUNC:POW:RES? ACP;:INST:SEL '{evm_ch}'")
+        evm_str, _, aclr = resp.partition(';')
+        try:
+            evm = float(evm_str)
+        except ValueError:
+            logger.error(f"EVM measurement failed: unparsable response {evm_str!r}")
+            evm = float('nan')
+        aclr = aclr.strip()
+        logger.info(f"EVM measured: {evm:.2f} dB, ACLR measured: {aclr}")
+        return evm, aclr
+
+    def VSA_seq_teardown(self):
+        """Stop the sequencer and delete the ACLR channel."""
+        if not self._seq_channels:
+            return
+        evm_ch, aclr_ch = self._seq_channels
+        logger.info("Removing EVM+ACLR sequencer channels")
+        self.VSA.write(f":SYST:SEQ OFF;:INST:DEL '{aclr_ch}';:INST:SEL '{evm_ch}'")
+        self._seq_channels = None
+        self._captured = None
+
+    def VSA_get_chPwr(self):
+        """Measure and return channel power from the EVM capture.
+
+        Reads the LTE summary power, so no ACLR sweep is needed; the EVM
+        capture is only taken if it is not already valid for this point.
 
         Returns:
-            float: NaN (not implemented).
+            float: Channel power in dBm.
         """
         logger.info("Measuring channel power")
-        return float('nan')
+        try:
+            self.VSA_capture('EVM')  # Reuses the EVM capture when valid
+            ch_pwr = self.VSA.queryFloat(':FETC:CC1:SUMM:POW?')  # Fetch summary power
+            logger.info(f"Channel power measured: {ch_pwr:.2f} dBm")
+            return ch_pwr
+        except TIMEOUT_ERRORS:
+            raise  # Overrun: the watchdog aborts and retries the sweep
+        except Exception as e:
+            logger.error(f"Channel power measurement failed: {e}")
+            return float('nan')
 
     def __del__(self):
         """Destructor to close sockets."""
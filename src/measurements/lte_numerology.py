@@ -0,0 +1,86 @@
+# File: src/measurements/lte_numerology.py
+"""E-UTRA channel bandwidth table shared by the LTE VSA and VSG configuration.
+
+Each bandwidth maps to the SCPI token used by both instruments and the
+number of resource blocks of a full allocation (TS 36.101 table 5.6-1), so
+the RB count no longer has to be queried back from the generator.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Channel bandwidth (MHz) -> (SCPI token, resource blocks)
+LTE_BANDWIDTHS = {
+    1.4: ('BW1_40', 6),
+    3: ('BW3_00', 15),
+    5: ('BW5_00', 25),
+    10: ('BW10_00', 50),
+    15: ('BW15_00', 75),
+    20: ('BW20_00', 100),
+}
+
+
+def lte_bandwidth(bw):
+    """Look up the SCPI token and RB count of an LTE channel bandwidth.
+
+    Args:
+        bw (float): Channel bandwidth in MHz.
+
+    Returns:
+        tuple: (SCPI bandwidth token, number of resource blocks).
+
+    Raises:
+        ValueError: If bw is not an E-UTRA channel bandwidth.
+    """
+    try:
+        return LTE_BANDWIDTHS[float(bw)]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid LTE channel bandwidth {bw} MHz, expected one of "
+                         f"{sorted(LTE_BANDWIDTHS)}") from None
+
+
+def lte_allocation(bw, rb=None, rbo=0):
+    """Validate an LTE resource block allocation.
+
+    Args:
+        bw (float): Channel bandwidth in MHz.
+        rb (int, optional): Allocated resource blocks, default the full
+            allocation for bw.
+        rbo (int): Resource block offset, default 0.
+
+    Returns:
+        tuple: (SCPI bandwidth token, allocated resource blocks).
+
+    Raises:
+        ValueError: If the allocation does not fit in the channel.
+    """
+    token, max_rb = lte_bandwidth(bw)
+    rb = max_rb if rb is None else int(rb)
+    if rb < 1 or rbo < 0 or rb + rbo > max_rb:
+        raise ValueError(f"LTE allocation rb={rb}, rbo={rbo} exceeds {max_rb} RB of {bw} MHz")
+    return token, rb
+
+
+def validate_lte_plan(tests):
+    """Validate every enabled LTE test of a plan.
+
+    Args:
+        tests (list): "lte" entries of test_inputs.json.
+
+    Returns:
+        tuple: (list of valid test entries, list of error strings).
+    """
+    valid = []
+    errors = []
+    for i, test in enumerate(tests):
+        if not test.get("run", False):
+            continue
+        try:
+            lte_allocation(test.get("channel_bandwidth_mhz", 20), test.get("resource_blocks"),
+                           test.get("resource_block_offset", 0))
+        except ValueError as e:
+            errors.append(f"lte[{i}]: {e}")
+            continue
+        valid.append(test)
+    return valid, errors
@@ -2,12 +2,15 @@
 import logging
 import time
 from src.utils.utils import method_timer
+from src.utils.watchdog import TIMEOUT_ERRORS
 from src.instruments.bench import bench
+from src.measurements.nr5g_numerology import NrCarrier
+from src.measurements.level_cache import LevelCache, LevelInterpolation
 
 logger = logging.getLogger(__name__)
 
 
-class std_insr_driver:
+class std_insr_driver(LevelInterpolation):
     """Class for NR5G FR1 measurements with VSA and VSG."""
 
     _vsa_instance = None  # Class variable for VSA connection
@@ -26,13 +29,17 @@ class std_insr_driver:
             scs (int): Subcarrier spacing in kHz, default 30.
             dupl (str): Duplexing mode, default "FDD".
             ldir (str): Link direction, default "UP".
+
+        Raises:
+            ValueError: If bw/scs/rb/rbo is not a valid FR1 carrier; checked
+                before any instrument is touched.
         """
         logger.info(f"Initializing NR5G driver with freq={freq / 1e9:.3f}GHz, pwr={pwr}dBm, "
                     f"rb={rb}, rbo={rbo}, bw={bw}MHz, mod={mod}, scs={scs}kHz")
+        self.carrier = NrCarrier(bw, scs, rb, rbo)  # Validate before connecting
         # Create VSA connection if not exists
         if std_insr_driver._vsa_instance is None:
             std_insr_driver._vsa_instance = bench().VSA_start()
-            std_insr_driver._vsa_instance.sock.settimeout(30)
             logger.info("Created new VSA connection")
             std_insr_driver._vsa_instance.query('*IDN?')  # Initial verification
         # Create VSG connection if not exists
@@ -44,21 +51,28 @@ class std_insr_driver:
         self.VSG = std_insr_driver._vsg_instance
         self.freq = freq
         self.pwr = pwr
-        self.rb = rb
+        self.rb = self.carrier.rb
         self.rbo = rbo
-        self.bw = bw
+        self.bw = self.carrier.bw
         self.mod = mod
-        self.scs = scs
+        self.scs = self.carrier.scs
         self.dupl = dupl
         self.ldir = ldir
         self.swp_time = 0.015
+        level_cache_path = bench().level_cache_path
+        self.level_cache = LevelCache.shared(level_cache_path) if level_cache_path else None
+        self._meas = None  # Measurement type selected on the VSA
+        self._captured = None  # Measurement type of the current valid capture
+        self._sweep_s = None  # Analyzer capture time, queried once per configuration
+        self._seq_channels = None  # (EVM, ACLR) channel names once the sequencer is set up
+        self.level_fit = None  # Reference level fit of the current power sweep
 
     @classmethod
     def close_connections(cls):
         """Close VSA and VSG connections."""
         if cls._vsa_instance:
             cls._vsa_instance.sock.close()
-            cls._vsa_instance = None
+            cls._vsa_instance = None  # Its generator coupling goes with it
             logger.info("Closed VSA socket")
         if cls._vsg_instance:
             cls._vsg_instance.sock.close()
@@ -71,8 +85,8 @@ class std_insr_driver:
         self.VSG.write(f':SOUR1:BB:NR5G:LINK {self.ldir}')  # Set link direction
         self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:DUPL {self.dupl}')  # Set duplexing
         self.VSG.write(':SOUR1:BB:NR5G:QCKS:GEN:CARD FR1GT3')  # Set carrier type
-        self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:CBW BW{self.bw}')  # Set channel bandwidth
-        self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:SCSP SCS{self.scs}')  # Set subcarrier spacing
+        self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:CBW {self.carrier.bw_token}')  # Set channel bandwidth
+        self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:SCSP {self.carrier.scs_token}')  # Set subcarrier spacing
         self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:ES:MOD {self.mod}')  # Set modulation
         self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:ES:RBN {self.rb}')  # Set resource blocks
         self.VSG.write(f':SOUR1:BB:NR5G:QCKS:GEN:ES:RBOF {self.rbo}')  # Set resource block offset
@@ -83,7 +97,7 @@ class std_insr_driver:
         self.VSG.write(':SOUR1:BB:NR5G:TRIG:OUTP1:MODE REST')  # Set trigger mode
         self.VSG.write(':SOUR1:BB:NR5G:NODE:RFPH:MODE 0')  # Disable RF phase compensation
         self.VSG_pwr(self.pwr)  # Set power
-        self.VSG.query('*OPC?')  # Wait for operation complete
+        self.VSG.sync()  # Wait for operation complete, raise on queued errors
         print('VSG configuration complete.')
 
     def VSG_pwr(self, pwr):
@@ -92,12 +106,19 @@ class std_insr_driver:
         Args:
             pwr (float): Power in dBm.
         """
-        self.VSG.write(f':SOUR1:POW:POW {pwr}')
+        self.VSG.query(f':SOUR1:POW:POW {pwr};*OPC?')  # Settled before levelling or sweeping
+        self.pwr = pwr
+        self._captured = None  # Stimulus changed, capture is stale
 
     @method_timer
     def VSA_Config(self, freq=None, pwr=None):
         """Configure VSA for 5G NR measurement.
 
+        Every configuration resets the analyzer and recreates the 5G NR
+        channel, so channels left by an earlier driver or a failed point do
+        not survive. Only the generator link handshake is done once per
+        analyzer connection; see bench.couple_generator().
+
         Args:
             freq (float, optional): Override frequency in Hz.
             pwr (float, optional): Override power in dBm.
@@ -106,16 +127,13 @@ class std_insr_driver:
         self.VSA.query('*RST;*OPC?')  # Reset VSA
         self.VSA.query(':SYST:DISP:UPD ON;*OPC?')  # Enable display updates
         self.VSA.query(':INST:CRE:NEW NR5G, "5G NR";*OPC?')  # Select 5G NR mode
-        self.VSA.write('CONF:GEN:IPC:ADDR "192.168.200.10"')  # Set generator IP
-        self.VSA.query('CONF:GEN:CONN:STAT ON;*OPC?')  # Enable generator connection
-        self.VSA.write('CONF:GEN:CONT:STAT ON')  # Enable continuous generation
-        self.VSA.write('CONF:GEN:RFO:STAT ON')  # Enable RF output
+        bench().couple_generator(self.VSA)  # Generator control bound to VSG_IP, handshake once
+        self._seq_channels = None  # *RST removed any sequencer channels
         self.VSA.write(f'SENS:FREQ:CENT {self.freq}')  # Set center frequency
-        self.VSA.write('CONF:GEN:FREQ:CENT:SYNC:STAT ON')  # Enable frequency sync
         self.VSA.write(':INP:ATT:AUTO OFF')  # Disable auto attenuation
         self.VSA.write(':INP:ATT 10')  # Set 10 dB attenuation
         self.VSA.write('CONF:SETT:RF')  # Configure RF settings
-        self.VSA.write('CONF:SETT:NR5G;*OPC?')  # Configure NR5G settings
+        self.VSA.query('CONF:SETT:NR5G;*OPC?')  # Configure NR5G settings
         self.VSA.write(':TRIG:SEQ:SOUR EXT')  # Set external trigger
         self.VSA.write(':TRIG:EXT:DEL 0')  # Set trigger delay to 0
         self.VSA.write(':SENS:NR5G:FRAM:COUN:AUTO OFF')  # Disable auto frame count
@@ -125,10 +143,25 @@ class std_insr_driver:
         self.VSA.write(f':SENS:SWE:TIME {self.swp_time}')  # Set sweep time
         self.VSA.write(':CONF:NR5G:MEAS EVM;*OPC')  # Configure EVM measurement
         self.VSA.write(':CONF:NR5G:UL:CC1:RFUC:STAT OFF')  # Disable RF uplink correction
-        self.VSA.write('INIT:CONT OFF')  # Disable continuous initiation
-        self.VSA.query('INIT:IMM;*OPC?')  # Perform initial sweep
+        self.VSA.sync('INIT:CONT OFF;*OPC?')  # Disable continuous initiation, raise on queued errors
+        self._meas = 'EVM'
+        self._captured = None  # First fetch triggers the capture
+        self.level_fit = None  # Attenuation was reset above
+        self._sweep_s = None  # Re-read for the new configuration
         print('VSA configuration complete.')
-        logger.info("Performed pre-sweep in VSA_Config")
+
+    def expected_sweep_s(self):
+        """Expected seconds of one capture, as reported by the analyzer.
+
+        Queried once after VSA_Config() and cached; the watchdog budgets
+        the point's sweeps from it.
+
+        Returns:
+            float: Analyzer sweep (capture) time in seconds.
+        """
+        if self._sweep_s is None:
+            self._sweep_s = self.VSA.queryFloat(':SENS:SWE:TIME?')
+        return self._sweep_s
 
     @method_timer
     def VSx_freq(self, freq):
@@ -138,17 +171,125 @@ class std_insr_driver:
             freq (float): Frequency in Hz.
         """
         logger.info(f"Setting VSA/VSG frequency to {freq / 1e9:.3f}GHz")
-        self.VSA.write(f':SENS:FREQ:CENT {freq}')
+        if self._seq_channels:
+            evm_ch, aclr_ch = self._seq_channels  # Channels keep separate frequencies
+            self.VSA.write(f":INST:SEL '{aclr_ch}';:SENS:FREQ:CENT {freq};:INST:SEL '{evm_ch}';:SENS:FREQ:CENT {freq}")
+        else:
+            self.VSA.write(f':SENS:FREQ:CENT {freq}')
         self.VSG.write(f':SOUR:FREQ:CW {freq}')
         self.freq = freq
+        self._captured = None  # Stimulus changed, capture is stale
         time.sleep(0.1)  # Stabilize frequency
 
     @method_timer
-    def VSA_sweep(self):
-        """Perform VSA sweep for measurement."""
+    def VSx_retune(self, freq):
+        """Retune to a new centre frequency, keeping all other settings.
+
+        Frequency-only fast path: with the generator coupled, only the
+        analyzer frequency is written and frequency sync moves the VSG, so
+        no config is reapplied and no pre-sweep runs. The capture is only
+        invalidated if the frequency actually changes. Falls back to
+        VSx_freq() without generator coupling or in sequencer mode.
+
+        Args:
+            freq (float): Frequency in Hz.
+        """
+        if freq == self.freq and self._captured is not None:
+            return
+        if self._seq_channels or not bench.is_generator_coupled(self.VSA):
+            self.VSx_freq(freq)
+            return
+        logger.info(f"Retuning VSA (VSG via frequency sync) to {freq / 1e9:.3f}GHz")
+        self.VSA.query(f':SENS:FREQ:CENT {freq};*OPC?')  # Generator follows through sync
+        self.freq = freq
+        self._captured = None  # Stimulus changed, capture is stale
+
+    def _select_measurement(self, meas):
+        """Switch the VSA measurement type; no-op if it is already selected.
+
+        Args:
+            meas (str): NR5G measurement type, 'EVM' or 'ACLR'.
+        """
+        if self._meas == meas:
+            return
+        if meas == 'EVM':
+            self.VSA.write(
+                f':CONF:NR5G:MEAS EVM;:SENS:SWE:TIME {self.swp_time};:SENS:NR5G:FRAM:COUN 1;:SENS:NR5G:FRAM:SLOT 1;*OPC')
+        else:
+            self.VSA.write(f':CONF:NR5G:MEAS {meas};*OPC')
+            if meas == 'ACLR':
+                self.VSA.write(f':SENS:FREQ:CENT {self.freq};{self._aclr_channels()};*OPC')  # Frequency and channels
+        self._meas = meas
+        self._captured = None
+
+    def _aclr_channels(self):
+        """ACLR channel setup from the carrier numerology (TS 38.101-1 NR adjacent channels).
+
+        Returns:
+            str: Two adjacent channel pairs measured over the transmission
+                bandwidth, spaced by the channel bandwidth.
+        """
+        tx_bw = self.carrier.tx_bw_mhz * 1e6
+        spacing = self.carrier.aclr_spacing_mhz * 1e6
+        return (f':SENS:POW:ACH:ACP 2;:SENS:POW:ACH:BWID:CHAN1 {tx_bw:.0f};:SENS:POW:ACH:BWID:ACH {tx_bw:.0f};'
+                f':SENS:POW:ACH:BWID:ALT1 {tx_bw:.0f};:SENS:POW:ACH:SPAC:ACH {spacing:.0f};'
+                f':SENS:POW:ACH:SPAC:ALT1 {2 * spacing:.0f}')
+
+    def VSA_capture(self, meas='EVM'):
+        """Acquire once for a measurement type; fetches reuse the capture.
+
+        A sweep is only run when no valid capture exists for `meas`, i.e.
+        after a stimulus change or a measurement type switch.
+
+        Args:
+            meas (str): NR5G measurement type, default 'EVM'.
+
+        Returns:
+            bool: True if a sweep was run.
+        """
+        self._select_measurement(meas)
+        if self._captured == meas:
+            logger.info(f"Reusing {meas} capture")
+            return False
+        self.VSA.query('INIT:IMM;*OPC?')  # Initiate sweep and wait
+        self._captured = meas
+        return True
+
+    @method_timer
+    def VSA_sweep(self, meas='EVM'):
+        """Perform a fresh VSA sweep.
+
+        Args:
+            meas (str): Measurement type to capture for, default 'EVM'.
+        """
         logger.info("Performing VSA sweep")
+        self._captured = None
+        self.VSA_capture(meas)
+
+    def VSA_arm(self, meas='EVM'):
+        """Start a single VSA sweep without blocking.
+
+        The sweep runs while the host does other work; call VSA_wait() to
+        collect completion from the status byte.
+
+        Args:
+            meas (str): Measurement type to capture for, default 'EVM'.
+        """
+        logger.info("Arming VSA sweep")
+        self._select_measurement(meas)
+        self._captured = None
         self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
-        self.VSA.query('INIT:IMM;*OPC?')  # Initiate sweep and wait
+        self.VSA.arm('INIT:IMM')  # Start sweep, completion flagged via *OPC/ESB
+
+    @method_timer
+    def VSA_wait(self, timeout=30.0):
+        """Wait for the sweep started by VSA_arm() to complete.
+
+        Args:
+            timeout (float): Seconds to wait before raising TimeoutError.
+        """
+        self.VSA.wait_complete(timeout)
+        self._captured = self._meas
 
     @method_timer
     def VSA_get_info(self):
@@ -157,11 +298,49 @@ class std_insr_driver:
         logger.info(f"VSA configuration: {config}")
         return config
 
+    def _level_config(self):
+        """Waveform summary used as the level cache key (frequency is binned separately)."""
+        return f"NR5G_{self.bw}MHz_{self.scs}kHz_{self.rb}RB_{self.rbo}RBO_{self.mod}"
+
+    def VSA_overloaded(self):
+        """Check the questionable power status for an input overload.
+
+        Returns:
+            bool: True if the analyzer reports an overload condition.
+        """
+        return int(self.VSA.query(':STAT:QUES:POW:COND?')) != 0
+
     @method_timer
     def VSA_level(self):
-        """Adjust VSA input level."""
+        """Adjust VSA input level, using the level cache when possible.
+
+        Cached reference level and attenuation for the current (config,
+        frequency bin, power) are applied and verified with one EVM
+        capture, which the point's fetch then reuses; auto-level only runs
+        on a cache miss or when that capture overloads the input.
+
+        Returns:
+            bool: True if a full auto-level was run.
+        """
+        config = self._level_config()
+        cached = self.level_cache.get(config, self.freq, self.pwr) if self.level_cache else None
+        if cached:
+            ref_level, att = cached
+            logger.info(f"Applying cached level: ref={ref_level} dBm, att={att} dB")
+            self.VSA.write(f':INP:ATT {att};:DISP:WIND:TRAC:Y:SCAL:RLEV {ref_level}')
+            self._captured = None  # Level changed, capture is stale
+            self.VSA_capture('EVM')  # The overload status is only updated by a sweep
+            if not self.VSA_overloaded():
+                return False  # The EVM fetch of this point reuses the capture
+            logger.warning("Cached level overloads the input, re-running auto-level")
         logger.info("Adjusting VSA input level")
         self.VSA.query(':SENS:ADJ:LEV;*OPC?')
+        self._captured = None
+        if self.level_cache:
+            ref_level = self.VSA.queryFloat(':DISP:WIND:TRAC:Y:SCAL:RLEV?')
+            att = self.VSA.queryFloat(':INP:ATT?')
+            self.level_cache.put(config, self.freq, self.pwr, ref_level, att)
+        return True
 
     @method_timer
     def VSA_get_EVM(self):
@@ -172,14 +351,12 @@ class std_insr_driver:
         """
         logger.info("Measuring EVM")
         try:
-            self.VSA.write(
-                f':CONF:NR5G:MEAS EVM;:SENS:SWE:TIME {self.swp_time};:SENS:NR5G:FRAM:COUN 1;:SENS:NR5G:FRAM:SLOT 1;*OPC')
-            self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
-            self.VSA.query('INIT:IMM;*OPC?')  # Pre-sweep
-            self.VSA.query('INIT:IMM;*OPC?')  # Measurement sweep
+            self.VSA_capture('EVM')  # Sweeps only if no valid EVM capture
             evm = self.VSA.queryFloat(':FETC:CC1:SUMM:EVM:ALL:AVER?')  # Fetch EVM
             logger.info(f"EVM measured: {evm:.2f} dB")
             return evm
+        except TIMEOUT_ERRORS:
+            raise  # Overrun: the watchdog aborts and retries the sweep
         except Exception as e:
             logger.error(f"EVM measurement failed: {e}")
             return float('nan')
@@ -193,19 +370,98 @@ class std_insr_driver:
         """
         logger.info("Measuring ACLR")
         try:
-            self.VSA.write(':CONF:NR5G:MEAS ACLR;*OPC')  # Configure ACLR measurement
-            self.VSA.write(f':SENS:FREQ:CENT {self.freq};:SENS:POW:ACH:ACP 2;*OPC')  # Set frequency and pairs
-            self.VSA.write('INIT:CONT OFF')  # Disable continuous sweep
-            self.VSA.query('INIT:IMM;*OPC?')  # Pre-sweep
-            self.VSA.query('INIT:IMM;*OPC?')  # Measurement sweep
+            self.VSA_capture('ACLR')  # Switches to ACLR and sweeps only if needed
             aclr = self.VSA.query(':CALC:MARK:FUNC:POW:RES? ACP')  # Fetch ACLR
             logger.info(f"ACLR measured: {aclr}")
-            self.VSA.write(':CONF:NR5G:MEAS EVM;*OPC')  # Revert to EVM measurement
+            # EVM is re-selected lazily by the next VSA_capture('EVM')
             return str(aclr).strip()
+        except TIMEOUT_ERRORS:
+            raise  # Overrun: the watchdog aborts and retries the sweep
         except Exception as e:
             logger.error(f"ACLR measurement failed: {e}")
             return ''
 
+    @method_timer
+    def VSA_seq_setup(self):
+        """Set up EVM and ACLR as parallel channels run by the sequencer.
+
+        The configured EVM channel is duplicated into an ACLR channel once,
+        so each point needs no measurement switch: VSA_seq_arm() or
+        VSA_seq_measure() runs both channels with INIT:SEQ and both results
+        are fetched in one query.
+        Cleared by VSA_Config() (*RST) or VSA_seq_teardown().
+        """
+        logger.info("Setting up NR5G EVM+ACLR sequencer channels")
+        evm_ch, aclr_ch = '5G NR', '5G NR ACLR'
+        self.VSA.write(":INST:DEL 'Spectrum'")  # Default channel would also run in the sequence
+        self.VSA.query(f":INST:SEL '{evm_ch}';:INST:CRE:DUPL;*OPC?")  # Copy of the EVM channel
+        self.VSA.write(f":INST:REN '{evm_ch} 2','{aclr_ch}'")
+        self.VSA.write(f":INST:SEL '{aclr_ch}';:CONF:NR5G:MEAS ACLR")  # ACLR in the copy
+        self.VSA.write(self._aclr_channels())
+        self.VSA.write(f":INST:SEL '{evm_ch}'")
+        self.VSA.sync(':SYST:SEQ ON;:INIT:SEQ:MODE SING;*OPC?')  # Single sequencer run per INIT:SEQ
+        self._seq_channels = (evm_ch, aclr_ch)
+        self._meas = 'EVM'
+        self._captured = None
+
+    def VSA_seq_arm(self):
+        """Start one EVM+ACLR sequencer run without blocking.
+
+        Sets the sequencer channels up on first use; call VSA_wait() to
+        collect completion, then VSA_seq_fetch().
+        """
+        if not self._seq_channels:
+            self.VSA_seq_setup()
+        logger.info("Arming EVM+ACLR sequencer")
+        self._captured = None
+        self.VSA.arm(':INIT:SEQ:IMM')  # Both channels capture in one run
+
+    @method_timer
+    def VSA_seq_measure(self):
+        """Run the EVM and ACLR channels once and fetch both results.
+
+        Returns:
+            tuple: (EVM in dB, ACLR result string).
+        """
+        if not self._seq_channels:
+            self.VSA_seq_setup()
+        logger.info("Running EVM+ACLR sequencer")
+        self.VSA.query(':INIT:SEQ:IMM;*OPC?')  # Both channels capture in one run
+        self._captured = 'EVM'
+        result, _ = self.VSA_seq_fetch()
+        return result
+
+    @method_timer
+    def VSA_seq_fetch(self):
+        """Fetch EVM and ACLR of the completed sequencer run.
+
+        Returns:
+            tuple: (EVM in dB, ACLR result string).
+        """
+        evm_ch, aclr_ch = self._seq_channels
+        # One exchange: EVM from the EVM channel, ACLR from the ACLR channel
+        resp = self.VSA.query(f":FETC:CC1:SUMM:EVM:ALL:AVER?;:INST:SEL '{aclr_ch}';"
+                              f":CALC:MARK:FUNC:POW:RES? ACP;:INST:SEL '{evm_ch}'")
+        evm_str, _, aclr = resp.partition(';')
+        try:
+            evm = float(evm_str)
+        except ValueError:
+            logger.error(f"EVM measurement failed: unparsable response {evm_str!r}")
+            evm = float('nan')
+        aclr = aclr.strip()
+        logger.info(f"EVM measured: {evm:.2f} dB, ACLR measured: {aclr}")
+        return evm, aclr
+
+    def VSA_seq_teardown(self):
+        """Stop the sequencer and delete the ACLR channel."""
+        if not self._seq_channels:
+            return
+        evm_ch, aclr_ch = self._seq_channels
+        logger.info("Removing EVM+ACLR sequencer channels")
+        self.VSA.write(f":SYST:SEQ OFF;:INST:DEL '{aclr_ch}';:INST:SEL '{evm_ch}'")
+        self._seq_channels = None
+        self._captured = None
+
     def VSA_get_chPwr(self):
         """Measure and return channel power.
 
@@ -217,6 +473,8 @@ class std_insr_driver:
             ch_pwr = self.VSA.queryFloat(':CALC:NR5G:CHP?')  # Fetch channel power
             logger.info(f"Channel power measured: {ch_pwr:.2f} dBm")
             return ch_pwr
+        except TIMEOUT_ERRORS:
+            raise  # Overrun: the watchdog aborts and retries the sweep
         except Exception as e:
             logger.error(f"Channel power measurement failed: {e}")
             return float('nan')
\ No newline at end of file
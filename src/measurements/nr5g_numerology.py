@@ -0,0 +1,89 @@
+# File: src/measurements/nr5g_numerology.py
+"""NR FR1 numerology: bandwidth x subcarrier spacing -> RB grid.
+
+Maximum transmission bandwidth configurations follow TS 38.101-1 table
+5.3.2-1. Everything derived from them (transmission bandwidth, ACLR
+channel spacing) is computed here once, so test plans can be validated
+before any instrument is touched and the driver gets the values
+precomputed.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Subcarrier spacing (kHz) -> {channel bandwidth (MHz): maximum RB}
+NR_FR1_MAX_RB = {
+    15: {5: 25, 10: 52, 15: 79, 20: 106, 25: 133, 30: 160, 40: 216, 50: 270},
+    30: {5: 11, 10: 24, 15: 38, 20: 51, 25: 65, 30: 78, 40: 106, 50: 133, 60: 162, 70: 189,
+         80: 217, 90: 245, 100: 273},
+    60: {10: 11, 15: 18, 20: 24, 25: 31, 30: 38, 40: 51, 50: 65, 60: 79, 70: 93, 80: 107,
+         90: 121, 100: 135},
+}
+
+
+class NrCarrier:
+    """Validated NR FR1 carrier with its precomputed numerology."""
+
+    def __init__(self, bw, scs, rb=None, rbo=0):
+        """Validate a carrier and derive its RB grid.
+
+        Args:
+            bw (int): Channel bandwidth in MHz; whole-number floats from
+                JSON are accepted.
+            scs (int): Subcarrier spacing in kHz.
+            rb (int, optional): Allocated resource blocks, default the
+                maximum for bw/scs.
+            rbo (int): Resource block offset, default 0.
+
+        Raises:
+            ValueError: If the combination is not valid in FR1.
+        """
+        if scs not in NR_FR1_MAX_RB:
+            raise ValueError(f"Invalid NR FR1 subcarrier spacing {scs} kHz, expected one of "
+                             f"{sorted(NR_FR1_MAX_RB)}")
+        max_rb = NR_FR1_MAX_RB[scs].get(bw)
+        if max_rb is None:
+            raise ValueError(f"Invalid NR FR1 bandwidth {bw} MHz for SCS {scs} kHz, expected one of "
+                             f"{sorted(NR_FR1_MAX_RB[scs])}")
+        rb = max_rb if rb is None else int(rb)
+        if rb < 1 or rbo < 0 or rb + rbo > max_rb:
+            raise ValueError(f"NR allocation rb={rb}, rbo={rbo} exceeds {max_rb} RB of "
+                             f"{bw} MHz at SCS {scs} kHz")
+        self.bw = int(bw)  # Table keys matched, so 20.0 -> 20
+        self.scs = int(scs)
+        self.max_rb = max_rb
+        self.rb = rb
+        self.rbo = rbo
+        self.tx_bw_mhz = max_rb * 12 * self.scs / 1000  # Transmission bandwidth configuration, ACLR meas. bandwidth
+        self.aclr_spacing_mhz = self.bw  # Adjacent NR channel centre offset
+        self.bw_token = f"BW{self.bw}"
+        self.scs_token = f"SCS{self.scs}"
+
+    def __repr__(self):
+        return (f"NrCarrier(bw={self.bw}MHz, scs={self.scs}kHz, rb={self.rb}/{self.max_rb}, "
+                f"rbo={self.rbo}, tx_bw={self.tx_bw_mhz:.2f}MHz)")
+
+
+def validate_nr5g_plan(tests):
+    """Validate every enabled NR5G test of a plan.
+
+    Args:
+        tests (list): "nr5g" entries of test_inputs.json.
+
+    Returns:
+        tuple: (list of (test, NrCarrier) for valid entries, list of error strings).
+    """
+    carriers = []
+    errors = []
+    for i, test in enumerate(tests):
+        if not test.get("run", False):
+            continue
+        try:
+            carrier = NrCarrier(test.get("channel_bandwidth_mhz", 20), test.get("subcarrier_spacing_khz", 30),
+                                test.get("resource_blocks", 51), test.get("resource_block_offset", 0))
+        except ValueError as e:
+            errors.append(f"nr5g[{i}]: {e}")
+            continue
+        carriers.append((test, carrier))
+    return carriers, errors
@@ -0,0 +1,309 @@
+# File: src/measurements/protocol.py
+"""Uniform measurement driver protocol and the registry of measurement types.
+
+The LTE, NR5G, STN and SpurSearch drivers grew their own method names
+(VSA_Config vs VSA_config, close vs close_connections, ...). Each type here
+gets a thin adapter exposing the same phases:
+
+    configure()    full VSA/VSG setup for the driver's waveform
+    retune(freq)   move the measurement to a new centre frequency
+    arm()          start a sweep without blocking
+    wait(timeout)  block until the armed sweep completes
+    fetch()        read the results of the completed sweep
+    teardown()     close the instrument connections
+
+so a runner can sequence and overlap phases without per-type glue. Driver
+modules are imported on first use, keeping the registry cheap to import.
+New measurement types only need an adapter registered here.
+"""
+
+import importlib
+import logging
+from src.utils.utils import method_timer
+from src.utils.watchdog import watchdog
+
+logger = logging.getLogger(__name__)
+
+DRIVER_TYPES = {}  # Measurement type -> MeasurementDriver subclass
+
+
+def register_driver(kind):
+    """Register a MeasurementDriver adapter for a measurement type.
+
+    Args:
+        kind (str): Measurement type, e.g. "LTE".
+    """
+    def decorator(cls):
+        cls.kind = kind
+        DRIVER_TYPES[kind] = cls
+        return cls
+    return decorator
+
+
+def driver_type(kind):
+    """Look up the adapter of a measurement type.
+
+    Args:
+        kind (str): Measurement type, a key of DRIVER_TYPES.
+
+    Returns:
+        type: MeasurementDriver subclass.
+
+    Raises:
+        ValueError: If no adapter is registered for kind.
+    """
+    try:
+        return DRIVER_TYPES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown measurement type {kind!r}, expected one of "
+                         f"{sorted(DRIVER_TYPES)}") from None
+
+
+def open_driver(kind, **kwargs):
+    """Create a driver of a measurement type wrapped in its adapter.
+
+    Args:
+        kind (str): Measurement type, a key of DRIVER_TYPES.
+        **kwargs: Constructor arguments of the underlying driver.
+
+    Returns:
+        MeasurementDriver: Adapter around a connected driver.
+    """
+    cls = driver_type(kind)
+    return cls(cls.driver_class()(**kwargs))
+
+
+class MeasurementDriver:
+    """Adapter giving a measurement driver the uniform phase protocol.
+
+    Subclasses set driver_path and implement the phases; the wrapped
+    driver stays reachable as .driver for type-specific steps.
+    """
+
+    kind = None  # Set by register_driver()
+    driver_path = None  # (module, class) of the wrapped driver
+    wait_timeout = 30.0  # Seconds for wait() when the analyzer socket has no timeout
+    min_wait_s = 0.0  # Floor of wait()'s timeout for sweeps that outlast their reported sweep time
+
+    def __init__(self, driver):
+        """Wrap a connected driver.
+
+        Args:
+            driver: Instance of the class named by driver_path.
+        """
+        self.driver = driver
+
+    @classmethod
+    def driver_class(cls):
+        """Import the wrapped driver class on first use."""
+        module_name, class_name = cls.driver_path
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def configure(self):
+        """Fully configure the instruments.
+
+        Returns:
+            dict: Seconds per configuration step, keyed like result timings.
+        """
+        raise NotImplementedError
+
+    def retune(self, freq):
+        """Move the measurement to a new centre frequency.
+
+        Args:
+            freq (float): Centre frequency in Hz.
+        """
+        raise NotImplementedError
+
+    def arm(self):
+        """Start a sweep without waiting for it."""
+        raise NotImplementedError
+
+    @method_timer
+    def wait(self, timeout=None):
+        """Wait for the sweep started by arm() to complete.
+
+        Args:
+            timeout (float, optional): Seconds before TimeoutError, default
+                the analyzer read timeout (narrowed by the watchdog), else
+                wait_timeout, but at least min_wait_s.
+        """
+        if timeout is None:
+            timeout = max(self.driver.VSA.timeout or self.wait_timeout, self.min_wait_s)
+        self.driver.VSA_wait(timeout)
+
+    def expected_duration(self):
+        """Expected seconds of one sweep from the configured sweep time and averages.
+
+        Returns:
+            float: Sweep time x average count queried from the analyzer.
+        """
+        sweep_s, count = self.driver.VSA.query(':SENS:SWE:TIME?;:SENS:AVER:COUN?').split(';')
+        return float(sweep_s) * max(1, int(float(count)))
+
+    @method_timer
+    def fetch(self):
+        """Read the results of the completed sweep.
+
+        Returns:
+            dict: Result values of the measurement type.
+        """
+        raise NotImplementedError
+
+    def teardown(self):
+        """Close the instrument connections."""
+        self.driver.close_connections()
+
+    @method_timer
+    def measure(self, timeout=None):
+        """Run arm(), wait() and fetch() back to back.
+
+        Returns:
+            dict: Result values from fetch().
+        """
+        self.arm()
+        self.wait(timeout)
+        values, _ = self.fetch()
+        return values
+
+
+@register_driver("LTE")
+class LteDriver(MeasurementDriver):
+    """LTE EVM measurement (src.measurements.lte)."""
+
+    driver_path = ("src.measurements.lte", "std_insr_driver")
+    measure_aclr = True  # Results fetched besides EVM, set with select()
+    measure_ch_pwr = True
+    use_sequencer = False
+    _level_capture = False  # A capture of the level check serves the next arm()
+    _armed = False
+
+    def select(self, measure_aclr=True, measure_ch_pwr=True, use_sequencer=False):
+        """Choose the results arm() captures and fetch() returns besides EVM.
+
+        Args:
+            measure_aclr (bool): Measure ACLR.
+            measure_ch_pwr (bool): Measure channel power when ACLR is off.
+            use_sequencer (bool): Capture EVM and ACLR in one sequencer run.
+        """
+        self.measure_aclr = measure_aclr
+        self.measure_ch_pwr = measure_ch_pwr
+        self.use_sequencer = use_sequencer and measure_aclr
+        # Only the first arm() reuses it: a retry after a watchdog abort sweeps afresh
+        self._level_capture = not self.use_sequencer and self.driver._captured == 'EVM'
+
+    def configure(self):
+        timings = {}
+        _, timings["VSG_Config"] = self.driver.VSG_Config()
+        _, timings["VSA_Config"] = self.driver.VSA_Config()
+        return timings
+
+    @method_timer
+    def retune(self, freq):
+        self.driver.VSx_freq(freq)
+
+    def arm(self):
+        self._armed = not self._level_capture
+        self._level_capture = False
+        if self.use_sequencer:
+            self.driver.VSA_seq_arm()
+        elif self._armed:
+            self.driver.VSA_arm('EVM')
+        else:
+            logger.info("Reusing the EVM capture of the level check")
+
+    def wait(self, timeout=None):
+        if not self._armed:
+            return None, 0.0  # The reused capture is already complete
+        return super().wait(timeout)
+
+    def expected_duration(self):
+        # Queried once per configuration; ACLR takes a second sweep or sequencer channel
+        return self.driver.expected_sweep_s() * (2 if self.measure_aclr else 1)
+
+    @method_timer
+    def fetch(self):
+        """Read EVM plus ACLR or channel power of the completed capture.
+
+        Returns:
+            dict: "evm", "aclr_raw" and "ch_power" (None when not measured),
+                and "timings", the seconds of each fetch step keyed like
+                result timings.
+        """
+        timings = {}
+        aclr = ch_pwr = None
+        if self.use_sequencer:
+            (evm, aclr), timings["VSA_seq_fetch"] = self.driver.VSA_seq_fetch()
+        else:
+            evm, timings["VSA_get_EVM"] = self.driver.VSA_get_EVM()  # Reuses the armed capture
+            if self.measure_aclr:
+                aclr, timings["VSA_get_ACLR"] = self.driver.VSA_get_ACLR()  # Own sweep
+            elif self.measure_ch_pwr:
+                ch_pwr = self.driver.VSA_get_chPwr()  # From the EVM capture
+        return {"evm": evm, "aclr_raw": aclr, "ch_power": ch_pwr, "timings": timings}
+
+
+@register_driver("NR5G")
+class Nr5gDriver(LteDriver):
+    """NR5G FR1 EVM measurement (src.measurements.nr5g_fr1)."""
+
+    driver_path = ("src.measurements.nr5g_fr1", "std_insr_driver")
+
+    @method_timer
+    def retune(self, freq):
+        self.driver.VSx_retune(freq)  # Analyzer only while the generator is coupled
+
+
+@register_driver("STN")
+class StnDriver(MeasurementDriver):
+    """Sub-thermal noise marker measurement (src.measurements.SubThermalNoise)."""
+
+    driver_path = ("src.measurements.SubThermalNoise", "option_functions")
+
+    def configure(self):
+        _, t = self.driver.VSA_Config()
+        return {"VSA_Config": t}
+
+    def retune(self, freq):
+        self.driver.STN_set_frequency(freq)
+
+    def arm(self):
+        self.driver.VSA_arm()
+
+    @method_timer
+    def fetch(self):
+        return {"marker": self.driver.get_noise_mkr()}
+
+
+@register_driver("SpurSearch")
+class SpurSearchDriver(MeasurementDriver):
+    """FSW-K50 spur search (src.measurements.spur_search)."""
+
+    driver_path = ("src.measurements.spur_search", "SpurSearch")
+    min_wait_s = 300.0  # FFT search over a multi-GHz span outlasts the reported sweep time
+
+    def configure(self):
+        timings = {}
+        _, timings["VSG_config"] = self.driver.VSG_config()
+        _, timings["VSA_config"] = self.driver.VSA_config()
+        return timings
+
+    def retune(self, freq):
+        # The search ranges follow the fundamental; configure() applies them
+        self.driver.fundamental_ghz = freq / 1e9
+        self.driver.frequency = freq
+
+    def arm(self):
+        self.driver.VSA_arm()
+
+    def expected_duration(self):
+        # Budget at least min_wait_s so the watchdog does not abort a legitimate search
+        return max(super().expected_duration(), self.min_wait_s / watchdog.margin)
+
+    @method_timer
+    def fetch(self):
+        spurs, _ = self.driver.get_results()
+        return {"spurs": spurs}
+
+    def teardown(self):
+        self.driver.close()
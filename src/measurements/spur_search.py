@@ -24,9 +24,7 @@ class SpurSearch:
         self.pwr = pwr
         self.frequency = fundamental_ghz * 1e9
         self.VSA = bench().VSA_start()  # Start VSA connection
-        self.VSA.sock.settimeout(30)  # Set timeout
         self.VSG = bench().VSG_start()  # Start VSG connection
-        self.VSG.sock.settimeout(30)  # Set timeout
         logger.info(f"SpurSearch initialized: fundamental={fundamental_ghz} GHz, "
                     f"RBW={rbw_mhz} MHz, spur_limit={spur_limit_dbm} dBm, VSG_power={pwr} dBm")
 
@@ -82,7 +80,7 @@ class SpurSearch:
             self.VSA.write(f'CALC1:MARK1:X:SLIM:RIGH {stop_freq2}')  # Set right limit for spur detection
             self.VSA.write(f'CALC1:THR {spur_limit_dbm}')  # Set threshold for spur detection
             self.VSA.write('CALC1:MARK1:X:SLIM:STAT ON')
-            self.VSA.write('CALC1:THR:STAT ON')
+            self.VSA.sync('CALC1:THR:STAT ON;*OPC?')  # Raise on queued errors
             #  self.VSA.query('INIT:IMM;*OPC?')  # Initiate sweep and wait for completion
             #  self.VSA.write('DISP:WIND1:SUBW:TRAC1:Y:SCAL:AUTO ONCE')  # Auto scale Y-axis
             logger.info("Spur detection table configured")
@@ -125,7 +123,7 @@ class SpurSearch:
             self.VSG.query('SOURce1:BB:ARBitrary:MCARrier:CLOad;*OPC?')
             self.VSG.write('SOURce1:BB:ARBitrary:TRIGger:OUTPut1:MODE REST')
             self.VSG.write('SOURce1:BB:ARBitrary:STATe 1')
-            self.VSG.write('OUTPut1:STATe 1')
+            self.VSG.sync('OUTPut1:STATe 1;*OPC?')  # Raise on queued errors
 
 
             logger.info(f"VSG set: frequency={frequency / 1e9:.3f} GHz, power={pwr:.2f} dBm")
@@ -156,6 +154,23 @@ class SpurSearch:
             logger.error(f"Spur search measurement failed: {e}")
             raise
 
+    def VSA_arm(self):
+        """Start the spur search sweep without blocking; see VSA_wait()."""
+        logger.info("Arming spur search sweep")
+        self.VSA.write(':INIT:CONT OFF')  # Disable continuous sweep
+        self.VSA.arm('INIT:IMM')  # Start sweep, completion flagged via *OPC/ESB
+
+    @method_timer
+    def VSA_wait(self, timeout=300.0):
+        """Wait for the sweep started by VSA_arm() to complete.
+
+        Args:
+            timeout (float): Seconds to wait before raising TimeoutError,
+                default 300 for the multi-range search.
+        """
+        self.VSA.wait_complete(timeout)
+        logger.info("Spur search measurement completed")
+
     @method_timer
     def get_results(self):
         """Retrieve spur search results.
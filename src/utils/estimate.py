@@ -0,0 +1,238 @@
+"""Campaign runtime estimation from historical timings.
+
+Learns per-step durations (configuration, retune, sweep, fetch, ...) from
+the "timings" dicts of earlier result files (results_output.json / .jsonl)
+and predicts the wall time of an expanded test plan before anything runs,
+costing each point by the steps it actually performs.
+"""
+
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Result timing keys of each step a plan point can perform
+STEP_TIMINGS = {
+    "config": {"VSG_Config", "VSA_Config", "VSG_config", "VSA_config"},
+    "retune": {"VSx_retune"},
+    "setup": {"VSA_level", "VSA_level_interp", "VSA_get_info"},  # Levelling and bookkeeping per point
+    "sweep": {"VSA_sweep_evm", "measure"},
+    "fetch": {"VSA_get_EVM", "get_results"},
+    "aclr": {"VSA_get_ACLR"},  # Own sweep and fetch
+    "sequencer": {"VSA_seq_measure"},  # EVM and ACLR in one run and fetch
+}
+ITERATION_TIMING = re.compile(r'_\d+$')  # STN marker sweeps, one key per iteration
+
+# Seconds per step for a measurement type without history
+DEFAULT_COSTS = {
+    "LTE": {"config": 5.0, "retune": 0.1, "setup": 0.0, "sweep": 0.6, "fetch": 0.2, "aclr": 0.7,
+            "sequencer": 1.0, "iteration": 0.0},
+    "NR5G": {"config": 8.0, "retune": 0.05, "setup": 0.0, "sweep": 0.4, "fetch": 0.1, "aclr": 0.5,
+             "sequencer": 0.7, "iteration": 0.0},
+    "STN": {"config": 3.0, "retune": 0.0, "setup": 0.0, "sweep": 0.0, "fetch": 0.0, "aclr": 0.0,
+            "sequencer": 0.0, "iteration": 1.0},
+    "SpurSearch": {"config": 2.0, "retune": 0.0, "setup": 0.0, "sweep": 9.5, "fetch": 0.5, "aclr": 0.0,
+                   "sequencer": 0.0, "iteration": 0.0},
+}
+
+
+def load_history(paths):
+    """Load result records from JSON or JSON Lines result files.
+
+    Args:
+        paths (list): Result files; missing or unreadable files are skipped.
+
+    Returns:
+        list: Result records.
+    """
+    records = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r') as f:
+                if path.endswith('.jsonl'):
+                    records.extend(json.loads(line) for line in f if line.strip())
+                else:
+                    records.extend(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable results history {path}: {e}")
+    return records
+
+
+class RuntimeEstimator:
+    """Per-type step costs learned from result history."""
+
+    def __init__(self, records=()):
+        """Learn the mean seconds of each step (see STEP_TIMINGS) per type.
+
+        Args:
+            records (iterable): Result records with "type" and "timings".
+        """
+        samples = {}  # type -> step -> [seconds]
+        self.history_size = 0
+        for record in records:
+            timings = record.get("timings") or {}
+            if not timings or record.get("type") not in DEFAULT_COSTS:
+                continue
+            self.history_size += 1
+            s = samples.setdefault(record["type"], {})
+            for step, keys in STEP_TIMINGS.items():
+                seconds = [t for key, t in timings.items() if key in keys]
+                if seconds:
+                    s.setdefault(step, []).append(sum(seconds))
+            s.setdefault("iteration", []).extend(
+                t for key, t in timings.items() if ITERATION_TIMING.search(key))
+        self.costs = {}
+        for kind, defaults in DEFAULT_COSTS.items():
+            s = samples.get(kind, {})
+            self.costs[kind] = {step: sum(s[step]) / len(s[step]) if s.get(step) else fallback
+                                for step, fallback in defaults.items()}
+
+    @classmethod
+    def from_history(cls, paths):
+        """Build an estimator from result files."""
+        return cls(load_history(paths))
+
+    @staticmethod
+    def steps(point):
+        """Steps an expanded plan point performs.
+
+        Returns:
+            list: STEP_TIMINGS step names, repeated per STN iteration.
+        """
+        steps = ["setup"]
+        if point["reconfig"]:
+            steps.append("config")
+        if point["retune"]:
+            steps.append("retune")
+        if point.get("iterations"):
+            return steps + ["iteration"] * point["iterations"]  # STN: one marker sweep each
+        if point.get("use_sequencer") and point.get("measure_aclr"):
+            return steps + ["sequencer"]
+        steps += ["sweep", "fetch"]
+        if point.get("measure_aclr"):
+            steps.append("aclr")
+        return steps
+
+    def point_cost(self, point):
+        """Predicted seconds for one expanded plan point."""
+        costs = self.costs[point["type"]]
+        return sum(costs[step] for step in self.steps(point))
+
+    def estimate(self, points):
+        """Predict campaign wall time.
+
+        Args:
+            points (list): Points from plan.expand_plan().
+
+        Returns:
+            tuple: (total seconds, list of (block, points, seconds) sorted by cost).
+        """
+        blocks = {}
+        for point in points:
+            n, seconds = blocks.get(point["block"], (0, 0.0))
+            blocks[point["block"]] = (n + 1, seconds + self.point_cost(point))
+        ranked = sorted(((block, n, seconds) for block, (n, seconds) in blocks.items()),
+                        key=lambda b: b[2], reverse=True)
+        return sum(b[2] for b in ranked), ranked
+
+    def report(self, points, top=10):
+        """Format the estimate with the most expensive test blocks first."""
+        total, ranked = self.estimate(points)
+        lines = [f"Estimated campaign runtime: {total:.0f} s ({total / 60:.1f} min) for {len(points)} points "
+                 f"(history: {self.history_size} records)"]
+        for block, n, seconds in ranked[:top]:
+            share = 100 * seconds / total if total else 0
+            lines.append(f"  {block:18s} {n:5d} points {seconds:9.1f} s {share:5.1f}%")
+        return "\n".join(lines)
+
+
+class LatencyModel:
+    """Static SCPI cost model for a dry run.
+
+    Counts the configurations, retunes, sweeps and SCPI commands each plan
+    point issues (mirroring the drivers) and prices them with a per-command
+    round trip and a per-type sweep time.
+    """
+
+    # Per-type SCPI (writes, queries) the drivers issue for: configure() with the sweep time
+    # query, a point (retune, power, EVM arm/wait/fetch), the extra of an ACLR sweep, a
+    # sequencer point and an STN iteration; tests/test_plan.py keeps them in sync
+    COMMANDS = {
+        "LTE": {"config": (21, 8), "point": (4, 3), "aclr": (1, 2), "sequencer": (3, 3), "iteration": (0, 0)},
+        "NR5G": {"config": (27, 9), "point": (2, 4), "aclr": (2, 2), "sequencer": (3, 3), "iteration": (0, 0)},
+        "STN": {"config": (16, 7), "point": (2, 1), "aclr": (0, 0), "sequencer": (0, 0), "iteration": (2, 2)},
+        "SpurSearch": {"config": (41, 5), "point": (3, 5), "aclr": (0, 0), "sequencer": (0, 0),
+                       "iteration": (0, 0)},
+    }
+    SWEEP_S = {"LTE": 0.05, "NR5G": 0.05, "STN": 1.0, "SpurSearch": 10.0}
+
+    def __init__(self, write_s=0.002, query_s=0.01, config_s=1.0, sweep_s=None):
+        """Set the latency assumptions.
+
+        Args:
+            write_s (float): Seconds per write.
+            query_s (float): Seconds per query round trip (excluding sweeps).
+            config_s (float): Extra settling per configuration (*RST, app switch).
+            sweep_s (dict, optional): Per-type sweep seconds overriding SWEEP_S.
+        """
+        self.write_s = write_s
+        self.query_s = query_s
+        self.config_s = config_s
+        self.sweep_s = dict(self.SWEEP_S, **(sweep_s or {}))
+
+    def counts(self, point):
+        """Count the operations of one plan point.
+
+        Returns:
+            dict: reconfigs, retunes, sweeps, writes and queries.
+        """
+        cmds = self.COMMANDS[point["type"]]
+        parts = ["point"]
+        sweeps = 1
+        if point.get("use_sequencer") and point.get("measure_aclr"):
+            parts = ["sequencer"]  # One INIT:SEQ and one bulk fetch
+        elif point.get("measure_aclr"):
+            parts.append("aclr")
+            sweeps += 1
+        if point["reconfig"]:
+            parts.append("config")
+        iterations = point.get("iterations", 0)
+        if iterations:
+            sweeps = iterations  # STN: one marker sweep per iteration
+        writes = sum(cmds[p][0] for p in parts) + cmds["iteration"][0] * iterations
+        queries = sum(cmds[p][1] for p in parts) + cmds["iteration"][1] * iterations
+        return {"reconfigs": int(point["reconfig"]), "retunes": int(point["retune"]), "sweeps": sweeps,
+                "writes": writes, "queries": queries}
+
+    def seconds(self, point, counts=None):
+        """Modelled seconds of one plan point."""
+        counts = counts or self.counts(point)
+        return (counts["writes"] * self.write_s + counts["queries"] * self.query_s
+                + counts["sweeps"] * self.sweep_s[point["type"]] + counts["reconfigs"] * self.config_s)
+
+    def report(self, points):
+        """Format a per-type cost breakdown of an expanded plan."""
+        keys = ("reconfigs", "retunes", "sweeps", "writes", "queries")
+        rows = {}
+        for point in points:
+            counts = self.counts(point)
+            row = rows.setdefault(point["type"], dict.fromkeys(keys + ("points", "seconds"), 0))
+            for key in keys:
+                row[key] += counts[key]
+            row["points"] += 1
+            row["seconds"] += self.seconds(point, counts)
+        lines = [f"{'Type':10s} {'points':>7s} {'reconf':>7s} {'retune':>7s} {'sweeps':>7s} "
+                 f"{'SCPI':>8s} {'seconds':>9s}"]
+        total = dict.fromkeys(keys + ("points", "seconds"), 0)
+        for kind, row in rows.items():
+            for key in total:
+                total[key] += row[key]
+            lines.append(f"{kind:10s} {row['points']:7d} {row['reconfigs']:7d} {row['retunes']:7d} "
+                         f"{row['sweeps']:7d} {row['writes'] + row['queries']:8d} {row['seconds']:9.1f}")
+        lines.append(f"{'Total':10s} {total['points']:7d} {total['reconfigs']:7d} {total['retunes']:7d} "
+                     f"{total['sweeps']:7d} {total['writes'] + total['queries']:8d} {total['seconds']:9.1f}")
+        return "\n".join(lines)
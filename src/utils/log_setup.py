@@ -0,0 +1,146 @@
+"""Non-blocking logging setup for measurement runs.
+
+Log records are handed to a QueueHandler and written by a QueueListener
+background thread, so the measurement loop never waits on file or console
+I/O. Files rotate by size and levels can be set per module.
+
+SCPI traffic is not logged line by line: iSocket appends every command and
+response to a ring buffer that is only dumped when a command fails
+('ring' mode). 'sample' mode additionally logs every Nth command and 'full'
+mode logs everything, as iSocket used to.
+"""
+
+import atexit
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+_listener = None
+
+
+class ScpiTrafficLog:
+    """Ring buffer of recent SCPI traffic, dumped to the log on error."""
+
+    MODES = ('ring', 'sample', 'full')
+
+    def __init__(self, mode='ring', size=200, sample_every=100):
+        """Create the buffer.
+
+        Args:
+            mode (str): 'ring', 'sample' or 'full'.
+            size (int): Number of recent commands kept.
+            sample_every (int): Log one command in N in 'sample' mode.
+        """
+        self.configure(mode, size, sample_every)
+        self.logger = logging.getLogger('src.instruments.iSocket.traffic')
+
+    def configure(self, mode='ring', size=200, sample_every=100):
+        """Change mode and buffer size; drops buffered traffic."""
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid SCPI traffic mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.sample_every = max(1, int(sample_every))
+        self.buffer = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def add(self, address, direction, text):
+        """Record one command or response.
+
+        Args:
+            address (str): Instrument label.
+            direction (str): 'Write', 'Query' or 'Response'.
+            text (str): Command or response text.
+        """
+        self.buffer.append((time.time(), address, direction, text))
+        if self.mode == 'full':
+            self.logger.debug(f"{address} {direction}: {text}")
+        elif self.mode == 'sample' and direction != 'Response':
+            with self._lock:
+                self._count += 1
+                sampled = self._count % self.sample_every == 0
+            if sampled:
+                self.logger.debug(f"{address} {direction} (1 in {self.sample_every}): {text}")
+
+    def dump(self, reason):
+        """Log the buffered traffic leading up to an error and clear it.
+
+        Args:
+            reason (str): Why the buffer is dumped.
+        """
+        entries = list(self.buffer)
+        self.buffer.clear()
+        lines = [f"{time.strftime('%H:%M:%S', time.localtime(t))}.{int(t % 1 * 1000):03d} "
+                 f"{address} {direction}: {text}" for t, address, direction, text in entries]
+        self.logger.error(f"{reason}; last {len(lines)} SCPI exchanges:\n" + "\n".join(lines))
+
+
+scpi_traffic = ScpiTrafficLog()  # Shared by every iSocket of the run
+
+
+def configure_logging(log_dir, filename='project.log', level=logging.DEBUG, console_level=logging.INFO,
+                      module_levels=None, max_bytes=5 * 1024 * 1024, backup_count=5,
+                      scpi_mode='ring', scpi_buffer=200, scpi_sample_every=100):
+    """Route all logging through a background queue listener.
+
+    Args:
+        log_dir (str): Directory for the rotating log file.
+        filename (str): Log file name, default 'project.log'.
+        level (int): Root logger level.
+        console_level (int): Minimum level echoed to the console.
+        module_levels (dict, optional): Logger name -> level overrides.
+        max_bytes (int): Rotate the log file at this size.
+        backup_count (int): Number of rotated files kept.
+        scpi_mode (str): SCPI traffic mode ('ring', 'sample' or 'full').
+        scpi_buffer (int): Number of SCPI exchanges kept for error dumps.
+        scpi_sample_every (int): Sampling interval in 'sample' mode.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, filename), maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(console_level)
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+    if scpi_traffic.logger.name not in (module_levels or {}):
+        # Sampled/full traffic is logged at DEBUG; keep it visible under a quieter 'src.instruments'
+        scpi_traffic.logger.setLevel(logging.NOTSET if scpi_mode == 'ring' else logging.DEBUG)
+
+    scpi_traffic.configure(scpi_mode, scpi_buffer, scpi_sample_every)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                               respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
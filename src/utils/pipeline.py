@@ -0,0 +1,75 @@
+"""Overlapped measurement pipeline.
+
+The calling thread is the producer: it drives the instruments and submits one
+raw point per measurement. Host-side stages (parsing, statistics,
+persistence) run in worker threads connected by bounded queues, so they
+overlap the capture of the next point while the producer is blocked on the
+instruments. The bounded queues keep the producer at most a few points ahead
+of the slowest stage.
+"""
+
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # Sentinel passed down the stages on close()
+
+
+class Pipeline:
+    """Chain of host-side stages fed by the instrument-control thread."""
+
+    def __init__(self, stages, maxsize=2, name='pipeline'):
+        """Start one worker thread per stage.
+
+        Args:
+            stages (list): Callables; each receives the previous stage's
+                output. A stage returning None drops the item.
+            maxsize (int): Capacity of each queue between stages.
+            name (str): Thread name prefix.
+        """
+        self.queues = [queue.Queue(maxsize) for _ in stages]
+        self.errors = []
+        self.threads = []
+        for i, stage in enumerate(stages):
+            thread = threading.Thread(target=self._run, args=(i, stage),
+                                      name=f"{name}-{getattr(stage, '__name__', i)}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self, index, stage):
+        """Worker loop of one stage."""
+        q_in = self.queues[index]
+        q_out = self.queues[index + 1] if index + 1 < len(self.queues) else None
+        while True:
+            item = q_in.get()
+            if item is _STOP:
+                if q_out is not None:
+                    q_out.put(_STOP)
+                return
+            try:
+                out = stage(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {getattr(stage, '__name__', index)} failed: {e}", exc_info=True)
+                self.errors.append(e)
+                continue
+            if q_out is not None and out is not None:
+                q_out.put(out)
+
+    def submit(self, item):
+        """Hand a raw point to the first stage; blocks while the queue is full."""
+        self.queues[0].put(item)
+
+    def close(self):
+        """Drain all stages and stop the worker threads."""
+        self.queues[0].put(_STOP)
+        for thread in self.threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,323 @@
+"""Test plan loading, validation and expansion.
+
+test_inputs.json is checked against a schema, its LTE/NR5G numerology is
+validated and its blocks are expanded into the flat list of measurement
+points main.py will run, in the same order and with the same
+reconfiguration decisions, without touching any instrument. The result is
+an immutable Plan, cached on disk keyed by the input file's hash so a
+repeated launch skips validation and expansion.
+"""
+
+import collections.abc
+import hashlib
+import json
+import logging
+import os
+import types
+from src.measurements.lte_numerology import validate_lte_plan
+from src.measurements.nr5g_numerology import validate_nr5g_plan
+
+logger = logging.getLogger(__name__)
+
+
+def expand_frequencies(freq_input):
+    """Expand a frequency input (value, list or range dict) into a list in GHz.
+
+    Args:
+        freq_input: Single frequency, list of frequencies, or
+            {"range": {"start_ghz", "stop_ghz", "step_mhz"}}.
+
+    Returns:
+        list: Frequencies in GHz.
+    """
+    if isinstance(freq_input, collections.abc.Mapping) and "range" in freq_input:  # Frozen by Plan
+        range_config = freq_input["range"]
+        start_ghz = range_config.get("start_ghz")
+        stop_ghz = range_config.get("stop_ghz")
+        step_mhz = range_config.get("step_mhz")
+        if None in [start_ghz, stop_ghz, step_mhz]:
+            raise ValueError(f"Missing range parameters: {range_config}")
+        if not all(isinstance(x, (int, float)) for x in [start_ghz, stop_ghz, step_mhz]):
+            raise ValueError(f"Invalid range parameter types: {range_config}")
+        if start_ghz > stop_ghz:
+            raise ValueError(f"Start frequency ({start_ghz} GHz) exceeds stop ({stop_ghz} GHz)")
+        if step_mhz <= 0:
+            raise ValueError(f"Invalid step size: {step_mhz} MHz")
+        import numpy as np  # Only needed for range plans
+        num_steps = int((stop_ghz - start_ghz) / (step_mhz / 1000.0)) + 1
+        frequencies = np.linspace(start_ghz, stop_ghz, num_steps).tolist()
+        logger.info(f"Generated {len(frequencies)} frequencies: {frequencies} GHz")
+        return frequencies
+    if isinstance(freq_input, (list, tuple, float, int)):
+        frequencies = list(freq_input) if isinstance(freq_input, (list, tuple)) else [freq_input]
+        logger.info(f"Using discrete frequencies: {frequencies} GHz")
+        return frequencies
+    raise ValueError(f"Invalid frequency format: {freq_input}")
+
+
+def waveform_config(kind, test):
+    """Waveform settings whose change forces a VSA/VSG reconfiguration.
+
+    Mirrors the current_config comparison of the LTE/NR5G runners.
+
+    Args:
+        kind (str): "LTE" or "NR5G".
+        test (dict): Test block.
+
+    Returns:
+        dict: Settings compared between consecutive points.
+    """
+    if kind == "NR5G":
+        return {
+            "resource_blocks": test.get("resource_blocks", 51),
+            "resource_block_offset": test.get("resource_block_offset", 0),
+            "channel_bandwidth_mhz": test.get("channel_bandwidth_mhz", 20),
+            "modulation_type": test.get("modulation_type", "QAM256"),
+            "subcarrier_spacing_khz": test.get("subcarrier_spacing_khz", 30)
+        }
+    return {
+        "resource_blocks": test.get("resource_blocks"),
+        "resource_block_offset": test.get("resource_block_offset", 0),
+        "channel_bandwidth_mhz": test.get("channel_bandwidth_mhz", 20),
+        "modulation_type": test.get("modulation_type", "QAM256"),
+        "duplexing": test.get("duplexing", "FDD"),
+        "link_direction": test.get("link_direction", "UL")
+    }
+
+
+def _as_list(value):
+    """Wrap a scalar in a list."""
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def expand_plan(inputs):
+    """Expand test inputs into measurement points in run order.
+
+    Args:
+        inputs (dict): Test inputs as loaded from test_inputs.json.
+
+    Returns:
+        list: One dict per point with "type", "block" (e.g. "lte[0]"),
+            "frequency_ghz", "power_dbm", "reconfig", "retune" and, for STN,
+            "iterations".
+    """
+    points = []
+    previous_config = None
+    for kind, section in (("LTE", "lte"), ("NR5G", "nr5g")):
+        if kind == "NR5G":
+            previous_config = None  # main resets the comparison before NR5G
+        for i, test in enumerate(inputs.get(section, [])):
+            if not test.get("run", False):
+                continue
+            config = waveform_config(kind, test)
+            previous_freq = None
+            for freq in _as_list(test["center_frequency_ghz"]):
+                for pwr in _as_list(test["power_dbm"]):
+                    points.append({
+                        "type": kind,
+                        "block": f"{section}[{i}]",
+                        "frequency_ghz": freq,
+                        "power_dbm": pwr,
+                        "reconfig": config != previous_config,
+                        "retune": freq != previous_freq,
+                        "measure_aclr": test.get("measure_aclr", True),
+                        "use_sequencer": test.get("use_sequencer", False)
+                    })
+                    previous_config = config
+                    previous_freq = freq
+    for i, test in enumerate(inputs.get("STN", [])):
+        if not test.get("run", False):
+            continue
+        for freq in expand_frequencies(test.get("center_frequency_ghz")):
+            points.append({"type": "STN", "block": f"STN[{i}]", "frequency_ghz": freq, "power_dbm": None,
+                           "reconfig": True, "retune": True, "iterations": test.get("iterations", 10)})
+    for i, test in enumerate(inputs.get("spur_search", [])):
+        if not test.get("run", False):
+            continue
+        for freq in expand_frequencies(test["fundamental_frequency_ghz"]):
+            points.append({"type": "SpurSearch", "block": f"spur_search[{i}]", "frequency_ghz": freq,
+                           "power_dbm": test.get("power_dbm", -70), "reconfig": True, "retune": True})
+    return points
+
+
+PLAN_VERSION = 1  # Bump when the compiled plan layout changes; invalidates cached plans
+
+# Field types: 'bool', 'int', 'number', 'str', 'numbers' (number or list), 'freqs' (numbers or range dict)
+_WAVEFORM_FIELDS = {
+    "run": 'bool', "center_frequency_ghz": 'numbers', "power_dbm": 'numbers',
+    "resource_block_offset": 'int', "channel_bandwidth_mhz": 'number', "modulation_type": 'str',
+    "measure_ch_pwr": 'bool', "measure_aclr": 'bool', "use_sequencer": 'bool', "level_mode": 'str',
+}
+SCHEMA = {
+    "lte": (dict(_WAVEFORM_FIELDS, resource_blocks='int', duplexing='str', link_direction='str'),
+            ("center_frequency_ghz", "power_dbm")),
+    "nr5g": (dict(_WAVEFORM_FIELDS, resource_blocks='int', subcarrier_spacing_khz='int', auto_level='bool',
+                  duplexing='str', link_direction='str'),
+             ("center_frequency_ghz", "power_dbm")),
+    "STN": ({"run": 'bool', "center_frequency_ghz": 'freqs', "iterations": 'int'},
+            ("center_frequency_ghz",)),
+    "spur_search": ({"run": 'bool', "fundamental_frequency_ghz": 'freqs', "rbw_mhz": 'number',
+                     "spur_limit_dbm": 'number', "power_dbm": 'number'},
+                    ("fundamental_frequency_ghz",)),
+}
+
+
+def _is_number(value):
+    """True for int/float but not bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_type(kind, value):
+    """Return True if a value matches a schema field type."""
+    if kind == 'bool':
+        return isinstance(value, bool)
+    if kind == 'int':
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind == 'number':
+        return _is_number(value)
+    if kind == 'str':
+        return isinstance(value, str)
+    if kind == 'numbers':
+        return _is_number(value) or (isinstance(value, list) and bool(value) and all(map(_is_number, value)))
+    if kind == 'freqs':
+        if isinstance(value, dict):
+            return isinstance(value.get("range"), dict)
+        return _check_type('numbers', value)
+    raise ValueError(f"Unknown schema type {kind}")
+
+
+def validate_inputs(inputs):
+    """Check test inputs against the schema.
+
+    Args:
+        inputs (dict): Test inputs as loaded from test_inputs.json.
+
+    Returns:
+        list: Error strings; empty if the inputs are valid.
+    """
+    if not isinstance(inputs, dict):
+        return ["test inputs must be a JSON object"]
+    errors = [f"unknown section '{section}'" for section in inputs if section not in SCHEMA]
+    for section, (fields, required) in SCHEMA.items():
+        tests = inputs.get(section, [])
+        if not isinstance(tests, list):
+            errors.append(f"{section}: must be a list of test blocks")
+            continue
+        for i, test in enumerate(tests):
+            if not isinstance(test, dict):
+                errors.append(f"{section}[{i}]: must be an object")
+                continue
+            for key, value in test.items():
+                if key not in fields:
+                    errors.append(f"{section}[{i}]: unknown field '{key}'")
+                elif not _check_type(fields[key], value):
+                    errors.append(f"{section}[{i}].{key}: expected {fields[key]}, got {value!r}")
+            if test.get("run", False):
+                errors.extend(f"{section}[{i}]: missing required field '{key}'" for key in required
+                              if key not in test)
+    return errors
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return types.MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class Plan:
+    """Immutable compiled test plan: validated inputs plus expanded points."""
+
+    __slots__ = ('inputs', 'points', 'source_hash', 'skipped')
+
+    def __init__(self, inputs, points, source_hash=None, skipped=()):
+        """Freeze a compiled plan.
+
+        Args:
+            inputs (dict): Validated test inputs (invalid blocks removed).
+            points (list): Points from expand_plan().
+            source_hash (str, optional): SHA-256 of the source file.
+            skipped (list): Reasons for blocks dropped by numerology validation.
+        """
+        object.__setattr__(self, 'inputs', _freeze(inputs))
+        object.__setattr__(self, 'points', _freeze(points))
+        object.__setattr__(self, 'source_hash', source_hash)
+        object.__setattr__(self, 'skipped', tuple(skipped))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Plan is immutable")
+
+
+def compile_plan(inputs, source_hash=None):
+    """Validate and expand test inputs.
+
+    Schema errors are fatal; blocks with an invalid LTE/NR5G numerology are
+    dropped and reported in Plan.skipped so the rest of the plan still runs.
+
+    Args:
+        inputs (dict): Test inputs as loaded from test_inputs.json.
+        source_hash (str, optional): SHA-256 of the source file.
+
+    Returns:
+        tuple: (Plan, plain-dict form for caching).
+
+    Raises:
+        ValueError: If the inputs do not match the schema.
+    """
+    errors = validate_inputs(inputs)
+    if errors:
+        raise ValueError("Invalid test inputs:\n  " + "\n  ".join(errors))
+    lte_tests, lte_errors = validate_lte_plan(inputs.get("lte", []))
+    nr5g_carriers, nr5g_errors = validate_nr5g_plan(inputs.get("nr5g", []))
+    valid = dict(inputs)
+    valid["lte"] = lte_tests
+    valid["nr5g"] = [test for test, _ in nr5g_carriers]
+    for section in ("lte", "nr5g"):  # Normalize scalar frequencies/powers to lists
+        valid[section] = [dict(test, center_frequency_ghz=_as_list(test["center_frequency_ghz"]),
+                               power_dbm=_as_list(test["power_dbm"])) for test in valid[section]]
+    compiled = {"version": PLAN_VERSION, "inputs": valid, "points": expand_plan(valid),
+                "skipped": lte_errors + nr5g_errors}
+    return Plan(valid, compiled["points"], source_hash, compiled["skipped"]), compiled
+
+
+def load_plan(path, cache_dir=None):
+    """Load test inputs as a compiled plan, using the on-disk plan cache.
+
+    Args:
+        path (str): test_inputs.json path.
+        cache_dir (str, optional): Directory of cached plans, default
+            logs/plan_cache under the project root.
+
+    Returns:
+        Plan: Compiled plan.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON or does not match the schema.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    if cache_dir is None:
+        cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'logs', 'plan_cache'))
+    cache_path = os.path.join(cache_dir, f"{source_hash}.json")
+    try:
+        with open(cache_path, 'r') as f:
+            compiled = json.load(f)
+        if compiled.get("version") == PLAN_VERSION:
+            logger.info(f"Loaded compiled plan from cache {cache_path}")
+            return Plan(compiled["inputs"], compiled["points"], source_hash, compiled["skipped"])
+    except (OSError, ValueError):
+        pass  # Cache miss or unreadable entry: compile again
+    plan, compiled = compile_plan(json.loads(raw), source_hash)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(compiled, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache compiled plan: {e}")
+    return plan
@@ -0,0 +1,258 @@
+"""Structured span tracing for measurement campaigns.
+
+Spans nest per thread: test set -> driver method -> SCPI command. Tracing is
+disabled by default; while disabled, span() hands back a shared no-op object
+and iSocket skips span bookkeeping entirely, so the hot path pays one
+attribute check. Finished spans export to Chrome trace JSON (chrome://tracing,
+Perfetto) or OpenTelemetry OTLP/JSON files.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A timed, named interval with attributes and a parent span."""
+
+    __slots__ = ('tracer', 'name', 'category', 'attributes', 'span_id', 'parent_id',
+                 'thread_id', 'start', 'end')
+
+    def __init__(self, tracer, name, category, attributes, parent_id):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.span_id = tracer._new_id()
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.start = None
+        self.end = None
+
+    def set(self, key, value):
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.tracer._push(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.attributes['error'] = repr(exc)
+        self.tracer._pop(self)
+        return False
+
+    @property
+    def duration(self):
+        """Span duration in seconds."""
+        return (self.end or time.perf_counter()) - self.start
+
+    def summary(self):
+        """Return a JSON-serializable record of the span and its children.
+
+        Child SCPI spans are counted rather than listed to keep result
+        records small; the full timeline lives in the exported trace.
+        """
+        children = self.tracer.children.get(self.span_id, [])
+        return {
+            "trace_id": self.tracer.trace_id,
+            "span_id": f"{self.span_id:016x}",
+            "start_us": round((self.start - self.tracer.t0) * 1e6),
+            "duration_us": round(self.duration * 1e6),
+            "children": [{"name": c.name, "start_us": round((c.start - self.tracer.t0) * 1e6),
+                          "duration_us": round(c.duration * 1e6),
+                          "scpi_commands": len(self.tracer.children.get(c.span_id, []))}
+                         for c in children if c.category != 'scpi'],
+            "scpi_commands": sum(1 for c in children if c.category == 'scpi'),
+        }
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled; does nothing."""
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def summary(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects nested spans for one campaign."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.children = defaultdict(list)  # parent span id -> finished child spans
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.t0 = time.perf_counter()
+        self.epoch0 = time.time()  # Wall-clock time matching t0, for OTLP timestamps
+        self.trace_id = os.urandom(16).hex()
+
+    def enable(self):
+        """Start collecting spans."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting spans; already finished spans are kept."""
+        self.enabled = False
+
+    def reset(self):
+        """Drop all spans and start a new trace."""
+        with self._lock:
+            self.spans = []
+            self.children = defaultdict(list)
+        self.t0 = time.perf_counter()
+        self.epoch0 = time.time()
+        self.trace_id = os.urandom(16).hex()
+
+    def _new_id(self):
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+        return span_id
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span):
+        self._stack().append(span)
+
+    def _pop(self, span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        self._finish(span)
+
+    def _finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+            self.children[span.parent_id].append(span)
+
+    def current(self):
+        """Return the innermost open span of this thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, name, category='function', **attributes):
+        """Open a span as a context manager.
+
+        Args:
+            name (str): Span name.
+            category (str): Category, e.g. 'test_set', 'driver' or 'scpi'.
+            **attributes: Span attributes.
+
+        Returns:
+            Span: Context manager (NULL_SPAN while tracing is disabled).
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        parent = self.current()
+        return Span(self, name, category, attributes, parent.span_id if parent else None)
+
+    def add_span(self, name, category, start, end, **attributes):
+        """Record an already finished span under the current span.
+
+        Used for SCPI commands whose timestamps iSocket measures anyway.
+
+        Args:
+            name (str): Span name.
+            category (str): Span category.
+            start (float): time.perf_counter() at start.
+            end (float): time.perf_counter() at end.
+            **attributes: Span attributes.
+        """
+        parent = self.current()
+        span = Span(self, name, category, attributes, parent.span_id if parent else None)
+        span.start = start
+        span.end = end
+        self._finish(span)
+
+    def export_chrome(self, path):
+        """Write finished spans as Chrome trace JSON.
+
+        Args:
+            path (str): Output file path.
+        """
+        events = [{
+            "name": s.name,
+            "cat": s.category,
+            "ph": "X",
+            "ts": round((s.start - self.t0) * 1e6, 3),
+            "dur": round((s.end - s.start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": s.thread_id,
+            "args": {k: str(v) for k, v in s.attributes.items()},
+        } for s in self.spans]
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Exported {len(events)} spans to Chrome trace {path}")
+
+    def export_otlp(self, path, service_name='rf-measurements'):
+        """Write finished spans as OpenTelemetry OTLP/JSON.
+
+        Args:
+            path (str): Output file path.
+            service_name (str): Value of the service.name resource attribute.
+        """
+        def nanos(t):
+            return str(int((self.epoch0 + (t - self.t0)) * 1e9))
+
+        spans = []
+        for s in self.spans:
+            span = {
+                "traceId": self.trace_id,
+                "spanId": f"{s.span_id:016x}",
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": nanos(s.start),
+                "endTimeUnixNano": nanos(s.end),
+                "attributes": [{"key": "category", "value": {"stringValue": s.category}}] +
+                              [{"key": k, "value": {"stringValue": str(v)}} for k, v in s.attributes.items()],
+            }
+            if s.parent_id is not None:
+                span["parentSpanId"] = f"{s.parent_id:016x}"
+            spans.append(span)
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]}
+        with open(path, 'w') as f:
+            json.dump(document, f)
+        logger.info(f"Exported {len(spans)} spans to OTLP file {path}")
+
+    def export(self, path, fmt='chrome'):
+        """Export spans in the given format ('chrome' or 'otlp')."""
+        if fmt == 'otlp':
+            self.export_otlp(path)
+        elif fmt == 'chrome':
+            self.export_chrome(path)
+        else:
+            raise ValueError(f"Unknown trace format: {fmt}")
+
+
+tracer = Tracer()  # Shared tracer for the run
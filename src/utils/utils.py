@@ -3,11 +3,19 @@
 Provides timing decorators and standard configuration/measurement functions.
 """
 
+import functools
+import logging
 import timeit
+from src.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 
 def method_timer(method):
-    """Decorator to measure and print execution time of a method.
+    """Decorator to time a driver method and trace it as a span.
+
+    The method runs inside a 'driver' span (a no-op while tracing is
+    disabled), so SCPI commands it sends nest under it in the trace.
 
     Args:
         method (callable): Method to time.
@@ -15,12 +23,14 @@ def method_timer(method):
     Returns:
         callable: Wrapped method that returns result and execution time.
     """
+    @functools.wraps(method)
     def wrapper(*args, **kwargs):
-        start_time = timeit.default_timer()
-        result = method(*args, **kwargs)
-        stop_time = timeit.default_timer()
+        with tracer.span(method.__qualname__, 'driver'):
+            start_time = timeit.default_timer()
+            result = method(*args, **kwargs)
+            stop_time = timeit.default_timer()
         delta_time = stop_time - start_time
-        print(f"{method.__name__:15s}: {delta_time:.3f} secs")
+        logger.debug(f"{method.__name__:15s}: {delta_time:.3f} secs")
         return result, delta_time
     return wrapper
 
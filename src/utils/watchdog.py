@@ -0,0 +1,104 @@
+"""Per-step watchdog for measurement sweeps.
+
+A hung sweep used to block in sock.recv for the full socket timeout (30 s)
+and fail the whole test set. The watchdog narrows the analyzer's read
+timeout to a budget derived from the step's expected duration (sweep time x
+averages, with a margin), aborts an overrun with ABOR;*CLS and retries the
+step, so a stall costs seconds instead of the full timeout.
+
+Only sweep/fetch steps run under the watchdog; configuration and
+auto-level keep the socket timeout from bench_config.ini.
+"""
+
+import logging
+import socket
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_ERRORS = (socket.timeout, TimeoutError)
+
+
+class PointTimeout(TimeoutError):
+    """A watched step overran its budget and was aborted."""
+
+
+class Watchdog:
+    """Budgets, aborts and retries watched measurement steps."""
+
+    def __init__(self, margin=3.0, overhead_s=2.0, retries=1):
+        """Set the budget rule.
+
+        Args:
+            margin (float): Budget multiple of the expected duration.
+            overhead_s (float): Seconds added for processing and transfer.
+            retries (int): Retries of a step after an overrun.
+        """
+        self.configure(margin, overhead_s, retries)
+        self.overruns = 0
+
+    def configure(self, margin=3.0, overhead_s=2.0, retries=1):
+        """Change the budget rule; see __init__()."""
+        self.margin = margin
+        self.overhead_s = overhead_s
+        self.retries = retries
+
+    def budget(self, expected_s):
+        """Seconds a step with the given expected duration may take."""
+        return expected_s * self.margin + self.overhead_s
+
+    @contextmanager
+    def guard(self, sock, expected_s, label):
+        """Run a block with the analyzer read timeout narrowed to the budget.
+
+        Args:
+            sock (iSocket): Analyzer connection the step waits on.
+            expected_s (float): Expected duration of the step in seconds.
+            label (str): Step name for log messages.
+
+        Yields:
+            float: Budget in seconds.
+
+        Raises:
+            PointTimeout: If the block timed out; the operation is aborted.
+        """
+        budget = self.budget(expected_s)
+        previous = sock.set_timeout(budget)
+        try:
+            yield budget
+        except PointTimeout:
+            raise
+        except TIMEOUT_ERRORS as e:
+            self.overruns += 1
+            logger.warning(f"{label} overran its {budget:.1f} s watchdog budget: {e}")
+            sock.abort()
+            raise PointTimeout(f"{label} exceeded {budget:.1f} s") from e
+        finally:
+            sock.set_timeout(previous)
+
+    def run(self, label, sock, expected_s, func, *args, **kwargs):
+        """Call func under guard(), retrying it after an overrun.
+
+        Args:
+            label (str): Step name for log messages.
+            sock (iSocket): Analyzer connection the step waits on.
+            expected_s (float): Expected duration of the step in seconds.
+            func (callable): Step to run; must be safe to repeat.
+
+        Returns:
+            Result of func.
+
+        Raises:
+            PointTimeout: If every attempt overran.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                with self.guard(sock, expected_s, label):
+                    return func(*args, **kwargs)
+            except PointTimeout:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {label} ({attempt + 1}/{self.retries})")
+
+
+watchdog = Watchdog()  # Shared by the runners of the campaign
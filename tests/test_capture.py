@@ -0,0 +1,124 @@
+# tests/test_capture.py
+import unittest
+from src.instruments.bench import bench
+from src.measurements.lte import std_insr_driver as LTE
+from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
+from src.measurements.nr5g_numerology import NrCarrier
+
+
+class FakeSocket:
+    """Records SCPI traffic instead of talking to an instrument."""
+
+    def __init__(self):
+        self.log = []
+
+    def write(self, cmd):
+        self.log.append(cmd)
+
+    def query(self, cmd):
+        self.log.append(cmd)
+        if cmd.startswith(':FETC') and 'ACP' in cmd:
+            return '-38.5;-10.0,-45.0,-45.5,-50.0,-50.5'
+        if cmd.startswith(':STAT'):
+            return '0'
+        if 'ACP' in cmd:
+            return '-10.0,-45.0,-45.5,-50.0,-50.5'
+        return '1'
+
+    def queryFloat(self, cmd):
+        self.log.append(cmd)
+        return -40.0
+
+    def clear_error(self):
+        self.query(':SYST:ERR:ALL?')
+        return []
+
+    def sync(self, cmd='*OPC?'):
+        return self.query(cmd)
+
+    def close(self):
+        pass
+
+    def sweeps(self):
+        return sum(cmd.startswith('INIT:IMM') for cmd in self.log)
+
+
+def make_driver(cls):
+    """Build a driver on fake sockets without opening bench connections."""
+    drv = cls.__new__(cls)
+    drv.VSA, drv.VSG = FakeSocket(), FakeSocket()
+    drv.freq, drv.pwr, drv.bw, drv.swp_time = 6e9, -10.0, 20, 0.01
+    drv.carrier = NrCarrier(20, 30)  # Used by NR5G only
+    drv._meas, drv._captured, drv._seq_channels, drv._sweep_s = 'EVM', None, None, None
+    return drv
+
+
+class TestCaptureOnce(unittest.TestCase):
+    def test_one_sweep_per_point_and_measurement_type(self):
+        for cls in (LTE, NR5GDriver):
+            drv = make_driver(cls)
+            drv.VSA_sweep()
+            drv.VSA_get_EVM()
+            self.assertEqual(drv.VSA.sweeps(), 1, cls.__module__)
+            drv.VSA_get_ACLR()
+            drv.VSA_get_ACLR()
+            self.assertEqual(drv.VSA.sweeps(), 2, cls.__module__)
+            drv.VSx_freq(6.1e9)  # New point invalidates the capture
+            drv.VSA_sweep()
+            drv.VSA_get_EVM()
+            self.assertEqual(drv.VSA.sweeps(), 3, cls.__module__)
+
+    def test_sequencer_fetches_evm_and_aclr_in_one_query(self):
+        for cls in (LTE, NR5GDriver):
+            drv = make_driver(cls)
+            (evm, aclr), _ = drv.VSA_seq_measure()
+            self.assertEqual(evm, -38.5)
+            self.assertEqual(aclr.split(',')[1], '-45.0')
+            drv.VSA.log.clear()
+            drv.VSA_seq_measure()
+            # No measurement switch per point: one sequencer run and one fetch
+            self.assertEqual(len(drv.VSA.log), 2, cls.__module__)
+
+    def test_nr5g_aclr_channels_follow_the_carrier(self):
+        drv = make_driver(NR5GDriver)
+        drv.VSA_get_ACLR()
+        setup = next(cmd for cmd in drv.VSA.log if 'ACH:ACP' in cmd)
+        self.assertIn(':SENS:POW:ACH:BWID:ACH 18360000', setup)  # 51 RB x 12 x 30 kHz
+        self.assertIn(':SENS:POW:ACH:SPAC:ACH 20000000', setup)
+
+    def test_sequencer_unparsable_evm_is_nan(self):
+        for cls in (LTE, NR5GDriver):
+            drv = make_driver(cls)
+            drv.VSA.query = lambda cmd: '---;-10.0,-45.0' if cmd.startswith(':FETC') else '1'
+            (evm, aclr), _ = drv.VSA_seq_measure()
+            self.assertNotEqual(evm, evm, cls.__module__)  # NaN
+            self.assertEqual(aclr, '-10.0,-45.0')
+
+    def test_lte_channel_power_reuses_evm_capture(self):
+        drv = make_driver(LTE)
+        drv.VSA_sweep()
+        drv.VSA_get_EVM()
+        self.assertEqual(drv.VSA_get_chPwr(), -40.0)
+        self.assertIn(':FETC:CC1:SUMM:POW?', drv.VSA.log)
+        self.assertEqual(drv.VSA.sweeps(), 1)
+
+    def test_nr5g_generator_coupling_once_per_session(self):
+        drv = make_driver(NR5GDriver)
+        drv.VSA_Config()
+        drv.VSA_Config()
+        self.assertEqual(drv.VSA.log.count('*RST;*OPC?'), 2)  # Stale channels never survive
+        self.assertEqual(drv.VSA.log.count('CONF:GEN:CONN:STAT ON;*OPC?'), 1)
+        self.assertIn(f'CONF:GEN:IPC:ADDR "{bench().VSG_IP}"', drv.VSA.log)
+
+    def test_nr5g_retune_only_touches_the_analyzer(self):
+        drv = make_driver(NR5GDriver)
+        drv.VSA_Config()
+        drv.VSA.log.clear()
+        drv.VSx_retune(6.2e9)
+        self.assertEqual(drv.VSA.log, [':SENS:FREQ:CENT 6200000000.0;*OPC?'])
+        self.assertEqual(drv.VSG.log, [])
+        self.assertIsNone(drv._captured)
+
+
+if __name__ == '__main__':
+    unittest.main()
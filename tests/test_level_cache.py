@@ -0,0 +1,88 @@
+# tests/test_level_cache.py
+import os
+import tempfile
+import unittest
+from src.main import measure_point
+from src.measurements.level_cache import LevelCache, LevelInterpolator
+from src.measurements.lte import std_insr_driver as LTE
+from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
+from src.measurements.protocol import driver_type
+from tests.test_capture import make_driver
+from tests.test_protocol import ArmingSocket
+
+
+class TestLevelCache(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'level_cache.json')
+
+    def test_round_trip_and_frequency_bins(self):
+        cache = LevelCache(self.path)
+        cache.put('NR5G_20MHz', 6.001e9, -10.0, -5.0, 10.0)
+        reloaded = LevelCache(self.path)
+        self.assertEqual(reloaded.get('NR5G_20MHz', 6.002e9, -10.0), (-5.0, 10.0))
+        self.assertIsNone(reloaded.get('NR5G_20MHz', 6.1e9, -10.0))
+        self.assertIsNone(reloaded.get('NR5G_20MHz', 6.001e9, -9.0))
+
+    def test_driver_applies_cached_level_without_auto_level(self):
+        drv = make_driver(NR5GDriver)
+        drv.rb, drv.rbo, drv.scs, drv.mod = 51, 0, 30, 'QAM256'
+        drv.level_cache = LevelCache(self.path)
+        ran, _ = drv.VSA_level()  # Miss: auto-level and store
+        self.assertTrue(ran)
+        drv.VSA.log.clear()
+        ran, _ = drv.VSA_level()  # Hit: apply, sweep once and check overload
+        self.assertFalse(ran)
+        self.assertNotIn(':SENS:ADJ:LEV;*OPC?', drv.VSA.log)
+        self.assertLess(drv.VSA.log.index('INIT:IMM;*OPC?'), drv.VSA.log.index(':STAT:QUES:POW:COND?'))
+
+    def test_point_reuses_the_level_check_capture(self):
+        drv = make_driver(NR5GDriver)
+        drv.rb, drv.rbo, drv.scs, drv.mod = 51, 0, 30, 'QAM256'
+        drv.VSA = ArmingSocket()
+        drv.level_cache = LevelCache(self.path)
+        drv.level_cache.put(drv._level_config(), drv.freq, drv.pwr, -30.0, 0.0)
+        drv._meas = 'ACLR'  # Left selected by the previous point
+        drv.VSA_level()
+        log = drv.VSA.log
+        self.assertTrue(log[0].startswith(':INP:ATT'))
+        self.assertTrue(log[1].startswith(':CONF:NR5G:MEAS EVM'))  # The sweep checks the real capture
+        instr = driver_type("NR5G")(drv)
+        instr.select(measure_aclr=False, measure_ch_pwr=False)
+        self.assertEqual(measure_point(instr, {})[0], -40.0)
+        self.assertEqual(drv.VSA.sweeps(), 1)  # Only the level check swept
+        measure_point(instr, {})  # A retry arms a fresh capture
+        self.assertEqual(drv.VSA.sweeps(), 2)
+
+    def test_overloaded_cached_level_is_re_measured(self):
+        drv = make_driver(NR5GDriver)
+        drv.rb, drv.rbo, drv.scs, drv.mod = 51, 0, 30, 'QAM256'
+        drv.level_cache = LevelCache(self.path)
+        drv.level_cache.put(drv._level_config(), drv.freq, drv.pwr, -30.0, 0.0)
+        drv.VSA_overloaded = lambda: True
+        ran, _ = drv.VSA_level()
+        self.assertTrue(ran)
+        self.assertIn(':SENS:ADJ:LEV;*OPC?', drv.VSA.log)
+
+
+class TestLevelInterpolation(unittest.TestCase):
+    def test_linear_offset(self):
+        fit = LevelInterpolator(6e9, -12.0, -20.0, -6.0, -14.0, 10.0)
+        self.assertAlmostEqual(fit.ref_level(-9.0), -17.0)
+        self.assertTrue(fit.covers(6e9, [-6.0, -9.0, -12.0]))
+        self.assertFalse(fit.covers(6.1e9, [-6.0, -12.0]))
+
+    def test_power_sweep_levels_only_at_extremes(self):
+        for cls in (LTE, NR5GDriver):
+            drv = make_driver(cls)
+            drv.level_fit = None
+            powers = [-12.0, -11.0, -10.0, -9.0]
+            for pwr in powers:
+                drv.VSG_pwr(pwr)
+                drv.VSA_level_interp(pwr, powers)
+            self.assertEqual(drv.VSA.log.count(':SENS:ADJ:LEV;*OPC?'), 2, cls.__module__)
+            # Every power step completes before the analyzer levels or sweeps
+            self.assertTrue(all(cmd.endswith(';*OPC?') for cmd in drv.VSG.log), cls.__module__)
+
+
+if __name__ == '__main__':
+    unittest.main()
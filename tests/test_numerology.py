@@ -0,0 +1,43 @@
+# tests/test_numerology.py
+import unittest
+from src.measurements.lte_numerology import lte_bandwidth, lte_allocation
+from src.measurements.nr5g_numerology import NrCarrier, validate_nr5g_plan
+
+
+class TestLteNumerology(unittest.TestCase):
+    def test_all_eutra_bandwidths(self):
+        self.assertEqual(lte_bandwidth(1.4), ('BW1_40', 6))
+        self.assertEqual(lte_bandwidth(10), ('BW10_00', 50))
+        self.assertEqual(lte_allocation(5), ('BW5_00', 25))
+        self.assertEqual(lte_allocation(20, 50, 50), ('BW20_00', 50))
+
+    def test_invalid_bandwidth_and_allocation(self):
+        with self.assertRaises(ValueError):
+            lte_bandwidth(7)
+        with self.assertRaises(ValueError):
+            lte_allocation(10, 40, 20)
+
+
+class TestNrNumerology(unittest.TestCase):
+    def test_carrier_values(self):
+        carrier = NrCarrier(20, 30, 51)
+        self.assertEqual(carrier.max_rb, 51)
+        self.assertAlmostEqual(carrier.tx_bw_mhz, 18.36)
+        self.assertEqual(carrier.bw_token, 'BW20')
+        self.assertEqual(NrCarrier(20.0, 30.0).bw_token, 'BW20')  # JSON floats
+        self.assertEqual(NrCarrier(100, 60).rb, 135)
+
+    def test_plan_validation(self):
+        plan = [
+            {"run": True, "channel_bandwidth_mhz": 20, "subcarrier_spacing_khz": 30, "resource_blocks": 51},
+            {"run": True, "channel_bandwidth_mhz": 100, "subcarrier_spacing_khz": 15},
+            {"run": True, "channel_bandwidth_mhz": 20, "subcarrier_spacing_khz": 30, "resource_blocks": 60},
+            {"run": False, "channel_bandwidth_mhz": 7},
+        ]
+        carriers, errors = validate_nr5g_plan(plan)
+        self.assertEqual(len(carriers), 1)
+        self.assertEqual(len(errors), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
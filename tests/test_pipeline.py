@@ -0,0 +1,30 @@
+# tests/test_pipeline.py
+import threading
+import unittest
+from src.utils.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_run_in_order_and_drop_failures(self):
+        out = []
+        consumer = threading.Event()
+
+        def parse(point):
+            if point == 3:
+                raise ValueError("bad ACLR string")
+            return point * 10
+
+        def store(record):
+            consumer.set()
+            out.append(record)
+
+        with Pipeline([parse, store]) as pipeline:
+            for point in range(5):
+                pipeline.submit(point)
+        self.assertTrue(consumer.is_set())
+        self.assertEqual(out, [0, 10, 20, 40])
+        self.assertEqual(len(pipeline.errors), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
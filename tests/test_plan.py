@@ -0,0 +1,160 @@
+# tests/test_plan.py
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.instruments.bench import bench
+from src.main import measure_point
+from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
+from src.measurements.protocol import open_driver
+from src.utils import plan as plan_module
+from src.utils.plan import expand_plan, load_plan, compile_plan
+from src.utils.estimate import RuntimeEstimator, LatencyModel
+from tests.test_protocol import ArmingSocket
+
+INPUTS = {
+    "lte": [{"run": True, "center_frequency_ghz": [6.2, 6.5], "power_dbm": [-10.0, -9.0],
+             "channel_bandwidth_mhz": 5}],
+    "nr5g": [{"run": False, "center_frequency_ghz": 6.1, "power_dbm": [-5.0]}],
+    "STN": [{"run": True, "center_frequency_ghz": {"range": {"start_ghz": 1.0, "stop_ghz": 1.02, "step_mhz": 10}},
+             "iterations": 3}],
+}
+
+
+class CountingSocket(ArmingSocket):
+    """ArmingSocket counting writes and queries (status polls included)."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = self.queries = 0
+
+    def write(self, cmd):
+        self.writes += 1
+        super().write(cmd)
+
+    def query(self, cmd):
+        self.queries += 1
+        return '0.01;1' if cmd.startswith(':SENS:SWE:TIME?;') else super().query(cmd)
+
+    def queryFloat(self, cmd):
+        self.queries += 1
+        return super().queryFloat(cmd)
+
+    def arm(self, cmd='INIT:IMM'):
+        self.writes += 1
+        super().arm(cmd)
+
+    def wait_complete(self, timeout=30.0):
+        self.queries += 1  # One *STB? poll
+        return super().wait_complete(timeout)
+
+
+def count_commands(instr, step):
+    """Run a step and return the (writes, queries) it sent to both instruments."""
+    socks = (instr.driver.VSA, instr.driver.VSG)
+    before = [(sock.writes, sock.queries) for sock in socks]
+    step()
+    return (sum(sock.writes for sock in socks) - sum(w for w, _ in before),
+            sum(sock.queries for sock in socks) - sum(q for _, q in before))
+
+
+class TestPlan(unittest.TestCase):
+    def test_expand_plan(self):
+        points = expand_plan(INPUTS)
+        self.assertEqual([p["type"] for p in points], ["LTE"] * 4 + ["STN"] * 3)
+        self.assertEqual([p["reconfig"] for p in points[:4]], [True, False, False, False])
+        self.assertEqual([p["retune"] for p in points[:4]], [True, False, True, False])
+
+    def test_estimate_learns_from_history(self):
+        history = [
+            {"type": "LTE", "timings": {"VSG_Config": 2.0, "VSA_Config": 2.0, "VSx_retune": 0.2,
+                                        "VSA_sweep_evm": 0.3, "VSA_get_EVM": 0.1, "VSA_get_ACLR": 0.5}},
+            {"type": "LTE", "timings": {"VSA_sweep_evm": 0.1, "VSA_get_EVM": 0.1, "VSA_get_ACLR": 0.3}},
+            {"type": "STN", "timings": {"VSA_Config": 1.0, "get_VSA_sweep_noise_mkr_1": 2.0}},
+        ]
+        estimator = RuntimeEstimator(history)
+        points = expand_plan(INPUTS)
+        total, ranked = estimator.estimate(points)
+        # LTE: one config (4 s), two retunes (0.2 s) and 4 points x (sweep 0.2 + fetch 0.1 + ACLR 0.4 s);
+        # STN: 3 points x (1 s config + 3 x 2 s)
+        self.assertAlmostEqual(total, 4.0 + 0.4 + 2.8 + 21.0)
+        self.assertEqual(ranked[0][0], "STN[0]")
+        # Costed by the steps performed: no retune, no ACLR sweep
+        point = dict(points[1], measure_aclr=False)
+        self.assertAlmostEqual(estimator.point_cost(point), 0.3)
+
+    def test_latency_model_counts(self):
+        model = LatencyModel()
+        points = expand_plan(INPUTS)
+        self.assertEqual(model.counts(points[0])["sweeps"], 2)  # EVM + ACLR
+        self.assertEqual(model.counts(points[4])["sweeps"], 3)  # STN iterations
+        self.assertIn("Total", model.report(points))
+
+    def test_latency_model_matches_the_drivers(self):
+        commands = {}
+        with mock.patch.object(bench, 'connect', side_effect=lambda ip, port=5025: CountingSocket()), \
+                mock.patch.object(NR5GDriver, '_vsa_instance', None), \
+                mock.patch.object(NR5GDriver, '_vsg_instance', None):
+            for kind in ("LTE", "NR5G"):
+                instr = open_driver(kind)
+
+                def point(freq, measure_aclr=False, use_sequencer=False):
+                    instr.retune(freq)
+                    instr.driver.VSG_pwr(-10.0)
+                    instr.select(measure_aclr, False, use_sequencer)
+                    instr.expected_duration()
+                    measure_point(instr, {})
+
+                instr.configure()  # Generator link handshake, once per session
+                config = count_commands(instr, lambda: (instr.configure(), instr.expected_duration()))
+                evm = count_commands(instr, lambda: point(6.1e9))
+                aclr = count_commands(instr, lambda: point(6.2e9, measure_aclr=True))
+                point(6.3e9, True, True)  # Sequencer channel setup, once per configuration
+                sequencer = count_commands(instr, lambda: point(6.4e9, True, True))
+                commands[kind] = {"config": config, "point": evm, "aclr": (aclr[0] - evm[0], aclr[1] - evm[1]),
+                                  "sequencer": sequencer, "iteration": (0, 0)}
+            instr = open_driver("STN")
+            commands["STN"] = {
+                "config": count_commands(instr, lambda: (instr.configure(), instr.expected_duration())),
+                "point": count_commands(instr, lambda: instr.retune(6.1e9)),
+                "aclr": (0, 0), "sequencer": (0, 0),
+                "iteration": count_commands(instr, instr.measure)}
+            instr = open_driver("SpurSearch", fundamental_ghz=6.0)
+            commands["SpurSearch"] = {
+                "config": count_commands(instr, instr.configure),
+                "point": count_commands(instr, lambda: (instr.retune(6e9), instr.expected_duration(),
+                                                        instr.measure())),
+                "aclr": (0, 0), "sequencer": (0, 0), "iteration": (0, 0)}
+        self.assertEqual(LatencyModel.COMMANDS, commands)
+
+    def test_schema_errors_are_reported_together(self):
+        bad = {"lte": [{"run": True, "power_dbm": "-10", "modulaton_type": "QPSK"}]}
+        with self.assertRaises(ValueError) as ctx:
+            compile_plan(bad)
+        message = str(ctx.exception)
+        self.assertIn("lte[0].power_dbm", message)
+        self.assertIn("unknown field 'modulaton_type'", message)
+        self.assertIn("missing required field 'center_frequency_ghz'", message)
+
+    def test_compiled_plan_is_immutable_and_cached(self):
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, 'test_inputs.json')
+        with open(path, 'w') as f:
+            json.dump(INPUTS, f)
+        plan = load_plan(path, cache_dir=tmp)
+        self.assertEqual(len(plan.points), 7)
+        self.assertEqual(plan.inputs["lte"][0]["power_dbm"], (-10.0, -9.0))
+        with self.assertRaises(AttributeError):
+            plan.points = ()
+        with self.assertRaises(TypeError):
+            plan.inputs["lte"][0]["run"] = False
+        with mock.patch.object(plan_module, 'compile_plan') as compile_mock:
+            cached = load_plan(path, cache_dir=tmp)
+        compile_mock.assert_not_called()
+        self.assertEqual(cached.source_hash, plan.source_hash)
+        self.assertEqual(len(cached.points), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_protocol.py
+import unittest
+from src.measurements.lte import std_insr_driver as LTE
+from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
+from src.measurements.protocol import DRIVER_TYPES, MeasurementDriver, driver_type
+from src.measurements.SubThermalNoise import option_functions as STN
+from src.measurements.spur_search import SpurSearch
+from src.utils.watchdog import Watchdog
+from tests.test_capture import FakeSocket, make_driver
+
+
+class ArmingSocket(FakeSocket):
+    """FakeSocket that also supports overlapped arm()/wait_complete()."""
+
+    timeout = 30.0
+
+    def arm(self, cmd='INIT:IMM'):
+        self.log.append(cmd)
+
+    def wait_complete(self, timeout=30.0):
+        self.log.append('*STB?')
+        return 0.0
+
+
+def wrap(kind, drv):
+    drv.VSA, drv.VSG = ArmingSocket(), ArmingSocket()
+    return driver_type(kind)(drv)
+
+
+class TestProtocol(unittest.TestCase):
+    def test_every_measurement_type_is_registered(self):
+        self.assertEqual(sorted(DRIVER_TYPES), ["LTE", "NR5G", "STN", "SpurSearch"])
+        for kind, cls in DRIVER_TYPES.items():
+            self.assertTrue(issubclass(cls, MeasurementDriver))
+            self.assertEqual(cls.kind, kind)
+        with self.assertRaises(ValueError):
+            driver_type("GSM")
+
+    def test_lte_phases(self):
+        drv = wrap("LTE", make_driver(LTE))
+        drv.retune(6.1e9)
+        drv.select(measure_aclr=False, measure_ch_pwr=False)
+        values, _ = drv.measure()
+        self.assertEqual((values["evm"], values["aclr_raw"], values["ch_power"]), (-40.0, None, None))
+        self.assertEqual(sorted(values["timings"]), ["VSA_get_EVM"])
+        self.assertIn('INIT:IMM', drv.driver.VSA.log)
+        self.assertEqual(drv.driver._captured, 'EVM')  # Fetch reuses the armed capture
+        self.assertEqual(drv.driver.VSA.sweeps(), 1)
+
+    def test_lte_sequencer_phases(self):
+        for kind, cls in (("LTE", LTE), ("NR5G", NR5GDriver)):
+            drv = wrap(kind, make_driver(cls))
+            drv.select(use_sequencer=True)
+            drv.arm()
+            self.assertEqual(drv.driver.VSA.log[-1], ':INIT:SEQ:IMM')  # Overlapped, not *OPC?
+            drv.wait()
+            values, _ = drv.fetch()
+            self.assertEqual((values["evm"], values["aclr_raw"].split(',')[1]), (-38.5, '-45.0'))
+            self.assertEqual(sorted(values["timings"]), ["VSA_seq_fetch"], kind)
+
+    def test_lte_budget_uses_the_analyzer_sweep_time_once(self):
+        drv = wrap("LTE", make_driver(LTE))
+        queries = []
+        drv.driver.VSA.queryFloat = lambda cmd: queries.append(cmd) or 0.02
+        drv.select(measure_aclr=False)
+        self.assertEqual(drv.expected_duration(), 0.02)
+        drv.select(measure_aclr=True)
+        self.assertEqual(drv.expected_duration(), 0.04)  # ACLR takes a second sweep
+        self.assertEqual(queries, [':SENS:SWE:TIME?'])
+
+    def test_stn_phases(self):
+        stn = STN.__new__(STN)
+        stn.frequency, stn.swp_time = 6e9, 1.0
+        drv = wrap("STN", stn)
+        self.assertIn("VSA_Config", drv.configure())
+        drv.retune(6.2e9)
+        values, _ = drv.measure()
+        self.assertEqual(values, {"marker": -40.0})
+        self.assertEqual(stn.frequency, 6.2e9)
+
+    def test_spur_search_retune_reconfigures_ranges(self):
+        spur = SpurSearch.__new__(SpurSearch)
+        spur.fundamental_ghz, spur.frequency, spur.rbw_mhz, spur.spur_limit_dbm, spur.pwr = 6.0, 6e9, 0.01, -95, -10
+        drv = wrap("SpurSearch", spur)
+        drv.retune(3e9)
+        self.assertEqual(sorted(drv.configure()), ["VSA_config", "VSG_config"])
+        self.assertIn("SENS:FREQ:STAR 1500000000", drv.driver.VSA.log)
+        values, _ = drv.measure()
+        self.assertEqual(values["spurs"], [(1.0, 1.0)])
+
+    def test_spur_search_is_not_cut_short(self):
+        spur = SpurSearch.__new__(SpurSearch)
+        drv = wrap("SpurSearch", spur)
+        waits = []
+        drv.driver.VSA.wait_complete = lambda timeout: waits.append(timeout) or 0.0
+        drv.driver.VSA.query = lambda cmd: '0.5;5'  # Reported FFT sweep time, averages
+        drv.wait()
+        self.assertEqual(waits, [300.0])  # Not the 30 s read timeout
+        self.assertGreaterEqual(Watchdog().budget(drv.expected_duration()), 300.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
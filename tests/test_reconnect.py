@@ -0,0 +1,106 @@
+# tests/test_reconnect.py
+import socket
+import threading
+import unittest
+from src.instruments.iSocket import iSocket
+from src.instruments.shadow import ShadowState
+
+
+class DroppingInstrument:
+    """Loopback SCPI server that drops its first connection after a few commands."""
+
+    def __init__(self, drop_after):
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.port = self.server.getsockname()[1]
+        self.drop_after = drop_after
+        self.connections = []  # Command lines received per connection
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            lines = []
+            self.connections.append(lines)
+            with conn, conn.makefile('rb') as f:
+                for raw in f:
+                    line = raw.decode().strip()
+                    if len(self.connections) == 1 and len(lines) == self.drop_after:
+                        break  # Drop without answering
+                    lines.append(line)
+                    if line.endswith('?'):
+                        conn.sendall(b'FAKE,FSW\n' if line == '*IDN?' else b'1\n')
+
+    def close(self):
+        self.server.close()
+
+
+class TestReconnect(unittest.TestCase):
+    def test_dropped_connection_is_restored_and_command_resumed(self):
+        instrument = DroppingInstrument(drop_after=4)
+        self.addCleanup(instrument.close)
+        sock = iSocket(stats=None, timeout=2.0, reconnect_backoff=0.01).open('127.0.0.1', instrument.port)
+        self.addCleanup(sock.close)
+        sock.query('*RST;*OPC?')
+        sock.write(':SENS:FREQ:CENT 6e9')
+        sock.write(':SENS:FREQ:CENT 6.1e9')  # Fourth command, the connection drops after it
+        self.assertEqual(sock.query('INIT:IMM;*OPC?'), '1')
+        self.assertEqual(sock.reconnects, 1)
+        self.assertEqual(instrument.connections[1],
+                         ['*RST;*OPC?', ':SENS:FREQ:CENT 6.1e9', '*CLS;*OPC?', 'INIT:IMM;*OPC?'])
+
+    def test_gives_up_after_bounded_attempts(self):
+        sock = iSocket(stats=None, timeout=1.0, reconnect_attempts=2, reconnect_backoff=0.01)
+        server = socket.create_server(('127.0.0.1', 0))
+        sock.host = ('127.0.0.1', server.getsockname()[1])
+        server.close()  # Nothing listens any more
+        with self.assertRaises(ConnectionError):
+            sock.reconnect(ConnectionResetError("dropped"))
+        self.assertEqual(sock.reconnects, 0)
+
+
+class TestShadowState(unittest.TestCase):
+    def test_keeps_last_setting_per_channel_since_reset(self):
+        shadow = ShadowState()
+        shadow.record(':SENS:FREQ:CENT 1e9')
+        shadow.record('*RST;*OPC?')
+        shadow.record(":INST:CRE NR5G, '5G NR'")
+        shadow.record(':SENS:FREQ:CENT 6e9;:INIT:CONT OFF')
+        shadow.record("INST:SEL '5G NR ACLR';:SENS:SWE:TIME 0.01;INIT:IMM;*OPC?")
+        shadow.record("INST:SEL '5G NR'")
+        shadow.record(':SENS:FREQ:CENT 6.1e9')
+        shadow.record('DISP:WIND1:SUBW:TRAC1:Y:SCAL:AUTO ONCE;:CONF:SETT:NR5G;*OPC?')
+        self.assertEqual(shadow.commands(), [
+            '*RST;*OPC?',
+            ":INST:CRE NR5G, '5G NR'",
+            "INST:SEL '5G NR'",
+            ':INIT:CONT OFF',
+            "INST:SEL '5G NR ACLR'",
+            ':SENS:SWE:TIME 0.01',
+            "INST:SEL '5G NR'",
+            ':SENS:FREQ:CENT 6.1e9',
+            ':CONF:SETT:NR5G',
+        ])
+
+    def test_parameterless_state_commands_are_replayed_in_order(self):
+        shadow = ShadowState()
+        shadow.record('*RST;*OPC?')
+        shadow.record(':SOUR1:BB:NR5G:QCKS:GEN:CBW BW20;:SOUR1:BB:NR5G:QCKS:APPL')
+        shadow.record(':SOUR1:BB:NR5G:UBWP:USER0:CELL0:UL:BWP0:PUSC:ALL0:RBN 51')  # Overrides the quick settings
+        shadow.record(":INST:SEL 'LTE';:INST:CRE:DUPL;*OPC?")
+        shadow.record(':SYST:SHUT')
+        self.assertEqual(shadow.commands(), [
+            '*RST;*OPC?',
+            ':SOUR1:BB:NR5G:QCKS:GEN:CBW BW20',
+            ':SOUR1:BB:NR5G:QCKS:APPL',
+            ':SOUR1:BB:NR5G:UBWP:USER0:CELL0:UL:BWP0:PUSC:ALL0:RBN 51',
+            "INST:SEL 'LTE'",
+            ':INST:CRE:DUPL',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# tests/test_runner.py
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import src.main as main
+from src.utils.plan import compile_plan
+
+
+class TestRunCampaign(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        main.results.clear()
+
+    def test_registry_order_and_default_runners(self):
+        self.assertEqual(list(main.RUNNERS), ["lte", "nr5g", "STN", "spur_search"])
+
+    def test_dispatches_enabled_blocks_and_streams_records(self):
+        calls = []
+
+        def fake_runner(test, ctx):
+            calls.append(test["center_frequency_ghz"])
+            ctx.emit({"test_set": ctx.test_set, "type": "STN", "timings": {}})
+            ctx.test_set += 1
+
+        plan, _ = compile_plan({"STN": [{"run": True, "center_frequency_ghz": 6.0},
+                                        {"run": False, "center_frequency_ghz": 7.0}]})
+        path = os.path.join(self.tmp.name, 'results.jsonl')
+        with mock.patch.dict(main.RUNNERS, {"STN": fake_runner}, clear=True):
+            main.run_campaign(plan, path)
+        self.assertEqual(calls, [6.0])
+        self.assertEqual([r["test_set"] for r in main.results], [1])
+        with open(path) as f:
+            self.assertEqual([json.loads(line)["type"] for line in f], ["STN"])
+
+    def test_dropped_records_are_reported(self):
+        def fake_runner(test, ctx):
+            ctx.emit({"test_set": 1, "type": "STN"})
+
+        plan, _ = compile_plan({"STN": [{"run": True, "center_frequency_ghz": 6.0}]})
+        path = os.path.join(self.tmp.name, 'results.jsonl')
+        with mock.patch.dict(main.RUNNERS, {"STN": fake_runner}, clear=True), \
+                mock.patch.object(main, 'build_record', side_effect=KeyError("timings")):
+            self.assertEqual(main.run_campaign(plan, path), 1)
+        self.assertEqual(main.results, [])
+
+    def test_range_blocks_expand_from_the_frozen_plan(self):
+        stn_freqs = []
+
+        def fake_stn(instr, freq, test_set, iterations, emit):
+            stn_freqs.append(round(freq / 1e9, 3))
+
+        freq_range = {"range": {"start_ghz": 6.0, "stop_ghz": 6.2, "step_mhz": 100}}
+        plan, _ = compile_plan({"STN": [{"run": True, "center_frequency_ghz": freq_range}],
+                                "spur_search": [{"run": True, "fundamental_frequency_ghz": freq_range}]})
+        path = os.path.join(self.tmp.name, 'results.jsonl')
+        with mock.patch.object(main, 'open_driver') as open_driver, \
+                mock.patch.object(main, 'run_stn_measurement', fake_stn), \
+                mock.patch.object(main, 'run_spur_search_measurement', side_effect=lambda test, n, instr, emit: n + 1):
+            main.run_campaign(plan, path)
+        self.assertEqual(stn_freqs, [6.0, 6.1, 6.2])
+        self.assertEqual(open_driver.call_args_list[1].kwargs["fundamental_ghz"], 6.0)  # Spur driver
+        self.assertEqual([round(c.args[0] / 1e9, 3) for c in open_driver.return_value.retune.call_args_list],
+                         [6.1, 6.2, 6.1, 6.2])  # STN then spur search retunes
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# tests/test_scpi_errors.py
+import unittest
+from src.instruments.iSocket import iSocket
+from src.instruments.scpi_errors import InstrumentError, parse_error_queue, split_response
+from src.instruments.simulator import ScpiSimulator
+
+
+class TestErrorQueueParsing(unittest.TestCase):
+    def test_no_error_is_empty(self):
+        self.assertEqual(parse_error_queue('0,"No error"'), [])
+
+    def test_every_queued_error_is_parsed(self):
+        self.assertEqual(parse_error_queue('-113,"Undefined header;CONF:LTE:FOO",-222,"Data ""out"" of range"'),
+                         [(-113, 'Undefined header;CONF:LTE:FOO'), (-222, 'Data "out" of range')])
+
+    def test_split_ignores_separators_in_quotes(self):
+        self.assertEqual(split_response('1;-113,"Undefined header;X"'), ('1', '-113,"Undefined header;X"'))
+        self.assertEqual(split_response('0,"No error"'), ('', '0,"No error"'))
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.sim = ScpiSimulator()
+        self.addCleanup(self.sim.close)
+        self.sock = iSocket(stats=None, timeout=2.0).open(self.sim.host, self.sim.port)
+        self.addCleanup(self.sock.close)
+
+    def test_clean_batch_costs_one_round_trip(self):
+        commands = self.sim.commands
+        self.assertEqual(self.sock.sync('INIT:CONT OFF;*OPC?'), '1')
+        self.assertEqual(self.sim.commands - commands, 1)
+        self.assertEqual(self.sim.settings['INIT:CONT'], 'OFF')
+
+    def test_queued_errors_raise_once(self):
+        self.sim.errors += ['-113,"Undefined header"', '-222,"Data out of range"']
+        with self.assertRaises(InstrumentError) as ctx:
+            self.sock.sync()
+        self.assertEqual([code for code, _ in ctx.exception.errors], [-113, -222])
+        self.assertEqual(self.sock.sync(), '1')  # Queue was drained by the check
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+# tests/test_scpi_stats.py
+import unittest
+from src.instruments.scpi_stats import LatencyHistogram, ScpiLatencyStats, scpi_header
+
+
+class TestScpiStats(unittest.TestCase):
+    def test_scpi_header(self):
+        self.assertEqual(scpi_header('INIT:IMM;*OPC?'), 'INIT:IMM;*OPC?')
+        self.assertEqual(scpi_header(':SENS:FREQ:CENT 6000000000.0;*OPC'), 'SENS:FREQ:CENT;*OPC')
+        self.assertEqual(scpi_header(':CALC:MARK:FUNC:POW:RES? ACP'), 'CALC:MARK:FUNC:POW:RES?')
+
+    def test_histogram_percentiles(self):
+        hist = LatencyHistogram()
+        for i in range(1, 1001):
+            hist.record(i / 1000.0)  # 1 ms .. 1 s
+        self.assertEqual(hist.count, 1000)
+        self.assertAlmostEqual(hist.percentile(50), 0.5, delta=0.5 * 0.03)
+        self.assertAlmostEqual(hist.percentile(99), 0.99, delta=0.99 * 0.03)
+        self.assertEqual(hist.percentile(100), 1.0)
+
+    def test_report_ranks_commands(self):
+        stats = ScpiLatencyStats()
+        for _ in range(3):
+            stats.record('192.168.200.20:5025', 'INIT:IMM;*OPC?', 0.5)
+            stats.record('192.168.200.20:5025', ':FETC:CC1:SUMM:EVM:ALL:AVER?', 0.01)
+        report = stats.report()
+        self.assertIn('192.168.200.20:5025', report)
+        self.assertLess(report.index('INIT:IMM;*OPC?'), report.index('FETC:CC1:SUMM:EVM:ALL:AVER?'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+# tests/test_startup.py
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Imports src.main in a fresh interpreter and reports the time and heavy modules loaded
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ('pandas', 'numpy', 'openpyxl', 'src.measurements.lte', 'src.measurements.nr5g_fr1',
+                     'src.measurements.SubThermalNoise', 'src.measurements.spur_search') if m in sys.modules]
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    def test_main_import_is_lazy_and_fast(self):
+        out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        self.assertEqual(probe["heavy"], [])
+        self.assertLess(probe["elapsed"], 1.0, f"src.main import took {probe['elapsed']:.3f} s")
+
+
+if __name__ == '__main__':
+    unittest.main()
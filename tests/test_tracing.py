@@ -0,0 +1,41 @@
+# tests/test_tracing.py
+import json
+import os
+import tempfile
+import unittest
+from src.utils.tracing import Tracer, NULL_SPAN
+
+
+class TestTracing(unittest.TestCase):
+    def test_disabled_tracer_returns_null_span(self):
+        tracer = Tracer()
+        self.assertIs(tracer.span("LTE test set 1", 'test_set'), NULL_SPAN)
+        self.assertEqual(tracer.spans, [])
+
+    def test_nested_spans_and_exports(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("LTE test set 1", 'test_set') as test_span:
+            with tracer.span("VSA_get_EVM", 'driver'):
+                tracer.add_span('INIT:IMM;*OPC?', 'scpi', 1.0, 1.5, instrument='vsa')
+        summary = test_span.summary()
+        self.assertEqual(summary["children"][0]["name"], "VSA_get_EVM")
+        self.assertEqual(summary["children"][0]["scpi_commands"], 1)
+
+        out_dir = tempfile.mkdtemp()
+        chrome_path = os.path.join(out_dir, 'trace.json')
+        tracer.export(chrome_path, 'chrome')
+        with open(chrome_path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual({e["name"] for e in events}, {"LTE test set 1", "VSA_get_EVM", 'INIT:IMM;*OPC?'})
+
+        otlp_path = os.path.join(out_dir, 'trace_otlp.json')
+        tracer.export(otlp_path, 'otlp')
+        with open(otlp_path) as f:
+            spans = json.load(f)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        by_name = {s["name"]: s for s in spans}
+        self.assertEqual(by_name["VSA_get_EVM"]["parentSpanId"], by_name["LTE test set 1"]["spanId"])
+
+
+if __name__ == '__main__':
+    unittest.main()
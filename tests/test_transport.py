@@ -0,0 +1,56 @@
+# tests/test_transport.py
+import socket
+import unittest
+from src.instruments.iSocket import iSocket, SocketOptions
+from src.instruments.simulator import ScpiSimulator
+
+
+class TestSocketOptions(unittest.TestCase):
+    def test_nodelay_keepalive_and_buffers_are_applied(self):
+        sock = iSocket(stats=None, options=SocketOptions(sndbuf=65536, rcvbuf=65536))
+        self.addCleanup(sock.sock.close)
+        self.assertTrue(sock.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertTrue(sock.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        self.assertGreaterEqual(sock.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF), 65536)
+
+    def test_connect_timeout_is_separate_from_read_timeout(self):
+        with ScpiSimulator() as sim:
+            sock = iSocket(stats=None, timeout=7.0, options=SocketOptions(connect_timeout=1.0))
+            sock.open(sim.host, sim.port)
+            self.addCleanup(sock.close)
+            self.assertEqual(sock.sock.gettimeout(), 7.0)
+
+
+class TestFraming(unittest.TestCase):
+    def setUp(self):
+        self.sock = iSocket(stats=None, timeout=2.0)
+        self.sock.sock.close()
+        self.sock.sock, self.instrument = socket.socketpair()
+        self.addCleanup(self.instrument.close)
+        self.addCleanup(self.sock.sock.close)
+
+    def test_response_split_across_segments(self):
+        self.instrument.sendall(b'-38.')
+        self.instrument.sendall(b'5,-45.0\n')
+        self.assertEqual(self.sock.query(':FETC:SUMM:EVM?'), '-38.5,-45.0')
+
+    def test_back_to_back_responses_are_not_merged(self):
+        self.instrument.sendall(b'1\n2\n')
+        self.assertEqual(self.sock.query('*OPC?'), '1')
+        self.assertEqual(self.sock.query('*OPC?'), '2')
+
+
+class TestSimulator(unittest.TestCase):
+    def test_settings_and_compound_queries(self):
+        with ScpiSimulator() as sim:
+            sock = iSocket(stats=None, timeout=2.0).open(sim.host, sim.port)
+            self.addCleanup(sock.close)
+            self.assertIn('Simulator', sock.idn)
+            sock.write(':SENS:FREQ:CENT 6e9;:INIT:CONT OFF')
+            self.assertEqual(sock.query('SENS:FREQ:CENT?;INIT:IMM;*OPC?'), '6e9;1')
+            sock.query('*RST;*OPC?')
+            self.assertEqual(sock.query('SENS:FREQ:CENT?'), '0')
+
+
+if __name__ == '__main__':
+    unittest.main()
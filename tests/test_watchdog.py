@@ -0,0 +1,119 @@
+# tests/test_watchdog.py
+import socket
+import unittest
+from src.instruments.iSocket import iSocket
+from src.main import measure_point
+from src.measurements.lte import std_insr_driver as LTE
+from src.measurements.nr5g_fr1 import std_insr_driver as NR5GDriver
+from src.measurements.protocol import driver_type
+from src.utils.watchdog import PointTimeout, Watchdog
+from tests.test_capture import FakeSocket, make_driver
+
+
+class StubSocket:
+    """Analyzer connection recording timeouts and aborts."""
+
+    def __init__(self):
+        self.timeout = 30.0
+        self.timeouts = []
+        self.aborts = 0
+
+    def set_timeout(self, timeout):
+        previous, self.timeout = self.timeout, timeout
+        self.timeouts.append(timeout)
+        return previous
+
+    def abort(self):
+        self.aborts += 1
+
+
+class TestWatchdog(unittest.TestCase):
+    def test_budget_narrows_and_restores_the_read_timeout(self):
+        sock = StubSocket()
+        result = Watchdog(margin=3.0, overhead_s=2.0).run("step", sock, 1.0, lambda: sock.timeout)
+        self.assertEqual(result, 5.0)
+        self.assertEqual(sock.timeout, 30.0)
+
+    def test_overrun_is_aborted_and_retried(self):
+        sock = StubSocket()
+        calls = []
+
+        def hangs_once():
+            calls.append(1)
+            if len(calls) == 1:
+                raise socket.timeout("timed out")
+            return "ok"
+
+        wd = Watchdog(retries=1)
+        self.assertEqual(wd.run("step", sock, 0.1, hangs_once), "ok")
+        self.assertEqual((len(calls), sock.aborts, wd.overruns), (2, 1, 1))
+
+    def test_gives_up_after_retries(self):
+        sock = StubSocket()
+
+        def hangs():
+            raise TimeoutError("not complete")
+
+        with self.assertRaises(PointTimeout):
+            Watchdog(retries=2).run("step", sock, 0.1, hangs)
+        self.assertEqual(sock.aborts, 3)
+        self.assertEqual(sock.timeout, 30.0)
+
+    def test_other_errors_are_not_retried(self):
+        sock = StubSocket()
+
+        def fails():
+            raise ValueError("bad response")
+
+        with self.assertRaises(ValueError):
+            Watchdog().run("step", sock, 0.1, fails)
+        self.assertEqual(sock.aborts, 0)
+
+
+class HangingFetchSocket(FakeSocket, StubSocket):
+    """Fake analyzer whose first result fetch times out."""
+
+    def __init__(self):
+        FakeSocket.__init__(self)
+        StubSocket.__init__(self)
+
+    def queryFloat(self, cmd):
+        if cmd.startswith(':FETC') and not self.aborts:
+            raise socket.timeout("timed out")
+        return super().queryFloat(cmd)
+
+    def arm(self, cmd='INIT:IMM'):
+        self.log.append(cmd)
+
+    def wait_complete(self, timeout=30.0):
+        return 0.0
+
+
+class TestDriverTimeouts(unittest.TestCase):
+    def test_fetch_timeout_reaches_the_watchdog(self):
+        for kind, cls in (("LTE", LTE), ("NR5G", NR5GDriver)):
+            drv = make_driver(cls)
+            drv.VSA = HangingFetchSocket()
+            instr = driver_type(kind)(drv)
+            instr.select(measure_aclr=False, measure_ch_pwr=False)
+            wd = Watchdog(retries=1)
+            evm, _, _ = wd.run("point", drv.VSA, 0.1, measure_point, instr, {})
+            self.assertEqual(evm, -40.0, cls.__module__)
+            self.assertEqual((drv.VSA.aborts, drv.VSA.sweeps()), (1, 2), cls.__module__)
+
+
+class TestSocketAbort(unittest.TestCase):
+    def test_abort_discards_late_response(self):
+        sock = iSocket(stats=None, timeout=5.0)
+        sock.sock.close()
+        sock.sock, instrument = socket.socketpair()
+        self.addCleanup(instrument.close)
+        self.addCleanup(sock.sock.close)
+        instrument.sendall(b'1\n')  # Late *OPC? reply of the aborted sweep
+        self.assertEqual(sock.abort(settle=0.05), b'1\n')
+        self.assertEqual(instrument.recv(64), b'ABOR;*CLS\n')
+        self.assertEqual(sock.sock.gettimeout(), 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()